@@ -1,5 +1,6 @@
-"""API dependencies for authentication and rate limiting."""
+"""API dependencies for authentication, rate limiting and shared services."""
 
+import math
 from collections.abc import AsyncGenerator
 from typing import Annotated
 
@@ -7,10 +8,12 @@ import httpx
 import posthog
 from clerk_backend_api import Clerk, RequestState
 from clerk_backend_api.jwks_helpers import AuthenticateRequestOptions
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, HTTPException, Request, Response, status
 
 from app.config import get_settings
-from app.services.cache import CacheService
+from app.services.cache import CacheService, RateLimitResult
+from app.services.reductions import ReductionResolver
+from app.services.resolver import EmbeddingResolver
 
 
 async def get_clerk() -> AsyncGenerator[Clerk, None]:
@@ -56,15 +59,47 @@ async def verify_auth_token(
     )
 
 
+def get_cache_service(request: Request) -> CacheService:
+    """Get the process-wide cache service sharing one Redis connection pool.
+
+    Args:
+        request: FastAPI request object.
+
+    Returns:
+        Shared cache service instance.
+    """
+    return request.app.state.cache_service
+
+
+def _rate_limit_headers(rate_limit: RateLimitResult) -> dict[str, str]:
+    """Build rate limit response headers.
+
+    Args:
+        rate_limit: Result of the rate limit check.
+
+    Returns:
+        Dictionary of X-RateLimit-* headers.
+    """
+    return {
+        "X-RateLimit-Limit": str(rate_limit.limit),
+        "X-RateLimit-Remaining": str(rate_limit.remaining),
+        "X-RateLimit-Reset": str(math.ceil(rate_limit.reset_seconds)),
+    }
+
+
 async def check_rate_limit(
     request: Request,
+    response: Response,
     request_state: Annotated[RequestState, Depends(verify_auth_token)],
+    cache_service: Annotated[CacheService, Depends(get_cache_service)],
 ) -> None:
     """Check if user has exceeded rate limit.
 
     Args:
         request: FastAPI request object
+        response: Response object used to attach rate limit headers
         request_state: User authentication state from Clerk
+        cache_service: Shared cache service used for rate limiting
 
     Raises:
         HTTPException: If rate limit is exceeded
@@ -76,25 +111,49 @@ async def check_rate_limit(
     if not user_id:
         return
 
-    # Use cache service for rate limiting
-    cache_service = CacheService()
     if not cache_service.enabled:
         return  # Skip rate limiting if Redis is not available
 
     # Check rate limit for this user and endpoint
     endpoint = request.url.path
-    is_allowed, _ = await cache_service.check_rate_limit(user_id, endpoint)
+    rate_limit = await cache_service.check_rate_limit(user_id, endpoint)
+    headers = _rate_limit_headers(rate_limit)
 
-    if not is_allowed:
+    if not rate_limit.allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=(
-                f"Rate limit exceeded. Maximum {get_settings().requests_per_minute_per_user} "
-                "requests per minute allowed."
+                f"Rate limit exceeded. Maximum {rate_limit.limit} requests per minute allowed."
             ),
-            headers={"Retry-After": "60"},
+            headers={"Retry-After": headers["X-RateLimit-Reset"], **headers},
         )
 
+    response.headers.update(headers)
+
+
+def get_embedding_resolver(request: Request) -> EmbeddingResolver:
+    """Get the process-wide resolver serving embeddings from cache or the model.
+
+    Args:
+        request: FastAPI request object.
+
+    Returns:
+        Shared embedding resolver instance.
+    """
+    return request.app.state.embedding_resolver
+
+
+def get_reduction_resolver(request: Request) -> ReductionResolver:
+    """Get the process-wide resolver serving layouts from cache or the fits.
+
+    Args:
+        request: FastAPI request object.
+
+    Returns:
+        Shared reduction resolver instance.
+    """
+    return request.app.state.reduction_resolver
+
 
 def get_posthog() -> posthog.Client:
     """Get PostHog client instance.
@@ -0,0 +1,447 @@
+"""Response bodies built straight from embedding and coordinate arrays."""
+
+from collections.abc import AsyncIterator, Callable, Mapping
+from typing import Any
+
+import msgpack
+import numpy as np
+import orjson
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from app.services.dimensionality import DIMENSIONS
+from app.services.reductions import Reductions
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Media types clients name MessagePack by
+_MSGPACK_MEDIA_TYPES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+
+# Media ranges JSON is acceptable under
+_JSON_MEDIA_RANGES = {"application/json", "application/*", "*/*"}
+
+# OpenAPI description of the formats a payload endpoint responds in besides JSON
+PAYLOAD_RESPONSES: dict[int | str, dict[str, Any]] = {
+    200: {"content": {MSGPACK_MEDIA_TYPE: {}}},
+}
+
+# OpenAPI description of the formats an embedding stream responds in
+EMBEDDING_STREAM_RESPONSES: dict[int | str, dict[str, Any]] = {
+    200: {
+        "description": (
+            "One EmbeddingResult per line, or per MessagePack object, ending with an "
+            "error record if resolving the texts failed midway"
+        ),
+        "content": {NDJSON_MEDIA_TYPE: {}, MSGPACK_MEDIA_TYPE: {}},
+    },
+}
+
+
+class PayloadJSONResponse(JSONResponse):
+    """JSON response serializing payloads with orjson, NumPy arrays included.
+
+    Returning it from an endpoint bypasses FastAPI's validation and serialization
+    against the response model, which the payload already follows. Arrays are
+    written straight from their buffers, float32 ones in their shortest form.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """Serialize the payload.
+
+        Args:
+            content: Payload of Python values and C-contiguous NumPy arrays.
+
+        Returns:
+            JSON-encoded payload.
+        """
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+class PayloadMsgpackResponse(Response):
+    """MessagePack response with floats encoded in single precision.
+
+    The body has the same structure as the JSON one, at a quarter of its size for
+    embeddings, and is cheaper to encode and decode.
+    """
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        """Serialize the payload.
+
+        Args:
+            content: Payload of Python values and NumPy arrays.
+
+        Returns:
+            MessagePack-encoded payload.
+        """
+        return msgpack.packb(content, default=_array_values, use_single_float=True)
+
+
+def _array_values(value: Any) -> Any:
+    """Convert NumPy arrays to Python values for encoders without native support.
+
+    Args:
+        value: Value the encoder cannot serialize.
+
+    Returns:
+        Nested lists of the array's values.
+
+    Raises:
+        TypeError: If the value is not a NumPy array.
+    """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _accepts_msgpack(accept: str | None) -> bool:
+    """Check whether an Accept header prefers MessagePack over JSON.
+
+    MessagePack is only chosen when asked for by name, with at least the quality
+    JSON is accepted with, so clients not asking for it keep getting JSON.
+
+    Args:
+        accept: Value of the Accept header, if any.
+
+    Returns:
+        True if the response should be encoded as MessagePack.
+    """
+    if not accept:
+        return False
+
+    msgpack_quality = json_quality = 0.0
+    for media_range in accept.split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = media_type.lower()
+        if media_type in _MSGPACK_MEDIA_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type in _JSON_MEDIA_RANGES:
+            json_quality = max(json_quality, quality)
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+
+def payload_response(
+    payload: dict[str, Any],
+    accept: str | None = None,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """Serialize a payload in the format the client asked for.
+
+    Args:
+        payload: Response body of Python values and NumPy arrays.
+        accept: Value of the request's Accept header, if any.
+        headers: Further headers to send, such as those set by dependencies on the
+            injected response, which FastAPI drops when a response is returned.
+
+    Returns:
+        MessagePack response if the client prefers it, JSON response otherwise.
+    """
+    response_class = PayloadMsgpackResponse if _accepts_msgpack(accept) else PayloadJSONResponse
+    return response_class(payload, headers={**(headers or {}), "Vary": "Accept"})
+
+
+def _values(array: np.ndarray, precision: int | None) -> list:
+    """Convert an array to Python values, rounded to a number of decimals.
+
+    Args:
+        array: Array of embeddings or coordinates.
+        precision: Number of decimals to round to, None for full precision.
+
+    Returns:
+        Nested lists of the array's values.
+    """
+    if precision is None:
+        return np.asarray(array).tolist()
+    return _array(array, precision).tolist()
+
+
+def _array(array: np.ndarray, precision: int | None) -> np.ndarray:
+    """Get an array as the response classes serialize it, rounded to a number of decimals.
+
+    Args:
+        array: Array of embeddings or coordinates.
+        precision: Number of decimals to round to, None for full precision.
+
+    Returns:
+        C-contiguous array of the values.
+    """
+    if precision is None:
+        return np.ascontiguousarray(array)
+    # Rounding in double precision keeps the shortest decimal representation
+    return np.ascontiguousarray(np.round(np.asarray(array, dtype=np.float64), precision))
+
+
+def _embedding_matrix(
+    labels: list[str], embeddings: dict[str, np.ndarray], precision: int | None
+) -> np.ndarray:
+    """Stack the embeddings of items into a matrix.
+
+    Args:
+        labels: Labels of the items.
+        embeddings: Dictionary mapping labels to embeddings.
+        precision: Number of decimals to round to, None for full precision.
+
+    Returns:
+        C-contiguous matrix of embeddings, one row per item.
+    """
+    return _array(np.asarray([embeddings[label] for label in labels]), precision)
+
+
+def _points(
+    coords: np.ndarray | None, n_items: int, precision: int | None = None
+) -> list[dict[str, float] | None]:
+    """Convert a whole-dataset layout to the coordinates of each item.
+
+    Args:
+        coords: Array of 2D or 3D coordinates, if computed.
+        n_items: Number of items laid out.
+        precision: Number of decimals to round to, None for full precision.
+
+    Returns:
+        Coordinates of each item, None for every item if not computed.
+    """
+    if coords is None:
+        return [None] * n_items
+    axes = ("x", "y", "z")[: coords.shape[1]]
+    return [dict(zip(axes, point, strict=True)) for point in _values(coords, precision)]
+
+
+def visualization_payload(
+    labels: list[str],
+    embeddings: dict[str, np.ndarray] | None,
+    reductions: Reductions,
+    layout_id: str | None = None,
+    precision: int | None = None,
+    embeddings_id: str | None = None,
+) -> dict[str, Any]:
+    """Build the body of a visualization response, following VisualizationResponse.
+
+    Items are assembled as plain dicts rather than as models validated once on
+    construction and again by FastAPI on serialization. Coordinates are converted
+    to Python values in one step per layout, and embeddings are left as rows of one
+    array for the response class to write out.
+
+    Args:
+        labels: Labels of the items, in the order of the layouts.
+        embeddings: Dictionary mapping labels to embeddings, None to leave them out.
+        reductions: Dictionary mapping algorithm names to (2D coordinates, 3D
+            coordinates) of the items, None where not requested.
+        layout_id: Handle of the layout the items are placed in.
+        precision: Number of decimals to round embeddings and coordinates to, None
+            for full precision.
+        embeddings_id: Handle for fetching the embeddings, if left out.
+
+    Returns:
+        Response body of Python values and NumPy arrays.
+    """
+    n_items = len(labels)
+    columns = [
+        [
+            {"algorithm": algorithm, "coordinates_2d": point_2d, "coordinates_3d": point_3d}
+            for point_2d, point_3d in zip(
+                _points(coords_2d, n_items, precision),
+                _points(coords_3d, n_items, precision),
+                strict=True,
+            )
+        ]
+        for algorithm, (coords_2d, coords_3d) in reductions.items()
+    ]
+    embedding_rows = (
+        [None] * n_items
+        if embeddings is None
+        else list(_embedding_matrix(labels, embeddings, precision))
+    )
+
+    return {
+        "results": [
+            {"label": label, "embedding": embedding, "reductions": list(item_reductions)}
+            for label, embedding, item_reductions in zip(
+                labels, embedding_rows, zip(*columns, strict=True), strict=True
+            )
+        ],
+        "layout_id": layout_id,
+        "embeddings_id": embeddings_id,
+    }
+
+
+def columnar_payload(
+    labels: list[str],
+    embeddings: dict[str, np.ndarray] | None,
+    reductions: Reductions,
+    layout_id: str | None = None,
+    precision: int | None = None,
+    embeddings_id: str | None = None,
+) -> dict[str, Any]:
+    """Build the body of a columnar visualization response, following VisualizationResponseV2.
+
+    Each layout is transposed into one flat array per axis, so the body is a handful
+    of arrays written out by the response class rather than an object per item.
+
+    Args:
+        labels: Labels of the items, in the order of the layouts.
+        embeddings: Dictionary mapping labels to embeddings, None to leave them out.
+        reductions: Dictionary mapping algorithm names to (2D coordinates, 3D
+            coordinates) of the items, None where not requested.
+        layout_id: Handle of the layout the items are placed in.
+        precision: Number of decimals to round embeddings and coordinates to, None
+            for full precision.
+        embeddings_id: Handle for fetching the embeddings, if left out.
+
+    Returns:
+        Response body of Python values and NumPy arrays.
+    """
+    layouts = []
+    for algorithm, coords in reductions.items():
+        for dimension, layout in zip(DIMENSIONS, coords, strict=True):
+            if layout is None:
+                continue
+            axes = _array(np.asarray(layout).T, precision)
+            layouts.append(
+                {
+                    "algorithm": algorithm,
+                    "dimension": dimension,
+                    "x": axes[0],
+                    "y": axes[1],
+                    "z": axes[2] if dimension == 3 else None,
+                }
+            )
+
+    return {
+        "version": 2,
+        "labels": labels,
+        "embeddings": None
+        if embeddings is None
+        else _embedding_matrix(labels, embeddings, precision),
+        "layouts": layouts,
+        "layout_id": layout_id,
+        "embeddings_id": embeddings_id,
+    }
+
+
+# Builders of the visualization response body of each response version
+VISUALIZATION_PAYLOADS: dict[int, Callable[..., dict[str, Any]]] = {
+    1: visualization_payload,
+    2: columnar_payload,
+}
+
+
+def embeddings_payload(
+    labels: list[str], embeddings: dict[str, np.ndarray], precision: int | None = None
+) -> dict[str, Any]:
+    """Build the body of an embeddings response, following EmbeddingsResponse.
+
+    Args:
+        labels: Labels of the items.
+        embeddings: Dictionary mapping labels to embeddings.
+        precision: Number of decimals to round embeddings to, None for full precision.
+
+    Returns:
+        Response body of Python values and NumPy arrays.
+    """
+    embedding_rows = _embedding_matrix(labels, embeddings, precision)
+    return {
+        "results": [
+            {"label": label, "embedding": embedding}
+            for label, embedding in zip(labels, embedding_rows, strict=True)
+        ]
+    }
+
+
+def _embedding_records(
+    labels: list[str],
+    embeddings: dict[str, np.ndarray],
+    precision: int | None,
+    binary: bool,
+) -> bytes:
+    """Encode embeddings as records of an embedding stream, following EmbeddingResult.
+
+    Args:
+        labels: Labels of the items.
+        embeddings: Dictionary mapping labels to embeddings.
+        precision: Number of decimals to round embeddings to, None for full precision.
+        binary: Whether to encode the records as MessagePack objects rather than
+            JSON lines.
+
+    Returns:
+        Concatenated records, one per item.
+    """
+    rows = _embedding_matrix(labels, embeddings, precision)
+    if binary:
+        packer = msgpack.Packer(default=_array_values, use_single_float=True)
+        return b"".join(
+            packer.pack({"label": label, "embedding": row})
+            for label, row in zip(labels, rows, strict=True)
+        )
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+    return b"".join(
+        orjson.dumps({"label": label, "embedding": row}, option=option)
+        for label, row in zip(labels, rows, strict=True)
+    )
+
+
+def _error_record(detail: str, binary: bool) -> bytes:
+    """Encode a failure as the last record of an embedding stream.
+
+    Args:
+        detail: Description of the failure.
+        binary: Whether to encode the record as a MessagePack object rather than a
+            JSON line.
+
+    Returns:
+        Record with the failure under "error".
+    """
+    if binary:
+        return msgpack.packb({"error": detail})
+    return orjson.dumps({"error": detail}, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def embeddings_stream(
+    chunks: AsyncIterator[tuple[list[str], dict[str, np.ndarray]]],
+    precision: int | None = None,
+    accept: str | None = None,
+    headers: Mapping[str, str] | None = None,
+) -> StreamingResponse:
+    """Stream embeddings chunk by chunk in the format the client asked for.
+
+    Each chunk is encoded and sent as soon as it is resolved, so only the embeddings
+    of the chunks in flight are held in memory. The status code is sent with the
+    first chunk, so a failure in a later one ends the stream with an error record
+    instead.
+
+    Args:
+        chunks: Chunks of (labels, dictionary mapping labels to embeddings).
+        precision: Number of decimals to round embeddings to, None for full precision.
+        accept: Value of the request's Accept header, if any.
+        headers: Further headers to send, such as those set by dependencies.
+
+    Returns:
+        Response streaming concatenated MessagePack objects if the client prefers
+        them, JSON lines otherwise.
+    """
+    binary = _accepts_msgpack(accept)
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            async for labels, embeddings in chunks:
+                yield _embedding_records(labels, embeddings, precision, binary)
+        except Exception as e:
+            logger.error("Embedding stream failed: %s", e)
+            yield _error_record(f"Failed to process text: {str(e)}", binary)
+
+    return StreamingResponse(
+        body(),
+        media_type=MSGPACK_MEDIA_TYPE if binary else NDJSON_MEDIA_TYPE,
+        headers={**(headers or {}), "Vary": "Accept"},
+    )
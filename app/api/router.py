@@ -1,19 +1,44 @@
 """FastAPI router for the embedding visualization API."""
 
+import asyncio
+from collections.abc import AsyncIterator, Sequence
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import numpy as np
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 
-from app.api.dependencies import check_rate_limit, track_event, verify_auth_token
+from app.api.dependencies import (
+    check_rate_limit,
+    get_embedding_resolver,
+    get_reduction_resolver,
+    track_event,
+    verify_auth_token,
+)
+from app.api.responses import (
+    EMBEDDING_STREAM_RESPONSES,
+    PAYLOAD_RESPONSES,
+    VISUALIZATION_PAYLOADS,
+    embeddings_payload,
+    embeddings_stream,
+    payload_response,
+)
 from app.config import get_settings
 from app.models.schemas import (
-    ItemResult,
+    EmbeddingsRequest,
+    EmbeddingsResponse,
+    EmbedRequest,
+    ExtendVisualizationRequest,
+    TextInput,
     VisualizationRequest,
     VisualizationResponse,
+    VisualizationResponseV2,
 )
+from app.services.batching import EmbeddingBatcher
 from app.services.cache import CacheService
-from app.services.dimensionality import DimensionalityReductionService
 from app.services.embedding import EmbeddingService
+from app.services.reductions import ReductionResolver, Reductions
+from app.services.resolver import EmbeddingResolver
 
 router = APIRouter(prefix=get_settings().api_prefix)
 
@@ -28,9 +53,108 @@ async def health_check() -> dict[str, str]:
     return {"status": "healthy"}
 
 
+@router.get("/ready")
+async def readiness_check(request: Request, response: Response) -> dict[str, str]:
+    """Readiness check endpoint.
+
+    Reports whether the embedding model has been loaded and warmed up, so a worker
+    is only sent traffic once it can serve requests without a cold start.
+
+    Args:
+        request: FastAPI request object.
+        response: Response object used to set the status code.
+
+    Returns:
+        Dictionary with readiness status and model warm/cold status.
+    """
+    embedding_service: EmbeddingService | None = getattr(
+        request.app.state, "embedding_service", None
+    )
+    model_status = embedding_service.status if embedding_service else "cold"
+    if model_status != "warm":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "not ready", "model": model_status}
+    return {"status": "ready", "model": model_status}
+
+
+@router.get("/stats")
+async def stats(request: Request) -> dict[str, dict[str, float]]:
+    """Runtime statistics endpoint.
+
+    Args:
+        request: FastAPI request object.
+
+    Returns:
+        Dictionary of statistics per component.
+    """
+    embedding_batcher: EmbeddingBatcher | None = getattr(
+        request.app.state, "embedding_batcher", None
+    )
+    cache_service: CacheService | None = getattr(request.app.state, "cache_service", None)
+    reduction_resolver: ReductionResolver | None = getattr(
+        request.app.state, "reduction_resolver", None
+    )
+    return {
+        "embedding_batcher": embedding_batcher.stats() if embedding_batcher else {},
+        "cache": cache_service.stats() if cache_service else {},
+        "reductions": (
+            reduction_resolver.dim_reduction_service.stats() if reduction_resolver else {}
+        ),
+        "warm_up_seconds": getattr(request.app.state, "warm_up_seconds", {}),
+    }
+
+
+def _check_text_count(texts: Sequence[TextInput], max_texts: int) -> None:
+    """Check a request does not exceed the number of texts a request may have.
+
+    Args:
+        texts: Input texts.
+        max_texts: Maximum number of texts allowed.
+
+    Raises:
+        HTTPException: If there are more texts than allowed.
+    """
+    if len(texts) > max_texts:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {max_texts} texts are allowed per request",
+        )
+
+
+def _in_request_order(reductions: Reductions, labels: list[str], rows: list[str]) -> Reductions:
+    """Get the layout rows of the requested texts, repeating the rows of repeated texts.
+
+    Layouts have one row per distinct text, while responses have one item per
+    requested text.
+
+    Args:
+        reductions: Dictionary mapping algorithm names to (2D coordinates, 3D
+            coordinates), one row per distinct text.
+        labels: Requested texts, in request order.
+        rows: Distinct texts, in layout row order.
+
+    Returns:
+        Dictionary mapping algorithm names to (2D coordinates, 3D coordinates), one row
+        per requested text.
+    """
+    if len(labels) == len(rows):
+        return reductions
+
+    index = {label: i for i, label in enumerate(rows)}
+    order = np.array([index[label] for label in labels])
+    return {
+        algorithm: (
+            None if coords_2d is None else coords_2d[order],
+            None if coords_3d is None else coords_3d[order],
+        )
+        for algorithm, (coords_2d, coords_3d) in reductions.items()
+    }
+
+
 @router.post(
     "/visualize",
-    response_model=VisualizationResponse,
+    response_model=VisualizationResponse | VisualizationResponseV2,
+    responses=PAYLOAD_RESPONSES,
     dependencies=[
         Depends(verify_auth_token),
         Depends(check_rate_limit),
@@ -39,65 +163,283 @@ async def health_check() -> dict[str, str]:
 )
 async def visualize_text(
     request: VisualizationRequest,
-    embedding_service: Annotated[EmbeddingService, Depends()],
-    dim_reduction_service: Annotated[DimensionalityReductionService, Depends()],
-    cache_service: Annotated[CacheService, Depends()],
-) -> VisualizationResponse:
+    embedding_resolver: Annotated[EmbeddingResolver, Depends(get_embedding_resolver)],
+    reduction_resolver: Annotated[ReductionResolver, Depends(get_reduction_resolver)],
+    response: Response,
+    accept: Annotated[str | None, Header()] = None,
+) -> Response:
     """Generate embeddings and low dimension representations of embeddings for input texts.
 
     Args:
         request: Visualization request containing input texts.
-        embedding_service: Service for generating embeddings.
-        dim_reduction_service: Service for dimensionality reduction.
-        cache_service: Service for caching results.
+        embedding_resolver: Service serving embeddings from cache or the model.
+        reduction_resolver: Service serving layouts from cache or the fits.
+        response: Response whose headers, such as rate limit headers, are sent.
+        accept: Accept header, choosing between JSON and MessagePack responses.
 
     Returns:
-        Visualization response with embeddings and reduced dimensions.
+        Visualization response of the requested version, with embeddings and reduced
+        dimensions.
 
     Raises:
-        HTTPException: If text processing fails.
+        HTTPException: If there are too many texts, or text processing fails.
     """
+    _check_text_count(request.texts, get_settings().max_texts)
+
     try:
-        # Extract text content from request
-        text_contents = [text.text for text in request.texts]
-
-        # Check cache first
-        cached_embeddings = await cache_service.get_embeddings(text_contents)
-
-        # Determine which texts need new embeddings
-        missing_texts = []
-        for text_input in request.texts:
-            if text_input.text not in cached_embeddings:
-                missing_texts.append(text_input)
-
-        # Generate embeddings for missing texts
-        if missing_texts:
-            new_embeddings = embedding_service.generate_embeddings(missing_texts)
-            # Store new embeddings in cache
-            await cache_service.store_embeddings(new_embeddings)
-            # Merge with cached embeddings
-            embeddings = {**cached_embeddings, **new_embeddings}
-        else:
-            embeddings = cached_embeddings
-
-        # Perform dimensionality reduction for all items
-        all_reductions = dim_reduction_service.reduce_all(embeddings)
-
-        # Create item results
-        item_results = []
-        for i, text in enumerate(request.texts):
-            item_results.append(
-                ItemResult(
-                    label=text.text,
-                    embedding=embeddings[text.text],
-                    reductions=all_reductions[i],
+        # Get embeddings from cache, generating missing ones
+        embeddings = await embedding_resolver.get_embeddings(request.texts)
+
+        # Get the requested layouts from cache, computing missing ones
+        layout_id = await reduction_resolver.register_layout(list(embeddings))
+        reductions = await reduction_resolver.get_reductions(
+            layout_id, embeddings, request.algorithms, request.dimensions
+        )
+
+        labels = [text.text for text in request.texts]
+        return payload_response(
+            VISUALIZATION_PAYLOADS[request.version](
+                labels,
+                embeddings if request.embeddings == "inline" else None,
+                _in_request_order(reductions, labels, list(embeddings)),
+                layout_id,
+                request.precision,
+                layout_id if request.embeddings == "handle" else None,
+            ),
+            accept,
+            response.headers,
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process text: {str(e)}",
+        ) from e
+
+
+@router.post(
+    "/visualize/extend",
+    response_model=VisualizationResponse | VisualizationResponseV2,
+    responses=PAYLOAD_RESPONSES,
+    dependencies=[
+        Depends(verify_auth_token),
+        Depends(check_rate_limit),
+        Depends(track_event),
+    ],
+)
+async def extend_visualization(
+    request: ExtendVisualizationRequest,
+    embedding_resolver: Annotated[EmbeddingResolver, Depends(get_embedding_resolver)],
+    reduction_resolver: Annotated[ReductionResolver, Depends(get_reduction_resolver)],
+    response: Response,
+    accept: Annotated[str | None, Header()] = None,
+) -> Response:
+    """Add texts to an existing layout without moving the points already in it.
+
+    Args:
+        request: Request containing the layout ID and the texts to add.
+        embedding_resolver: Service serving embeddings from cache or the model.
+        reduction_resolver: Service placing new points into existing layouts.
+        response: Response whose headers, such as rate limit headers, are sent.
+        accept: Accept header, choosing between JSON and MessagePack responses.
+
+    Returns:
+        Visualization response of the requested version, with embeddings and reduced
+        dimensions of the new texts.
+
+    Raises:
+        HTTPException: If there are too many texts, the layout is unknown or expired, or
+            text processing fails.
+    """
+    _check_text_count(request.texts, get_settings().max_texts)
+
+    layout_texts = await reduction_resolver.get_layout_texts(request.layout_id)
+    if layout_texts is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown or expired layout, visualize the texts again to get a new one",
+        )
+
+    try:
+        reference = await embedding_resolver.get_embeddings(
+            [TextInput(text=text) for text in layout_texts]
+        )
+        embeddings = await embedding_resolver.get_embeddings(request.texts)
+
+        # Place the new texts with models fitted on the layout's texts
+        reductions = await reduction_resolver.extend(
+            request.layout_id, reference, embeddings, request.algorithms, request.dimensions
+        )
+
+        # The new texts are remembered like a layout's, under a handle of their own
+        embeddings_id = None
+        if request.embeddings == "handle":
+            embeddings_id = await reduction_resolver.register_layout(list(embeddings))
+
+        labels = [text.text for text in request.texts]
+        return payload_response(
+            VISUALIZATION_PAYLOADS[request.version](
+                labels,
+                embeddings if request.embeddings == "inline" else None,
+                _in_request_order(reductions, labels, list(embeddings)),
+                request.layout_id,
+                request.precision,
+                embeddings_id,
+            ),
+            accept,
+            response.headers,
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process text: {str(e)}",
+        ) from e
+
+
+@router.post(
+    "/visualize/embeddings",
+    response_model=EmbeddingsResponse,
+    responses=PAYLOAD_RESPONSES,
+    dependencies=[
+        Depends(verify_auth_token),
+        Depends(check_rate_limit),
+        Depends(track_event),
+    ],
+)
+async def get_visualization_embeddings(
+    request: EmbeddingsRequest,
+    embedding_resolver: Annotated[EmbeddingResolver, Depends(get_embedding_resolver)],
+    reduction_resolver: Annotated[ReductionResolver, Depends(get_reduction_resolver)],
+    response: Response,
+    accept: Annotated[str | None, Header()] = None,
+) -> Response:
+    """Get the embeddings behind a handle from a visualization response.
+
+    Args:
+        request: Request containing the embeddings ID.
+        embedding_resolver: Service serving embeddings from cache or the model.
+        reduction_resolver: Service remembering the texts behind handles.
+        response: Response whose headers, such as rate limit headers, are sent.
+        accept: Accept header, choosing between JSON and MessagePack responses.
+
+    Returns:
+        Embeddings of the texts behind the handle.
+
+    Raises:
+        HTTPException: If the handle is unknown or expired, or text processing fails.
+    """
+    texts = await reduction_resolver.get_layout_texts(request.embeddings_id)
+    if texts is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown or expired embeddings, visualize the texts again to get a new handle",
+        )
+
+    try:
+        embeddings = await embedding_resolver.get_embeddings(
+            [TextInput(text=text) for text in texts]
+        )
+        return payload_response(
+            embeddings_payload(texts, embeddings, request.precision), accept, response.headers
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process text: {str(e)}",
+        ) from e
+
+
+async def _resolve_chunks(
+    chunks: Sequence[Sequence[TextInput]],
+    first: dict[str, np.ndarray],
+    embedding_resolver: EmbeddingResolver,
+) -> AsyncIterator[tuple[list[str], dict[str, np.ndarray]]]:
+    """Get embeddings chunk by chunk, resolving each chunk while the previous one is sent.
+
+    Args:
+        chunks: Chunks of input texts.
+        first: Embeddings of the first chunk, already resolved.
+        embedding_resolver: Service serving embeddings from cache or the model.
+
+    Yields:
+        Tuples of (labels, dictionary mapping labels to embeddings) per chunk.
+    """
+    embeddings = first
+    pending: asyncio.Future[dict[str, np.ndarray]] | None = None
+    try:
+        for index, chunk in enumerate(chunks):
+            if index + 1 < len(chunks):
+                pending = asyncio.ensure_future(
+                    embedding_resolver.get_embeddings(chunks[index + 1])
                 )
-            )
+            yield [text.text for text in chunk], embeddings
+            if pending is not None:
+                embeddings = await pending
+                pending = None
+    finally:
+        # Stop resolving ahead if the client went away
+        if pending is not None:
+            pending.cancel()
+
+
+@router.post(
+    "/embed",
+    response_class=StreamingResponse,
+    responses=EMBEDDING_STREAM_RESPONSES,
+    dependencies=[
+        Depends(verify_auth_token),
+        Depends(check_rate_limit),
+        Depends(track_event),
+    ],
+)
+async def embed_texts(
+    request: EmbedRequest,
+    embedding_resolver: Annotated[EmbeddingResolver, Depends(get_embedding_resolver)],
+    response: Response,
+    accept: Annotated[str | None, Header()] = None,
+) -> StreamingResponse:
+    """Generate embeddings for a batch of texts, streaming them back as they are resolved.
+
+    Texts are resolved in chunks through the embedding cache and the shared model, so
+    the response starts after the first chunk and only the embeddings of the chunks in
+    flight are held at once. A failure after the first chunk ends the stream with an
+    error record, as the status code has already been sent.
 
-        return VisualizationResponse(results=item_results)
+    Args:
+        request: Request containing the input texts.
+        embedding_resolver: Service serving embeddings from cache or the model.
+        response: Response whose headers, such as rate limit headers, are sent.
+        accept: Accept header, choosing between JSON lines and MessagePack objects.
 
+    Returns:
+        Response streaming one embedding result per text, in request order.
+
+    Raises:
+        HTTPException: If there are too many texts, or the first chunk fails.
+    """
+    settings = get_settings()
+    _check_text_count(request.texts, settings.embed_max_texts)
+
+    chunk_size = settings.embed_chunk_size
+    chunks = [
+        request.texts[start : start + chunk_size]
+        for start in range(0, len(request.texts), chunk_size)
+    ]
+
+    # Fail with a status code while one can still be sent
+    try:
+        first = await embedding_resolver.get_embeddings(chunks[0])
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process text: {str(e)}",
         ) from e
+
+    return embeddings_stream(
+        _resolve_chunks(chunks, first, embedding_resolver),
+        request.precision,
+        accept,
+        response.headers,
+    )
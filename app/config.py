@@ -1,6 +1,7 @@
 """Configuration settings for the embedding visualizer."""
 
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -33,6 +34,30 @@ class Settings(BaseSettings):
     cache_db: int = Field(default=0, validation_alias="APP_CACHE_DB")
     cache_password: str = Field(default="", validation_alias="APP_CACHE_PASSWORD")
     cache_ttl_seconds: int = Field(default=3600, gt=0, validation_alias="APP_CACHE_TTL_SECONDS")
+    cache_memory_max_entries: int = Field(
+        default=10_000, ge=0, validation_alias="APP_CACHE_MEMORY_MAX_ENTRIES"
+    )
+    cache_memory_max_bytes: int = Field(
+        default=64 * 1024 * 1024, ge=0, validation_alias="APP_CACHE_MEMORY_MAX_BYTES"
+    )
+    cache_max_connections: int = Field(
+        default=50, gt=0, validation_alias="APP_CACHE_MAX_CONNECTIONS"
+    )
+    cache_socket_timeout_seconds: float = Field(
+        default=2.0, gt=0, validation_alias="APP_CACHE_SOCKET_TIMEOUT_SECONDS"
+    )
+    cache_socket_connect_timeout_seconds: float = Field(
+        default=2.0, gt=0, validation_alias="APP_CACHE_SOCKET_CONNECT_TIMEOUT_SECONDS"
+    )
+    cache_embedding_dtype: Literal["float32", "float16"] = Field(
+        default="float32", validation_alias="APP_CACHE_EMBEDDING_DTYPE"
+    )
+    cache_signing_key: str = Field(default="", validation_alias="APP_CACHE_SIGNING_KEY")
+
+    # Request Limits
+    max_texts: int = Field(default=100, gt=0, validation_alias="APP_MAX_TEXTS")
+    embed_max_texts: int = Field(default=10_000, gt=0, validation_alias="APP_EMBED_MAX_TEXTS")
+    embed_chunk_size: int = Field(default=256, gt=0, validation_alias="APP_EMBED_CHUNK_SIZE")
 
     # Rate Limiting
     requests_per_minute_per_user: int = Field(
@@ -41,6 +66,35 @@ class Settings(BaseSettings):
 
     # Model Configuration
     model_name: str = Field(default="all-MiniLM-L6-v2", validation_alias="APP_MODEL_NAME")
+    model_revision: str = Field(default="main", validation_alias="APP_MODEL_REVISION")
+
+    # Inference Configuration
+    inference_workers: int = Field(default=2, gt=0, validation_alias="APP_INFERENCE_WORKERS")
+    embedding_batch_max_size: int = Field(
+        default=256, gt=0, validation_alias="APP_EMBEDDING_BATCH_MAX_SIZE"
+    )
+    embedding_batch_max_wait_ms: float = Field(
+        default=5.0, ge=0, validation_alias="APP_EMBEDDING_BATCH_MAX_WAIT_MS"
+    )
+    embedding_lock_ttl_ms: int = Field(
+        default=10_000, gt=0, validation_alias="APP_EMBEDDING_LOCK_TTL_MS"
+    )
+    embedding_lock_poll_ms: int = Field(
+        default=50, gt=0, validation_alias="APP_EMBEDDING_LOCK_POLL_MS"
+    )
+
+    # Dimensionality Reduction Configuration
+    reduction_concurrency: int = Field(
+        default=2, gt=0, validation_alias="APP_REDUCTION_CONCURRENCY"
+    )
+    reduction_workers: int = Field(default=0, ge=0, validation_alias="APP_REDUCTION_WORKERS")
+    reduction_threads_per_worker: int = Field(
+        default=1, gt=0, validation_alias="APP_REDUCTION_THREADS_PER_WORKER"
+    )
+    reduction_warm_up: bool = Field(default=True, validation_alias="APP_REDUCTION_WARM_UP")
+    reduction_fit_max_samples: int = Field(
+        default=10_000, gt=0, validation_alias="APP_REDUCTION_FIT_MAX_SAMPLES"
+    )
 
     model_config = SettingsConfigDict(
         env_file=".env",
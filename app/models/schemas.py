@@ -4,6 +4,11 @@ from typing import Literal
 
 from pydantic import BaseModel, Field
 
+Algorithm = Literal["pca", "tsne", "umap"]
+Dimension = Literal[2, 3]
+EmbeddingsOutput = Literal["inline", "omit", "handle"]
+ResponseVersion = Literal[1, 2]
+
 
 class TextInput(BaseModel):
     """Input text for embedding generation."""
@@ -11,6 +16,15 @@ class TextInput(BaseModel):
     text: str = Field(..., min_length=1, max_length=100)
 
 
+class EmbedTextInput(TextInput):
+    """Input text for embedding generation only, which may be longer.
+
+    Texts beyond the model's maximum sequence length are truncated by the model.
+    """
+
+    text: str = Field(..., min_length=1, max_length=1000)
+
+
 class Coordinates2D(BaseModel):
     """2D coordinates from dimensionality reduction."""
 
@@ -27,28 +41,126 @@ class Coordinates3D(BaseModel):
 
 
 class DimensionalityReductionResult(BaseModel):
-    """Result of a single dimensionality reduction algorithm."""
+    """Result of a single dimensionality reduction algorithm.
 
-    algorithm: Literal["pca", "tsne", "umap"]
-    coordinates_2d: Coordinates2D
-    coordinates_3d: Coordinates3D
+    Coordinates are only set for the dimensions that were requested.
+    """
+
+    algorithm: Algorithm
+    coordinates_2d: Coordinates2D | None = None
+    coordinates_3d: Coordinates3D | None = None
 
 
 class VisualizationRequest(BaseModel):
-    """Request for text visualization."""
+    """Request for text visualization.
+
+    The number of texts is limited by the max_texts setting. Embeddings are returned
+    inline by default, can be omitted, or replaced by a handle for fetching them
+    later. Precision rounds embeddings and coordinates to that many decimals. Version
+    2 returns the columnar VisualizationResponseV2 instead of VisualizationResponse.
+    """
+
+    texts: list[TextInput] = Field(..., min_length=3)
+    algorithms: list[Algorithm] = Field(default=["pca", "tsne", "umap"], min_length=1)
+    dimensions: list[Dimension] = Field(default=[2, 3], min_length=1)
+    embeddings: EmbeddingsOutput = "inline"
+    precision: int | None = Field(default=None, ge=0, le=15)
+    version: ResponseVersion = 1
+
+
+class ExtendVisualizationRequest(BaseModel):
+    """Request for adding texts to an existing layout.
 
-    texts: list[TextInput] = Field(..., min_length=3, max_length=100)
+    The number of texts is limited by the max_texts setting. Embeddings, precision and
+    version are handled as in visualization requests.
+    """
+
+    layout_id: str = Field(..., pattern=r"^[0-9a-f]{64}$")
+    texts: list[TextInput] = Field(..., min_length=1)
+    algorithms: list[Algorithm] = Field(default=["pca", "tsne", "umap"], min_length=1)
+    dimensions: list[Dimension] = Field(default=[2, 3], min_length=1)
+    embeddings: EmbeddingsOutput = "inline"
+    precision: int | None = Field(default=None, ge=0, le=15)
+    version: ResponseVersion = 1
+
+
+class EmbedRequest(BaseModel):
+    """Request for embeddings of a batch of texts.
+
+    The number of texts is limited by the embed_max_texts setting. Precision rounds
+    embeddings to that many decimals.
+    """
+
+    texts: list[EmbedTextInput] = Field(..., min_length=1)
+    precision: int | None = Field(default=None, ge=0, le=15)
+
+
+class EmbeddingsRequest(BaseModel):
+    """Request for the embeddings behind a handle from a visualization response."""
+
+    embeddings_id: str = Field(..., pattern=r"^[0-9a-f]{64}$")
+    precision: int | None = Field(default=None, ge=0, le=15)
 
 
 class ItemResult(BaseModel):
-    """Result for a single item."""
+    """Result for a single item.
+
+    The embedding is None if it was omitted or returned by handle.
+    """
 
     label: str
-    embedding: list[float]
-    reductions: list[DimensionalityReductionResult] = Field(..., min_length=3, max_length=3)
+    embedding: list[float] | None = None
+    reductions: list[DimensionalityReductionResult] = Field(..., min_length=1, max_length=3)
 
 
 class VisualizationResponse(BaseModel):
-    """Response containing embeddings and dimensionality reduction results for all items."""
+    """Response containing embeddings and dimensionality reduction results for all items.
+
+    The layout ID identifies the layout the items are placed in, for adding texts later.
+    The embeddings ID is set if embeddings were requested by handle.
+    """
 
     results: list[ItemResult]
+    layout_id: str | None = None
+    embeddings_id: str | None = None
+
+
+class Layout(BaseModel):
+    """Coordinates of all items from one algorithm in one dimension.
+
+    Each axis is a flat array aligned to the labels of the response.
+    """
+
+    algorithm: Algorithm
+    dimension: Dimension
+    x: list[float]
+    y: list[float]
+    z: list[float] | None = None
+
+
+class VisualizationResponseV2(BaseModel):
+    """Columnar response containing embeddings and layouts of all items.
+
+    Embeddings and layout coordinates are aligned to the labels. Embeddings are None if
+    they were omitted or returned by handle.
+    """
+
+    version: Literal[2] = 2
+    labels: list[str]
+    embeddings: list[list[float]] | None = None
+    layouts: list[Layout]
+    layout_id: str | None = None
+    embeddings_id: str | None = None
+
+
+class EmbeddingResult(BaseModel):
+    """Embedding of a single item."""
+
+    label: str
+    embedding: list[float]
+
+
+class EmbeddingsResponse(BaseModel):
+    """Response containing the embeddings behind a handle."""
+
+    results: list[EmbeddingResult]
@@ -0,0 +1,208 @@
+"""Service for micro-batching concurrent embedding requests."""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.models.schemas import TextInput
+from app.services.embedding import EmbeddingService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _PendingRequest:
+    """Texts submitted by a single caller, waiting to be encoded."""
+
+    texts: list[TextInput]
+    future: asyncio.Future[dict[str, np.ndarray]]
+    enqueued_at: float
+
+
+class EmbeddingBatcher:
+    """Merge texts from concurrent requests into shared model encode calls.
+
+    Callers submit their missing texts and await their own embeddings. A background
+    task collects submissions until either the batch is full or the wait window
+    has passed, encodes the merged (deduplicated) texts once and hands each caller
+    back exactly the vectors it asked for.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        executor: Executor | None,
+        max_batch_size: int,
+        max_wait_ms: float,
+    ):
+        """Initialize the batcher.
+
+        Args:
+            embedding_service: Service used to encode merged batches.
+            executor: Executor running the encode calls off the event loop.
+            max_batch_size: Maximum number of texts merged into one encode call.
+            max_wait_ms: Maximum time to wait for more requests after the first one.
+        """
+        self.embedding_service = embedding_service
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue: asyncio.Queue[_PendingRequest] = asyncio.Queue()
+        self._carry: _PendingRequest | None = None
+        self._worker: asyncio.Task[None] | None = None
+
+        # Statistics
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+        self.max_batch_texts = 0
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+
+    def start(self) -> None:
+        """Start the background batching task."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run(), name="embedding-batcher")
+
+    async def stop(self) -> None:
+        """Stop the background batching task and fail any pending requests."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        pending = [self._carry] if self._carry else []
+        self._carry = None
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for request in pending:
+            if not request.future.done():
+                request.future.set_exception(RuntimeError("Embedding batcher stopped"))
+
+    async def generate_embeddings(self, texts: list[TextInput]) -> dict[str, np.ndarray]:
+        """Generate embeddings for a list of texts as part of a shared batch.
+
+        Args:
+            texts: List of text inputs.
+
+        Returns:
+            Dictionary mapping text content to embeddings.
+        """
+        if not texts:
+            return {}
+
+        future: asyncio.Future[dict[str, np.ndarray]] = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingRequest(texts, future, time.perf_counter()))
+        return await future
+
+    def stats(self) -> dict[str, float]:
+        """Get batch-size and queue-wait statistics.
+
+        Returns:
+            Dictionary of batching statistics.
+        """
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "texts": self.texts,
+            "mean_batch_texts": self.texts / self.batches if self.batches else 0.0,
+            "max_batch_texts": self.max_batch_texts,
+            "mean_queue_wait_ms": 1000 * self.total_wait / self.requests if self.requests else 0.0,
+            "max_queue_wait_ms": 1000 * self.max_wait_seen,
+            "queued_requests": self._queue.qsize(),
+        }
+
+    async def _next_request(self, timeout: float | None) -> _PendingRequest:
+        """Get the next pending request, preferring one carried over from the last batch."""
+        if self._carry is not None:
+            request, self._carry = self._carry, None
+            return request
+        if timeout is None:
+            return await self._queue.get()
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+    async def _collect_batch(self) -> list[_PendingRequest]:
+        """Collect requests until the batch is full or the wait window has passed."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._next_request(None)]
+        batch_texts = len(batch[0].texts)
+        deadline = loop.time() + self.max_wait
+
+        while batch_texts < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                request = await self._next_request(timeout)
+            except TimeoutError:
+                break
+            if batch_texts + len(request.texts) > self.max_batch_size:
+                # Keep the request for the next batch rather than overflowing this one
+                self._carry = request
+                break
+            batch.append(request)
+            batch_texts += len(request.texts)
+
+        return batch
+
+    async def _run(self) -> None:
+        """Continuously collect and encode batches."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            started_at = time.perf_counter()
+
+            # Deduplicate texts across callers, skipping those that gave up waiting
+            live = [request for request in batch if not request.future.done()]
+            unique: dict[str, TextInput] = {}
+            for request in live:
+                for text in request.texts:
+                    unique.setdefault(text.text, text)
+            if not unique:
+                continue
+
+            try:
+                embeddings = await loop.run_in_executor(
+                    self.executor,
+                    self.embedding_service.generate_embeddings,
+                    list(unique.values()),
+                )
+            except Exception as e:
+                for request in live:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+
+            for request in live:
+                if not request.future.done():
+                    request.future.set_result(
+                        {text.text: embeddings[text.text] for text in request.texts}
+                    )
+
+            self._record(live, len(unique), started_at)
+
+    def _record(self, batch: list[_PendingRequest], batch_texts: int, started_at: float) -> None:
+        """Update statistics for an encoded batch."""
+        self.batches += 1
+        self.requests += len(batch)
+        self.texts += batch_texts
+        self.max_batch_texts = max(self.max_batch_texts, batch_texts)
+        for request in batch:
+            wait = started_at - request.enqueued_at
+            self.total_wait += wait
+            self.max_wait_seen = max(self.max_wait_seen, wait)
+
+        logger.debug(
+            "Encoded batch of %d texts from %d requests in %.1f ms",
+            batch_texts,
+            len(batch),
+            1000 * (time.perf_counter() - started_at),
+        )
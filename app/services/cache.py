@@ -1,41 +1,818 @@
 """Service for caching embeddings and rate limiting using Redis."""
 
+import asyncio
+import hashlib
+import hmac
 import json
+import math
+import pickle
+import re
+import struct
+import time
+import unicodedata
+import uuid
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import Executor
+from typing import Generic, NamedTuple, TypeVar
 
+import numpy as np
 import redis.asyncio as aioredis
 from redis.exceptions import ConnectionError, RedisError
 
-from app.config import get_settings
+from app.config import Settings, get_settings
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Binary embedding values are a small header followed by the raw little-endian vector:
+# magic bytes, format version and dtype code.
+_EMBEDDING_MAGIC = b"EV"
+_EMBEDDING_FORMAT_VERSION = 1
+_EMBEDDING_HEADER = struct.Struct("<2sBB")
+_EMBEDDING_DTYPES: dict[str, tuple[int, np.dtype]] = {
+    "float32": (0, np.dtype("<f4")),
+    "float16": (1, np.dtype("<f2")),
+}
+_EMBEDDING_DTYPE_CODES = dict(_EMBEDDING_DTYPES.values())
 
-class CacheService:
-    """Service for caching embeddings in Redis."""
+# Layout values are a header of magic bytes, format version and number of components,
+# followed by the raw little-endian float32 coordinates in row-major order.
+_LAYOUT_MAGIC = b"LV"
+_LAYOUT_FORMAT_VERSION = 1
+_LAYOUT_HEADER = struct.Struct("<2sBB")
+_LAYOUT_DTYPE = np.dtype("<f4")
+
+# Reducer values are an HMAC-SHA256 signature of the cache key and the pickled model,
+# followed by the pickle, so only models this application stored are ever unpickled.
+# Without a configured signing key, models are only kept in process memory.
+_REDUCER_SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+_RATE_LIMIT_WINDOW_MS = 60_000
+
+# Sliding-window log rate limiter, evaluated atomically in one round trip. Each
+# allowed request is a sorted-set member scored by its timestamp; members older
+# than the window are dropped before counting. Returns whether the request is
+# allowed, the number of requests in the window and the milliseconds until the
+# oldest of them leaves the window.
+_SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local member = ARGV[4]
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', key, now, member)
+    count = count + 1
+    allowed = 1
+end
+redis.call('PEXPIRE', key, window)
+
+local reset = window
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window - now
+end
+return {allowed, count, reset}
+"""
+
+
+# Releases a lock only if it is still held by the caller's token
+_RELEASE_LOCK_SCRIPT = """
+local released = 0
+for i, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        released = released + redis.call('DEL', key)
+    end
+end
+return released
+"""
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    used: int
+    limit: int
+    remaining: int
+    reset_seconds: float
+
+
+def _embedding_namespace(model_name: str, revision: str) -> str:
+    """Build the key prefix shared by all embeddings of one model revision.
+
+    Args:
+        model_name: Name of the embedding model.
+        revision: Revision of the embedding model.
+
+    Returns:
+        Key namespace for the model revision.
+    """
+    return f"embedding:{model_name}:{revision}"
+
+
+def _layout_namespace(model_name: str, revision: str) -> str:
+    """Build the key prefix shared by all layouts of one model revision.
+
+    Args:
+        model_name: Name of the embedding model.
+        revision: Revision of the embedding model.
+
+    Returns:
+        Key namespace for the model revision's layouts.
+    """
+    return f"layout:{model_name}:{revision}"
+
+
+def _text_digest(text: str) -> str:
+    """Hash a text into a fixed-length key component.
+
+    Texts are NFC-normalized first so canonically equivalent Unicode strings share a
+    cache entry.
+
+    Args:
+        text: The text to hash.
+
+    Returns:
+        Hex digest of the normalized text.
+    """
+    normalized = unicodedata.normalize("NFC", text)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _encode_embedding(embedding: np.ndarray | list[float], dtype: str = "float32") -> bytes:
+    """Encode an embedding into the binary cache value format.
+
+    Args:
+        embedding: The embedding vector to encode.
+        dtype: Storage dtype, "float32" or "float16".
+
+    Returns:
+        Encoded cache value.
+    """
+    code, storage_dtype = _EMBEDDING_DTYPES[dtype]
+    vector = np.asarray(embedding, dtype=storage_dtype).ravel()
+    header = _EMBEDDING_HEADER.pack(_EMBEDDING_MAGIC, _EMBEDDING_FORMAT_VERSION, code)
+    return header + vector.tobytes()
+
+
+def _decode_embedding(data: bytes) -> np.ndarray:
+    """Decode a cache value into a float32 embedding.
+
+    Args:
+        data: Binary cache value.
+
+    Returns:
+        Embedding as a float32 array.
+
+    Raises:
+        ValueError: If the value is not a supported format.
+    """
+    if len(data) < _EMBEDDING_HEADER.size or data[:2] != _EMBEDDING_MAGIC:
+        raise ValueError("Cache value is not a binary embedding")
+
+    _, version, code = _EMBEDDING_HEADER.unpack_from(data)
+    if version != _EMBEDDING_FORMAT_VERSION or code not in _EMBEDDING_DTYPE_CODES:
+        raise ValueError(f"Unsupported embedding format version {version}, dtype {code}")
+
+    vector = np.frombuffer(data, dtype=_EMBEDDING_DTYPE_CODES[code], offset=_EMBEDDING_HEADER.size)
+    return vector.astype(np.float32, copy=False)
+
+
+def _encode_layout(coordinates: np.ndarray) -> bytes:
+    """Encode a layout into the binary cache value format.
+
+    Args:
+        coordinates: Matrix of coordinates, one row per item.
+
+    Returns:
+        Encoded cache value.
+    """
+    matrix = np.asarray(coordinates, dtype=_LAYOUT_DTYPE)
+    header = _LAYOUT_HEADER.pack(_LAYOUT_MAGIC, _LAYOUT_FORMAT_VERSION, matrix.shape[1])
+    return header + matrix.tobytes()
+
+
+def _decode_layout(data: bytes) -> np.ndarray:
+    """Decode a cache value into a float32 layout.
+
+    Args:
+        data: Binary cache value.
+
+    Returns:
+        Matrix of coordinates, one row per item.
+
+    Raises:
+        ValueError: If the value is not a supported format.
+    """
+    if len(data) < _LAYOUT_HEADER.size or data[:2] != _LAYOUT_MAGIC:
+        raise ValueError("Cache value is not a binary layout")
+
+    _, version, n_components = _LAYOUT_HEADER.unpack_from(data)
+    if version != _LAYOUT_FORMAT_VERSION or n_components == 0:
+        raise ValueError(f"Unsupported layout format version {version}, {n_components} components")
+
+    vector = np.frombuffer(data, dtype=_LAYOUT_DTYPE, offset=_LAYOUT_HEADER.size)
+    return vector.astype(np.float32, copy=False).reshape(-1, n_components)
+
+
+def _reducer_signature(key: str, pickled: bytes, signing_key: bytes) -> bytes:
+    """Sign a pickled model together with the cache key it is stored under.
+
+    Args:
+        key: Reducer cache key.
+        pickled: Pickled model.
+        signing_key: Secret key to sign with.
+
+    Returns:
+        HMAC-SHA256 signature.
+    """
+    message = key.encode("utf-8") + b"\0" + pickled
+    return hmac.new(signing_key, message, hashlib.sha256).digest()
+
+
+def _encode_reducer(key: str, reducer: object, signing_key: bytes) -> bytes:
+    """Encode a fitted model into the signed cache value format.
+
+    Args:
+        key: Reducer cache key the value is stored under.
+        reducer: Fitted model.
+        signing_key: Secret key to sign with.
+
+    Returns:
+        Encoded cache value.
+    """
+    pickled = pickle.dumps(reducer, protocol=pickle.HIGHEST_PROTOCOL)
+    return _reducer_signature(key, pickled, signing_key) + pickled
+
+
+class _ByteCounter:
+    """Write-only file object counting the bytes written to it."""
 
     def __init__(self):
-        """Initialize the cache service."""
+        """Initialize the count."""
+        self.nbytes = 0
+
+    def write(self, data: bytes | memoryview) -> int:
+        """Count written bytes without keeping them.
+
+        Args:
+            data: Bytes written.
+
+        Returns:
+            Number of bytes written.
+        """
+        nbytes = memoryview(data).nbytes
+        self.nbytes += nbytes
+        return nbytes
+
+
+def _reducer_size(reducer: object) -> int:
+    """Measure the size of a fitted model as its pickle, without holding the pickle.
+
+    Args:
+        reducer: Fitted model.
+
+    Returns:
+        Size of the pickled model in bytes.
+    """
+    counter = _ByteCounter()
+    pickle.Pickler(counter, protocol=pickle.HIGHEST_PROTOCOL).dump(reducer)
+    return counter.nbytes
+
+
+def _decode_reducer(key: str, data: bytes, signing_key: bytes) -> object:
+    """Decode a signed cache value into a fitted model.
+
+    Args:
+        key: Reducer cache key the value was stored under.
+        data: Signed cache value.
+        signing_key: Secret key the value was signed with.
+
+    Returns:
+        Fitted model.
+
+    Raises:
+        ValueError: If the value is not signed with the key for this cache key.
+    """
+    signature, pickled = data[:_REDUCER_SIGNATURE_SIZE], data[_REDUCER_SIGNATURE_SIZE:]
+    if not hmac.compare_digest(signature, _reducer_signature(key, pickled, signing_key)):
+        raise ValueError("Cache value is not a signed reducer")
+    return pickle.loads(pickled)
+
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """In-process least-recently-used cache bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries, 0 disables the cache.
+            max_bytes: Maximum total size of the entries in bytes, 0 disables the cache.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[V, int]] = OrderedDict()
+        self.bytes = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache can hold any entries."""
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def __len__(self) -> int:
+        """Get the number of cached entries."""
+        return len(self._entries)
+
+    def get(self, key: str) -> V | None:
+        """Retrieve a value and mark it as most recently used.
+
+        Args:
+            key: The key to look up.
+
+        Returns:
+            Cached value if found, None otherwise.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: str, value: V, nbytes: int) -> None:
+        """Store a value, evicting least recently used entries to stay within bounds.
+
+        Args:
+            key: The key to store the value under.
+            value: The value to store.
+            nbytes: Size of the value in bytes.
+        """
+        if not self.enabled or nbytes > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= previous[1]
+        self._entries[key] = (value, nbytes)
+        self.bytes += nbytes
+
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.bytes -= evicted_bytes
+            self.evictions += 1
+
+    def discard_prefix(self, prefix: str) -> int:
+        """Remove all entries whose key starts with a prefix.
+
+        Args:
+            prefix: Key prefix of the entries to remove.
+
+        Returns:
+            Number of removed entries.
+        """
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            _, nbytes = self._entries.pop(key)
+            self.bytes -= nbytes
+        return len(keys)
+
+    def stats(self) -> dict[str, float]:
+        """Get size and hit/miss/eviction statistics.
+
+        Returns:
+            Dictionary of cache statistics.
+        """
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def create_redis_client(settings: Settings) -> aioredis.Redis:
+    """Create a Redis client backed by a bounded connection pool.
+
+    The pool blocks callers for up to the socket timeout when all connections are in
+    use, rather than opening new connections without limit.
+
+    Args:
+        settings: Application settings.
+
+    Returns:
+        Redis client using its own connection pool.
+    """
+    pool = aioredis.BlockingConnectionPool(
+        host=settings.cache_host,
+        port=settings.cache_port,
+        db=settings.cache_db,
+        password=settings.cache_password,
+        max_connections=settings.cache_max_connections,
+        # Seconds to wait for a free connection, which redis-py takes as whole seconds
+        timeout=math.ceil(settings.cache_socket_timeout_seconds),
+        socket_timeout=settings.cache_socket_timeout_seconds,
+        socket_connect_timeout=settings.cache_socket_connect_timeout_seconds,
+    )
+    return aioredis.Redis(connection_pool=pool)
+
+
+class CacheService:
+    """Service for caching embeddings in memory and in Redis.
+
+    Lookups check a size-bounded in-process LRU tier first and fall through to Redis,
+    whose hits are promoted into memory. A single instance is created per process in
+    the application lifespan, so caching and rate limiting share one connection pool
+    and all requests share the in-process tier.
+    """
+
+    def __init__(self, redis: aioredis.Redis | None = None):
+        """Initialize the cache service.
+
+        Args:
+            redis: Redis client to use, a pooled client is created if not given.
+        """
         self.settings = get_settings()
         self.enabled = self.settings.cache_enabled
 
+        self.memory: LRUCache[np.ndarray] = LRUCache(
+            max_entries=self.settings.cache_memory_max_entries if self.enabled else 0,
+            max_bytes=self.settings.cache_memory_max_bytes,
+        )
+        self.layouts: LRUCache[np.ndarray] = LRUCache(
+            max_entries=self.settings.cache_memory_max_entries if self.enabled else 0,
+            max_bytes=self.settings.cache_memory_max_bytes,
+        )
+        # Layout handles need the layout's texts, and are kept usable, along with the
+        # layout's models, even with caching disabled
+        self.reducers: LRUCache[object] = LRUCache(
+            max_entries=self.settings.cache_memory_max_entries,
+            max_bytes=self.settings.cache_memory_max_bytes,
+        )
+        self.layout_texts: LRUCache[list[str]] = LRUCache(
+            max_entries=self.settings.cache_memory_max_entries,
+            max_bytes=self.settings.cache_memory_max_bytes,
+        )
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.layout_hits = 0
+        self.layout_misses = 0
+        self.layout_namespace = _layout_namespace(
+            self.settings.model_name, self.settings.model_revision
+        )
+
+        # Without a configured key, no process could load models stored by another
+        signing_key = self.settings.cache_signing_key
+        self.signing_key = signing_key.encode("utf-8") if signing_key else None
+
         if self.enabled:
             try:
-                self.redis = aioredis.Redis(
-                    host=self.settings.cache_host,
-                    port=self.settings.cache_port,
-                    db=self.settings.cache_db,
-                    password=self.settings.cache_password,
-                )
+                self.redis = redis if redis is not None else create_redis_client(self.settings)
                 self.ttl = self.settings.cache_ttl_seconds
+                self.embedding_dtype = self.settings.cache_embedding_dtype
+                self.namespace = _embedding_namespace(
+                    self.settings.model_name, self.settings.model_revision
+                )
+                self._rate_limit_script = self.redis.register_script(_SLIDING_WINDOW_SCRIPT)
+                self._release_lock_script = self.redis.register_script(_RELEASE_LOCK_SCRIPT)
             except (ConnectionError, RedisError) as e:
                 self.enabled = False
                 logger.error("Failed to initialize Redis cache: %s", e)
 
+    def stats(self) -> dict[str, float]:
+        """Get hit/miss/eviction statistics per cache tier.
+
+        Returns:
+            Dictionary of cache statistics.
+        """
+        memory_stats = {f"memory_{name}": value for name, value in self.memory.stats().items()}
+        layout_stats = {f"layouts_{name}": value for name, value in self.layouts.stats().items()}
+        reducer_stats = {f"reducers_{name}": value for name, value in self.reducers.stats().items()}
+        layout_text_stats = {
+            f"layout_texts_{name}": value for name, value in self.layout_texts.stats().items()
+        }
+        return {
+            **memory_stats,
+            **layout_stats,
+            **reducer_stats,
+            **layout_text_stats,
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+            "layout_hits": self.layout_hits,
+            "layout_misses": self.layout_misses,
+        }
+
+    def _remember(
+        self,
+        key: str,
+        embedding: np.ndarray | list[float],
+        tier: LRUCache[np.ndarray] | None = None,
+    ) -> np.ndarray:
+        """Store an embedding, or another array, in an in-process tier.
+
+        Args:
+            key: Cache key of the array.
+            embedding: The array to store.
+            tier: Tier to store the array in, the embedding tier if not given.
+
+        Returns:
+            The array as a read-only float32 array, shared by all readers.
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector.flags.writeable = False
+        (self.memory if tier is None else tier).put(key, vector, vector.nbytes)
+        return vector
+
+    async def close(self) -> None:
+        """Close the Redis client and disconnect its connection pool."""
+        if self.enabled:
+            await self.redis.aclose(close_connection_pool=True)
+
+    def _cache_key(self, text: str) -> str:
+        """Build the cache key for a text.
+
+        Keys are namespaced by model name and revision, so switching models never
+        serves vectors from another model, and use a hash of the text so their length
+        does not depend on user input.
+
+        Args:
+            text: The text to build the key for.
+
+        Returns:
+            Cache key for the text's embedding.
+        """
+        return f"{self.namespace}:{_text_digest(text)}"
+
+    def layout_id(self, texts: list[str]) -> str:
+        """Build the handle of a layout of texts.
+
+        The handle hashes the ordered texts, since a layout depends on all of them
+        and on the order its rows are in, so the same texts always get the same handle.
+
+        Args:
+            texts: The laid out texts, in row order.
+
+        Returns:
+            Hex digest identifying the layout.
+        """
+        digest = hashlib.sha256()
+        for text in texts:
+            digest.update(bytes.fromhex(_text_digest(text)))
+        return digest.hexdigest()
+
+    def _layout_key(
+        self,
+        kind: str,
+        layout_id: str,
+        algorithm: str,
+        n_components: int,
+        params: Mapping[str, object],
+    ) -> str:
+        """Build the cache key of something derived from a layout and its parameters.
+
+        Args:
+            kind: Kind of value, "coords" or "reducer".
+            layout_id: Handle of the layout.
+            algorithm: Name of the reduction algorithm.
+            n_components: Number of output dimensions.
+            params: Parameters the algorithm is fitted with.
+
+        Returns:
+            Cache key, namespaced by model name and revision like embedding keys.
+        """
+        digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8"))
+        digest.update(bytes.fromhex(layout_id))
+        return f"{self.layout_namespace}:{kind}:{algorithm}:{n_components}:{digest.hexdigest()}"
+
+    def layout_key(
+        self,
+        layout_id: str,
+        algorithm: str,
+        n_components: int,
+        params: Mapping[str, object],
+    ) -> str:
+        """Build the cache key for the coordinates of a layout.
+
+        Args:
+            layout_id: Handle of the layout.
+            algorithm: Name of the reduction algorithm.
+            n_components: Number of output dimensions.
+            params: Parameters the algorithm is fitted with.
+
+        Returns:
+            Cache key for the coordinates.
+        """
+        return self._layout_key("coords", layout_id, algorithm, n_components, params)
+
+    def reducer_key(
+        self,
+        layout_id: str,
+        algorithm: str,
+        n_components: int,
+        params: Mapping[str, object],
+    ) -> str:
+        """Build the cache key for the fitted model of a layout.
+
+        Args:
+            layout_id: Handle of the layout.
+            algorithm: Name of the reduction algorithm.
+            n_components: Number of output dimensions.
+            params: Parameters the algorithm is fitted with.
+
+        Returns:
+            Cache key for the fitted model.
+        """
+        return self._layout_key("reducer", layout_id, algorithm, n_components, params)
+
+    def _layout_texts_key(self, layout_id: str) -> str:
+        """Build the cache key for the texts of a layout.
+
+        Args:
+            layout_id: Handle of the layout.
+
+        Returns:
+            Cache key for the texts.
+        """
+        return f"{self.layout_namespace}:texts:{layout_id}"
+
+    def _lock_key(self, text: str) -> str:
+        """Build the key of the lock held while a text's embedding is computed.
+
+        Args:
+            text: The text being computed.
+
+        Returns:
+            Lock key for the text.
+        """
+        return f"lock:{self._cache_key(text)}"
+
+    async def acquire_locks(self, texts: list[str], token: str, ttl_ms: int) -> list[str]:
+        """Acquire short-lived locks for computing texts' embeddings across workers.
+
+        Locks expire on their own, so a worker dying mid-computation only delays other
+        workers until the TTL passes.
+
+        Args:
+            texts: Texts to lock.
+            token: Token identifying the lock holder.
+            ttl_ms: Lock lifetime in milliseconds.
+
+        Returns:
+            Texts whose lock was acquired. All texts if locking is unavailable, so the
+            caller computes them itself.
+        """
+        if not self.enabled or not texts:
+            return list(texts)
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for text in texts:
+            pipeline.set(self._lock_key(text), token, nx=True, px=ttl_ms)
+        try:
+            results = await pipeline.execute(raise_on_error=False)
+        except RedisError as e:
+            logger.error("Error acquiring embedding locks: %s", e)
+            return list(texts)
+
+        # Failing to talk to Redis about a key counts as holding its lock
+        return [
+            text
+            for text, acquired in zip(texts, results, strict=True)
+            if acquired is True or isinstance(acquired, Exception)
+        ]
+
+    async def release_locks(self, texts: list[str], token: str) -> None:
+        """Release locks still held with a token.
+
+        Args:
+            texts: Texts to unlock.
+            token: Token the locks were acquired with.
+        """
+        if not self.enabled or not texts:
+            return
+
+        try:
+            await self._release_lock_script(
+                keys=[self._lock_key(text) for text in texts],
+                args=[token],
+            )
+        except RedisError as e:
+            logger.error("Error releasing embedding locks: %s", e)
+
+    async def wait_for_embeddings(
+        self,
+        texts: list[str],
+        timeout_ms: int,
+        poll_interval_ms: int,
+    ) -> dict[str, np.ndarray]:
+        """Wait for other workers to store embeddings of texts they hold locks for.
+
+        Stops waiting for a text as soon as its embedding is cached, or its lock is
+        gone without an embedding having been stored.
+
+        Args:
+            texts: Texts being computed by other workers.
+            timeout_ms: Maximum time to wait in milliseconds.
+            poll_interval_ms: Time between cache checks in milliseconds.
+
+        Returns:
+            Dictionary mapping texts to embeddings for those stored in time.
+        """
+        result: dict[str, np.ndarray] = {}
+        if not self.enabled:
+            return result
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_ms / 1000
+        pending = list(texts)
+        while pending and loop.time() < deadline:
+            await asyncio.sleep(poll_interval_ms / 1000)
+
+            # Check locks before values: a holder stores its embeddings before
+            # releasing, so a released lock with no value means the holder failed
+            try:
+                locks = await self.redis.mget([self._lock_key(text) for text in pending])
+            except RedisError as e:
+                logger.error("Error checking embedding locks: %s", e)
+                break
+            result.update(await self.get_embeddings(pending))
+            pending = [
+                text
+                for text, lock in zip(pending, locks, strict=True)
+                if lock and text not in result
+            ]
+
+        return result
+
+    async def purge_namespace(
+        self,
+        model_name: str | None = None,
+        revision: str | None = None,
+        batch_size: int = 500,
+    ) -> int:
+        """Delete all cached embeddings and layouts of one model revision.
+
+        Layouts are derived from the embeddings, so their coordinates, fitted models
+        and texts are deleted along with them. Keys are found with an incremental
+        SCAN and removed with UNLINK, so neither call blocks the server the way KEYS
+        or a large DEL would.
+
+        Args:
+            model_name: Model whose entries to delete, defaults to the current model.
+            revision: Model revision whose entries to delete, defaults to the current one.
+            batch_size: Number of keys scanned and unlinked per round trip.
+
+        Returns:
+            Number of deleted keys.
+        """
+        model_name = model_name or self.settings.model_name
+        revision = revision or self.settings.model_revision
+        namespace = _embedding_namespace(model_name, revision)
+        layout_namespace = _layout_namespace(model_name, revision)
+
+        deleted = self.memory.discard_prefix(namespace + ":")
+        for tier in (self.layouts, self.reducers, self.layout_texts):
+            deleted += tier.discard_prefix(layout_namespace + ":")
+        if not self.enabled:
+            return deleted
+
+        for prefix in (namespace, layout_namespace):
+            # Escape glob characters that may appear in model names
+            pattern = re.sub(r"([*?\[\]\\])", r"\\\1", prefix) + ":*"
+            try:
+                keys: list[bytes] = []
+                async for key in self.redis.scan_iter(match=pattern, count=batch_size):
+                    keys.append(key)
+                    if len(keys) >= batch_size:
+                        deleted += await self.redis.unlink(*keys)
+                        keys = []
+                if keys:
+                    deleted += await self.redis.unlink(*keys)
+            except RedisError as e:
+                logger.error("Error purging cache namespace %s: %s", prefix, e)
+
+        logger.info("Purged %d cached entries from %s and %s", deleted, namespace, layout_namespace)
+        return deleted
+
     async def get_embedding(
         self,
         text: str,
-    ) -> list[float] | None:
+    ) -> np.ndarray | None:
         """Retrieve embedding for a specific text from cache.
 
         Args:
@@ -47,13 +824,18 @@ class CacheService:
         if not self.enabled:
             return None
 
+        cache_key = self._cache_key(text)
+        embedding = self.memory.get(cache_key)
+        if embedding is not None:
+            return embedding
+
         try:
-            # Use the text itself as the cache key
-            cache_key = f"embedding:{text}"
             cached_data = await self.redis.get(cache_key)
             if cached_data:
-                return json.loads(cached_data)
-        except (RedisError, json.JSONDecodeError) as e:
+                self.redis_hits += 1
+                return self._remember(cache_key, _decode_embedding(cached_data))
+            self.redis_misses += 1
+        except (RedisError, ValueError, TypeError) as e:
             logger.error("Error retrieving from cache: %s", e)
 
         return None
@@ -61,7 +843,7 @@ class CacheService:
     async def store_embedding(
         self,
         text: str,
-        embedding: list[float],
+        embedding: np.ndarray | list[float],
     ) -> bool:
         """Store embedding for a specific text in cache.
 
@@ -76,46 +858,74 @@ class CacheService:
             return False
 
         try:
-            # Use the text itself as the cache key
-            cache_key = f"embedding:{text}"
+            cache_key = self._cache_key(text)
+            vector = self._remember(cache_key, embedding)
             await self.redis.setex(
                 cache_key,
                 self.ttl,
-                json.dumps(embedding),
+                _encode_embedding(vector, self.embedding_dtype),
             )
             return True
-        except (RedisError, TypeError) as e:
+        except (RedisError, TypeError, ValueError) as e:
             logger.error("Error storing in cache: %s", e)
             return False
 
     async def get_embeddings(
         self,
         texts: list[str],
-    ) -> dict[str, list[float]]:
+    ) -> dict[str, np.ndarray]:
         """Retrieve embeddings for multiple texts from cache.
 
+        Texts found in the in-process tier are returned directly, the rest are
+        fetched from Redis in a single round trip.
+
         Args:
             texts: List of texts to retrieve embeddings for.
 
         Returns:
             Dictionary mapping texts to embeddings for those found in cache.
         """
-        result: dict[str, list[float]] = {}
-        if not self.enabled:
+        result: dict[str, np.ndarray] = {}
+        if not self.enabled or not texts:
             return result
 
+        missing: list[tuple[str, str]] = []
         for text in texts:
-            embedding = await self.get_embedding(text)
-            if embedding:
+            cache_key = self._cache_key(text)
+            embedding = self.memory.get(cache_key)
+            if embedding is not None:
                 result[text] = embedding
+            else:
+                missing.append((text, cache_key))
+        if not missing:
+            return result
+
+        try:
+            values = await self.redis.mget([cache_key for _, cache_key in missing])
+        except RedisError as e:
+            logger.error("Error retrieving from cache: %s", e)
+            return result
+
+        for (text, cache_key), cached_data in zip(missing, values, strict=True):
+            if not cached_data:
+                self.redis_misses += 1
+                continue
+            try:
+                embedding = _decode_embedding(cached_data)
+            except (ValueError, TypeError) as e:
+                logger.error("Error retrieving from cache: %s", e)
+                continue
+            if embedding.size:
+                self.redis_hits += 1
+                result[text] = self._remember(cache_key, embedding)
 
         return result
 
     async def store_embeddings(
         self,
-        embeddings: dict[str, list[float]],
+        embeddings: Mapping[str, np.ndarray | list[float]],
     ) -> bool:
-        """Store multiple embeddings in cache.
+        """Store multiple embeddings in cache using a single pipelined round trip.
 
         Args:
             embeddings: Dictionary mapping texts to embeddings.
@@ -125,39 +935,315 @@ class CacheService:
         """
         if not self.enabled:
             return False
+        if not embeddings:
+            return True
 
         success = True
+        pipeline = self.redis.pipeline(transaction=False)
         for text, embedding in embeddings.items():
-            if not await self.store_embedding(text, embedding):
+            try:
+                cache_key = self._cache_key(text)
+                vector = self._remember(cache_key, embedding)
+                pipeline.setex(
+                    cache_key,
+                    self.ttl,
+                    _encode_embedding(vector, self.embedding_dtype),
+                )
+            except (TypeError, ValueError) as e:
+                logger.error("Error storing in cache: %s", e)
+                success = False
+
+        try:
+            results = await pipeline.execute(raise_on_error=False)
+        except RedisError as e:
+            logger.error("Error storing in cache: %s", e)
+            return False
+
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Error storing in cache: %s", result)
                 success = False
 
         return success
 
-    async def check_rate_limit(self, user_id: str, endpoint: str) -> tuple[bool, int]:
+    async def get_layouts(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """Retrieve cached layouts, checking the in-process tier before Redis.
+
+        Args:
+            keys: Layout cache keys from layout_key.
+
+        Returns:
+            Dictionary mapping keys to coordinate matrices for those found in cache.
+        """
+        result: dict[str, np.ndarray] = {}
+        if not self.enabled or not keys:
+            return result
+
+        missing = []
+        for key in keys:
+            layout = self.layouts.get(key)
+            if layout is not None:
+                result[key] = layout
+            else:
+                missing.append(key)
+        if not missing:
+            return result
+
+        try:
+            values = await self.redis.mget(missing)
+        except RedisError as e:
+            logger.error("Error retrieving layouts from cache: %s", e)
+            return result
+
+        for key, cached_data in zip(missing, values, strict=True):
+            if not cached_data:
+                self.layout_misses += 1
+                continue
+            try:
+                layout = _decode_layout(cached_data)
+            except (ValueError, TypeError) as e:
+                logger.error("Error retrieving layouts from cache: %s", e)
+                continue
+            self.layout_hits += 1
+            result[key] = self._remember(key, layout, self.layouts)
+
+        return result
+
+    async def store_layouts(self, layouts: Mapping[str, np.ndarray]) -> bool:
+        """Store layouts in both tiers using a single pipelined round trip.
+
+        Args:
+            layouts: Dictionary mapping layout cache keys to coordinate matrices.
+
+        Returns:
+            True if all layouts were stored successfully, False otherwise.
+        """
+        if not self.enabled:
+            return False
+        if not layouts:
+            return True
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for key, coordinates in layouts.items():
+            layout = self._remember(key, coordinates, self.layouts)
+            pipeline.setex(key, self.ttl, _encode_layout(layout))
+
+        try:
+            results = await pipeline.execute(raise_on_error=False)
+        except RedisError as e:
+            logger.error("Error storing layouts in cache: %s", e)
+            return False
+
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            logger.error("Error storing layouts in cache: %s", error)
+        return not errors
+
+    async def store_layout_texts(self, layout_id: str, texts: list[str]) -> bool:
+        """Remember the texts of a layout in both tiers, so texts can be added to it later.
+
+        The texts are kept in the in-process tier even if Redis is disabled.
+
+        Args:
+            layout_id: Handle of the layout.
+            texts: The laid out texts, in row order.
+
+        Returns:
+            True if the texts were stored in Redis, False otherwise.
+        """
+        key = self._layout_texts_key(layout_id)
+        data = json.dumps(texts)
+        self.layout_texts.put(key, list(texts), len(data))
+        if not self.enabled:
+            return False
+
+        try:
+            await self.redis.setex(key, self.ttl, data)
+            return True
+        except RedisError as e:
+            logger.error("Error storing layout texts in cache: %s", e)
+            return False
+
+    async def get_layout_texts(self, layout_id: str) -> list[str] | None:
+        """Retrieve the texts of a layout, checking the in-process tier before Redis.
+
+        Args:
+            layout_id: Handle of the layout.
+
+        Returns:
+            The laid out texts in row order if the layout is known, None otherwise.
+        """
+        key = self._layout_texts_key(layout_id)
+        texts = self.layout_texts.get(key)
+        if texts is not None:
+            return list(texts)
+        if not self.enabled:
+            return None
+
+        try:
+            cached_data = await self.redis.get(key)
+            if not cached_data:
+                return None
+            texts = json.loads(cached_data)
+            self.layout_texts.put(key, texts, len(cached_data))
+            return list(texts)
+        except (RedisError, ValueError) as e:
+            logger.error("Error retrieving layout texts from cache: %s", e)
+            return None
+
+    async def get_reducers(
+        self, keys: list[str], executor: Executor | None = None
+    ) -> dict[str, object]:
+        """Retrieve fitted models of layouts, checking the in-process tier before Redis.
+
+        Models are pickled and signed, and only unpickled if their signature matches
+        the signing key and cache key, so values written by anyone else are skipped.
+        Without Redis or a signing key, only the in-process tier is checked.
+
+        Args:
+            keys: Reducer cache keys from reducer_key.
+            executor: Executor unpickling the models off the event loop, the loop's
+                default executor if not given.
+
+        Returns:
+            Dictionary mapping keys to fitted models for those found in cache.
+        """
+        result: dict[str, object] = {}
+        missing = []
+        for key in keys:
+            reducer = self.reducers.get(key)
+            if reducer is not None:
+                result[key] = reducer
+            else:
+                missing.append(key)
+        if not missing or not self.enabled:
+            return result
+        if self.signing_key is None:
+            logger.debug("No cache signing key, fitting %d models not in memory", len(missing))
+            return result
+
+        try:
+            values = await self.redis.mget(missing)
+        except RedisError as e:
+            logger.error("Error retrieving reducers from cache: %s", e)
+            return result
+
+        loop = asyncio.get_running_loop()
+        for key, cached_data in zip(missing, values, strict=True):
+            if not cached_data:
+                continue
+            try:
+                reducer = await loop.run_in_executor(
+                    executor, _decode_reducer, key, cached_data, self.signing_key
+                )
+            except (pickle.UnpicklingError, ValueError, TypeError, EOFError) as e:
+                logger.error("Error retrieving reducers from cache: %s", e)
+                continue
+            self.reducers.put(key, reducer, len(cached_data))
+            result[key] = reducer
+
+        return result
+
+    async def remember_reducers(
+        self, reducers: Mapping[str, object], executor: Executor | None = None
+    ) -> None:
+        """Keep fitted models of layouts in the in-process tier only.
+
+        Args:
+            reducers: Dictionary mapping reducer cache keys to fitted models.
+            executor: Executor measuring the models off the event loop, the loop's
+                default executor if not given.
+        """
+        if not self.reducers.enabled:
+            return
+
+        loop = asyncio.get_running_loop()
+        for key, reducer in reducers.items():
+            nbytes = await loop.run_in_executor(executor, _reducer_size, reducer)
+            self.reducers.put(key, reducer, nbytes)
+
+    async def store_reducers(
+        self, reducers: Mapping[str, object], executor: Executor | None = None
+    ) -> bool:
+        """Store fitted models of layouts in both tiers in a single round trip.
+
+        Without Redis or a signing key, models are only stored in the in-process tier.
+
+        Args:
+            reducers: Dictionary mapping reducer cache keys to fitted models.
+            executor: Executor pickling the models off the event loop, the loop's
+                default executor if not given.
+
+        Returns:
+            True if all models were stored in Redis, False otherwise.
+        """
+        if not reducers:
+            return True
+        if not self.enabled or self.signing_key is None:
+            await self.remember_reducers(reducers, executor)
+            return False
+
+        loop = asyncio.get_running_loop()
+        pipeline = self.redis.pipeline(transaction=False)
+        for key, reducer in reducers.items():
+            data = await loop.run_in_executor(
+                executor, _encode_reducer, key, reducer, self.signing_key
+            )
+            self.reducers.put(key, reducer, len(data))
+            pipeline.setex(key, self.ttl, data)
+
+        try:
+            results = await pipeline.execute(raise_on_error=False)
+        except RedisError as e:
+            logger.error("Error storing reducers in cache: %s", e)
+            return False
+
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            logger.error("Error storing reducers in cache: %s", error)
+        return not errors
+
+    async def check_rate_limit(self, user_id: str, endpoint: str) -> RateLimitResult:
         """Check if user has exceeded rate limit for an endpoint.
 
+        Uses a sliding one-minute window evaluated by a Lua script, so the check and
+        the update happen atomically in a single round trip and the key always gets
+        an expiry.
+
         Args:
             user_id: The user's ID
             endpoint: The API endpoint being accessed
 
         Returns:
-            Tuple of (is_allowed, current_count)
+            Rate limit result with remaining quota and time until a slot frees up
         """
+        limit = self.settings.requests_per_minute_per_user
+        # Allow request if Redis is not available
+        unlimited = RateLimitResult(
+            allowed=True, used=0, limit=limit, remaining=limit, reset_seconds=0.0
+        )
         if not self.enabled:
-            return True, 0  # Allow request if Redis is not available
+            return unlimited
 
         try:
             # Create a unique key for this user and endpoint
             key = f"rate_limit:{user_id}:{endpoint}"
-
-            # Increment the counter and set expiry if it doesn't exist
-            count = await self.redis.incr(key)
-            if count == 1:
-                await self.redis.expire(key, 60)
-
-            # Check if user has exceeded their limit
-            max_requests = self.settings.requests_per_minute_per_user
-            return count <= max_requests, count
+            allowed, count, reset_ms = await self._rate_limit_script(
+                keys=[key],
+                args=[
+                    int(time.time() * 1000),
+                    _RATE_LIMIT_WINDOW_MS,
+                    limit,
+                    uuid.uuid4().hex,
+                ],
+            )
+            return RateLimitResult(
+                allowed=bool(allowed),
+                used=int(count),
+                limit=limit,
+                remaining=max(limit - int(count), 0),
+                reset_seconds=int(reset_ms) / 1000,
+            )
         except RedisError as e:
             logger.error("Error checking rate limit: %s", e)
-            return True, 0  # Allow request if Redis fails
+            return unlimited  # Allow request if Redis fails
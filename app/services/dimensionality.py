@@ -1,34 +1,214 @@
 """Service for dimensionality reduction of embeddings."""
 
-from typing import Literal
-
+import os
+import time
+import warnings
+from collections.abc import Collection
+from concurrent.futures import Executor, wait
+from typing import Literal, TypeAlias, cast
+
+import numba
 import numpy as np
-from openTSNE import TSNE
+from openTSNE import TSNE, TSNEEmbedding
+from openTSNE.affinity import PerplexityBasedNN
 from sklearn.decomposition import PCA
+from threadpoolctl import threadpool_limits
 from umap import UMAP
 
-from app.models.schemas import (
-    Coordinates2D,
-    Coordinates3D,
-    DimensionalityReductionResult,
-)
+from app.models.schemas import Algorithm, Dimension
+from app.services.neighbors import NearestNeighbors, ReferenceIndex, compute_knn
+from app.utils.logger import get_logger
+from app.utils.shared_arrays import SharedArray, shared_arrays
+
+logger = get_logger(__name__)
+
+# UMAP warns that a precomputed kNN graph without a search index cannot be used to
+# transform new data, which we do not need it for
+warnings.filterwarnings("ignore", message=r"precomputed_knn\[2\]", category=UserWarning)
+
+ALGORITHMS: tuple[Algorithm, ...] = ("pca", "tsne", "umap")
+DIMENSIONS: tuple[Dimension, ...] = (2, 3)
+
+# Algorithms laying out the neighbour graph of the samples
+NeighbourAlgorithm = Literal["tsne", "umap"]
+_NEIGHBOUR_ALGORITHMS: tuple[NeighbourAlgorithm, ...] = ("tsne", "umap")
+
+# Inputs with at least this many samples use randomized SVD for PCA
+RANDOMIZED_PCA_MIN_SAMPLES = 500
+
+# Inputs with at least this many samples are laid out with parameters for large
+# datasets, the default ones being tuned for inputs of around a hundred texts
+LARGE_DATASET_MIN_SAMPLES = 1000
+
+# UMAP neighbours for large datasets, its own default
+_LARGE_UMAP_N_NEIGHBORS = 15
+
+# Inputs with at least this many samples get FFT-accelerated t-SNE gradients, which
+# have a fixed cost for their interpolation grid that Barnes-Hut beats below it
+FFT_TSNE_MIN_SAMPLES = 5000
+
+# Default number of samples t-SNE and UMAP are fitted on, any further samples being
+# placed into the fitted layouts
+DEFAULT_FIT_MAX_SAMPLES = 10_000
+
+# Perplexity used to place new points into a fitted t-SNE layout, lower than for
+# fitting since a new point only needs to find its place among close neighbours
+_TSNE_TRANSFORM_PERPLEXITY = 5
+
+# openTSNE caps the perplexity at a third of the number of other samples
+_TSNE_MAX_PERPLEXITY_RATIO = 1 / 3
+
+# Fitted models that can place new points into their layout
+Reducer: TypeAlias = PCA | TSNEEmbedding | UMAP
+
+# Size of the random data fitted to warm up the reduction algorithms
+_WARM_UP_SAMPLES = 100
+_WARM_UP_FEATURES = 8
+
+
+def _embedding_matrix(embeddings: dict[str, np.ndarray]) -> np.ndarray:
+    """Stack embeddings into a float32 matrix, one row per label in insertion order.
+
+    Args:
+        embeddings: Dictionary mapping labels to embeddings.
+
+    Returns:
+        Matrix of embeddings.
+    """
+    return np.asarray(list(embeddings.values()), dtype=np.float32)
+
+
+class _ConvergenceMonitor:
+    """openTSNE callback stopping t-SNE once the KL divergence stops improving.
+
+    openTSNE optimizes in two phases, early exaggeration and then the main phase,
+    and calls the callback every callbacks_every_iters iterations of each. Only the
+    main phase is stopped early, as early exaggeration deliberately trades KL
+    divergence for moving clusters apart.
+    """
+
+    def __init__(self, min_improvement: float):
+        """Initialize the monitor.
+
+        Args:
+            min_improvement: Improvement of the KL divergence between calls, relative
+                to its value, below which the optimization stops.
+        """
+        self.min_improvement = min_improvement
+        self.phases = 0
+        self.completed_iterations = 0
+        self.phase_iterations = 0
+        self.kl_divergence: float | None = None
+        self.stopped_early = False
+
+    @property
+    def iterations(self) -> int:
+        """Number of iterations run over all phases, as of the last call."""
+        return self.completed_iterations + self.phase_iterations
+
+    def optimization_about_to_start(self) -> None:
+        """Start counting a new optimization phase."""
+        self.phases += 1
+        self.completed_iterations += self.phase_iterations
+        self.phase_iterations = 0
+        self.kl_divergence = None
+
+    def __call__(self, iteration: int, error: float, embedding: np.ndarray) -> bool:
+        """Record the progress of the optimization.
+
+        Args:
+            iteration: Iterations run in the current phase.
+            error: KL divergence of the current embedding.
+            embedding: Current embedding.
+
+        Returns:
+            Whether to stop the optimization.
+        """
+        previous, self.kl_divergence = self.kl_divergence, float(error)
+        self.phase_iterations = iteration
+        if self.phases < 2 or previous is None:
+            return False
+        self.stopped_early = previous - error < self.min_improvement * previous
+        return self.stopped_early
+
+
+class TSNEStats:
+    """Iterations run by t-SNE fits, which stop early once converged."""
+
+    def __init__(self):
+        """Initialize the counts."""
+        self.fits = 0
+        self.iterations = 0
+        self.max_iterations = 0
+        self.stopped_early = 0
+
+    def record(self, monitor: _ConvergenceMonitor) -> None:
+        """Count a finished fit.
+
+        Args:
+            monitor: Convergence monitor of the fit.
+        """
+        self.fits += 1
+        self.iterations += monitor.iterations
+        self.max_iterations = max(self.max_iterations, monitor.iterations)
+        self.stopped_early += monitor.stopped_early
+
+    def merge(self, other: "TSNEStats") -> None:
+        """Add the counts of fits run elsewhere, such as in a worker process.
+
+        Args:
+            other: Counts to add.
+        """
+        self.fits += other.fits
+        self.iterations += other.iterations
+        self.max_iterations = max(self.max_iterations, other.max_iterations)
+        self.stopped_early += other.stopped_early
+
+    def stats(self) -> dict[str, float]:
+        """Get iteration statistics.
+
+        Returns:
+            Dictionary of t-SNE statistics.
+        """
+        return {
+            "tsne_fits": self.fits,
+            "tsne_iterations": self.iterations,
+            "tsne_mean_iterations": self.iterations / self.fits if self.fits else 0.0,
+            "tsne_max_iterations": self.max_iterations,
+            "tsne_stopped_early": self.stopped_early,
+        }
 
 
 class DimensionalityReductionService:
     """Service for reducing dimensionality of embeddings."""
 
-    def __init__(self):
-        """Initialize dimensionality reduction algorithms."""
+    def __init__(self, fit_max_samples: int = DEFAULT_FIT_MAX_SAMPLES):
+        """Initialize dimensionality reduction algorithms.
+
+        Args:
+            fit_max_samples: Maximum number of samples t-SNE and UMAP are fitted on.
+                Larger inputs are fitted on a sample of this size, and their other
+                samples placed into the fitted layouts.
+        """
+        self.fit_max_samples = fit_max_samples
+        self.tsne_stats = TSNEStats()
+
         # PCA configuration
-        self.pca_2d = PCA(n_components=2, random_state=42)
-        self.pca_3d = PCA(n_components=3, random_state=42)
+        self.pca_params = {
+            "random_state": 42,
+        }
 
-        # t-SNE configuration
+        # t-SNE configuration. The perplexity is capped for small inputs, and
+        # n_iter is an upper bound: the optimization stops early once the KL
+        # divergence improves by less than min_kl_improvement, relative to its value,
+        # over callbacks_every_iters iterations
         self.tsne_params = {
             "perplexity": 30,
             "n_iter": 500,
             "random_state": 42,
             "metric": "cosine",
+            "callbacks_every_iters": 25,
+            "min_kl_improvement": 0.005,
         }
 
         # UMAP configuration
@@ -40,191 +220,526 @@ class DimensionalityReductionService:
             "metric": "cosine",
         }
 
-    def _get_coordinates_2d(
-        self,
-        reduced_data: np.ndarray,
-        idx: int,
-    ) -> Coordinates2D:
-        """Get 2D coordinates for a specific index.
+    def stats(self) -> dict[str, float]:
+        """Get statistics of the fits run by this service and its worker processes.
+
+        Returns:
+            Dictionary of reduction statistics.
+        """
+        return self.tsne_stats.stats()
+
+    def algorithm_params(self, algorithm: Algorithm, n_samples: int) -> dict[str, object]:
+        """Get the parameters an algorithm lays out a number of samples with.
+
+        Inputs beyond fit_max_samples are fitted on a sample of them, recorded as
+        fit_samples, for t-SNE and UMAP.
 
         Args:
-            reduced_data: Array of reduced 2D coordinates.
-            idx: Index of the coordinates to retrieve.
+            algorithm: Name of the algorithm.
+            n_samples: Number of samples laid out.
 
         Returns:
-            2D coordinates object.
+            Dictionary of layout parameters.
         """
-        coords = reduced_data[idx]
-        return Coordinates2D(
-            x=float(coords[0]),
-            y=float(coords[1]),
-        )
+        if algorithm == "pca" or n_samples <= self.fit_max_samples:
+            return self._fit_params(algorithm, n_samples)
+        return {
+            **self._fit_params(algorithm, self.fit_max_samples),
+            "fit_samples": self.fit_max_samples,
+        }
 
-    def _get_coordinates_3d(
-        self,
-        reduced_data: np.ndarray,
-        idx: int,
-    ) -> Coordinates3D:
-        """Get 3D coordinates for a specific index.
+    def _fit_params(self, algorithm: Algorithm, n_samples: int) -> dict[str, object]:
+        """Get the parameters an algorithm is fitted with on a number of samples.
+
+        The t-SNE perplexity is capped for small inputs, which have too few
+        neighbours for the configured one. Large datasets get UMAP with more
+        neighbours and a spectral initialization, and from FFT_TSNE_MIN_SAMPLES on
+        t-SNE with FFT-accelerated gradients.
 
         Args:
-            reduced_data: Array of reduced 3D coordinates.
-            idx: Index of the coordinates to retrieve.
+            algorithm: Name of the algorithm.
+            n_samples: Number of samples fitted on.
 
         Returns:
-            3D coordinates object.
+            Dictionary of fit parameters.
         """
-        coords = reduced_data[idx]
-        return Coordinates3D(
-            x=float(coords[0]),
-            y=float(coords[1]),
-            z=float(coords[2]),
-        )
+        if algorithm == "pca":
+            return dict(self.pca_params)
+
+        large = n_samples >= LARGE_DATASET_MIN_SAMPLES
+        if algorithm == "tsne":
+            params = dict(self.tsne_params)
+            params["perplexity"] = min(
+                cast(float, self.tsne_params["perplexity"]),
+                (n_samples - 1) * _TSNE_MAX_PERPLEXITY_RATIO,
+            )
+            if n_samples >= FFT_TSNE_MIN_SAMPLES:
+                params["negative_gradient_method"] = "fft"
+        else:
+            params = dict(self.umap_params)
+            if large:
+                params.update(n_neighbors=_LARGE_UMAP_N_NEIGHBORS, init="spectral")
+        return params
+
+    def _fit_sample(self, n_samples: int) -> np.ndarray | None:
+        """Choose the samples t-SNE and UMAP are fitted on.
 
-    def _create_reduction_result(
-        self,
-        algorithm: Literal["pca", "tsne", "umap"],
-        coords_2d: np.ndarray,
-        coords_3d: np.ndarray,
-        idx: int,
-    ) -> DimensionalityReductionResult:
-        """Create a dimensionality reduction result for a specific index.
+        Args:
+            n_samples: Number of samples laid out.
+
+        Returns:
+            Sorted indices of the samples to fit on, None to fit on all of them.
+        """
+        if n_samples <= self.fit_max_samples:
+            return None
+        rng = np.random.default_rng(cast(int, self.umap_params["random_state"]))
+        return np.sort(rng.choice(n_samples, self.fit_max_samples, replace=False))
+
+    def _pca(self, data: np.ndarray) -> PCA:
+        """Fit a PCA model with a component for every output dimension.
+
+        Randomized SVD approximates the leading components differently depending on
+        how many it computes, so every fit computes all of them, and a layout does not
+        depend on which other dimensions were requested with it.
 
         Args:
-            algorithm: Name of the algorithm used.
-            coords_2d: Array of 2D coordinates.
-            coords_3d: Array of 3D coordinates.
-            idx: Index of the item.
+            data: Matrix of embeddings.
 
         Returns:
-            Dimensionality reduction result.
+            Fitted PCA.
         """
-        return DimensionalityReductionResult(
-            algorithm=algorithm,
-            coordinates_2d=self._get_coordinates_2d(coords_2d, idx),
-            coordinates_3d=self._get_coordinates_3d(coords_3d, idx),
-        )
+        # Randomized SVD only computes the leading components, which is much cheaper
+        # than a full SVD once there are many texts
+        svd_solver = "randomized" if len(data) >= RANDOMIZED_PCA_MIN_SAMPLES else "full"
+        pca = PCA(n_components=max(DIMENSIONS), svd_solver=svd_solver, **self.pca_params)
+        return pca.fit(data)
 
-    def reduce_pca(
+    def _tsne_affinities(
         self,
-        embeddings: dict[str, list[float]],
-    ) -> tuple[np.ndarray, np.ndarray]:
-        """Reduce dimensionality using PCA.
+        knn: NearestNeighbors,
+        data: np.ndarray,
+    ) -> PerplexityBasedNN:
+        """Compute t-SNE affinities from the shared neighbour graph.
 
         Args:
-            embeddings: Dictionary mapping labels to embeddings.
+            knn: Neighbour graph of the embeddings.
+            data: Matrix of embeddings, which the affinities are extended to new
+                points with, so the fitted layout supports transform.
 
         Returns:
-            Tuple of (2D coordinates, 3D coordinates).
+            Affinities for fitting t-SNE.
         """
-        labels = list(embeddings.keys())
-        data = np.array([embeddings[label] for label in labels])
-
-        # Perform PCA
-        coords_2d = self.pca_2d.fit_transform(data)
-        coords_3d = self.pca_3d.fit_transform(data)
+        n_samples = len(data)
+        perplexity = cast(float, self._fit_params("tsne", n_samples)["perplexity"])
 
-        return coords_2d, coords_3d
+        # Leave out each sample itself
+        k = min(n_samples - 1, int(3 * perplexity))
+        neighbors = NearestNeighbors(knn.indices[:, 1 : k + 1], knn.distances[:, 1 : k + 1])
+        return PerplexityBasedNN(perplexity=perplexity, knn_index=ReferenceIndex(data, neighbors))
 
-    def reduce_tsne(
+    def _fit_tsne(
         self,
-        embeddings: dict[str, list[float]],
-    ) -> tuple[np.ndarray, np.ndarray]:
-        """Reduce dimensionality using t-SNE.
+        data: np.ndarray,
+        affinities: PerplexityBasedNN,
+        n_components: int,
+        stats: TSNEStats | None = None,
+    ) -> TSNEEmbedding:
+        """Fit a t-SNE layout, stopping once it has converged.
 
         Args:
-            embeddings: Dictionary mapping labels to embeddings.
+            data: Matrix of embeddings.
+            affinities: Affinities of the embeddings.
+            n_components: Number of output dimensions.
+            stats: Counts to record the iterations in, those of the service if not
+                given.
 
         Returns:
-            Tuple of (2D coordinates, 3D coordinates).
+            Fitted layout, whose coordinates are those of the embeddings.
         """
-        labels = list(embeddings.keys())
-        data = np.array([embeddings[label] for label in labels])
+        params = self._fit_params("tsne", len(data))
+        monitor = _ConvergenceMonitor(cast(float, params.pop("min_kl_improvement")))
+
+        # FFT interpolation grids grow with the cube of their size in 3D, where
+        # Barnes-Hut is faster
+        if n_components > 2 and params.get("negative_gradient_method") == "fft":
+            params["negative_gradient_method"] = "bh"
+
+        started_at = time.perf_counter()
+        tsne = TSNE(n_components=n_components, callbacks=[monitor], **params)
+        embedding = tsne.fit(data, affinities=affinities)
+        logger.info(
+            "t-SNE %dD layout of %d samples took %d iterations%s in %.2f s, KL divergence %s",
+            n_components,
+            len(data),
+            monitor.iterations,
+            " (converged early)" if monitor.stopped_early else "",
+            time.perf_counter() - started_at,
+            monitor.kl_divergence,
+        )
+        (self.tsne_stats if stats is None else stats).record(monitor)
 
-        # Perform t-SNE
-        tsne_2d = TSNE(n_components=2, **self.tsne_params)
-        tsne_3d = TSNE(n_components=3, **self.tsne_params)
+        # Keep the monitor out of later optimizations, such as placing new points
+        if isinstance(embedding, TSNEEmbedding):
+            embedding.gradient_descent_params["callbacks"] = None
+        return embedding
 
-        coords_2d = tsne_2d.fit(data)
-        coords_3d = tsne_3d.fit(data)
+    def _umap(self, data: np.ndarray, knn: NearestNeighbors, n_components: int) -> UMAP:
+        """Fit a UMAP model that supports transform.
 
-        return coords_2d, coords_3d
+        Args:
+            data: Matrix of embeddings.
+            knn: Neighbour graph of the embeddings.
+            n_components: Number of output dimensions.
 
-    def reduce_umap(
+        Returns:
+            Fitted UMAP.
+        """
+        params = self._fit_params("umap", len(data))
+
+        # UMAP only prunes wider graphs for large inputs, so pass exactly n_neighbors
+        umap_knn = knn.head(cast(int, params["n_neighbors"]))
+        umap = UMAP(
+            n_components=n_components,
+            precomputed_knn=(*umap_knn, ReferenceIndex(data)),
+            **params,
+        )
+        return umap.fit(data)
+
+    def _knn(self, data: np.ndarray) -> NearestNeighbors:
+        """Compute the neighbour graph shared by t-SNE and UMAP.
+
+        Args:
+            data: Matrix of embeddings.
+
+        Returns:
+            Neighbour graph wide enough for both algorithms.
+        """
+        n_neighbors = cast(int, self._fit_params("umap", len(data))["n_neighbors"])
+        perplexity = cast(float, self._fit_params("tsne", len(data))["perplexity"])
+
+        # t-SNE uses three times the perplexity in neighbours, excluding the sample itself
+        k = max(int(3 * perplexity) + 1, n_neighbors)
+        random_state = cast(int, self.umap_params["random_state"])
+        return compute_knn(data, k, random_state=random_state)
+
+    def fit_reducers(
         self,
-        embeddings: dict[str, list[float]],
-    ) -> tuple[np.ndarray, np.ndarray]:
-        """Reduce dimensionality using UMAP.
+        embeddings: dict[str, np.ndarray],
+        algorithms: Collection[Algorithm] = ALGORITHMS,
+        dimensions: Collection[Dimension] = DIMENSIONS,
+        executor: Executor | None = None,
+    ) -> dict[tuple[Algorithm, Dimension], Reducer]:
+        """Fit models that can place new points into the layouts of the embeddings.
+
+        Every fit is seeded, so the same embeddings always get the same models. t-SNE
+        and UMAP share one neighbour graph, and are only fitted on a sample of inputs
+        beyond fit_max_samples, as their time and memory grow faster than the number of
+        samples.
 
         Args:
             embeddings: Dictionary mapping labels to embeddings.
+            algorithms: Algorithms to fit.
+            dimensions: Output dimensions to fit.
+            executor: Executor running the t-SNE and UMAP fits concurrently. They run
+                one after another in the calling thread if not given.
 
         Returns:
-            Tuple of (2D coordinates, 3D coordinates).
+            Dictionary mapping (algorithm, dimension) to fitted models.
         """
-        labels = list(embeddings.keys())
-        data = np.array([embeddings[label] for label in labels])
+        data = _embedding_matrix(embeddings)
+        reducers: dict[tuple[Algorithm, Dimension], Reducer] = {}
+
+        # A single decomposition serves every dimension, each a projection onto the
+        # leading components
+        if "pca" in algorithms:
+            pca = self._pca(data)
+            reducers.update({("pca", n_components): pca for n_components in dimensions})
+
+        neighbour_based = [
+            algorithm for algorithm in _NEIGHBOUR_ALGORITHMS if algorithm in algorithms
+        ]
+        if not neighbour_based:
+            return reducers
+
+        sample = self._fit_sample(len(data))
+        if sample is not None:
+            data = data[sample]
+        knn = self._knn(data)
+        if executor is not None:
+            reducers.update(
+                self._fit_reducers_parallel(data, knn, executor, neighbour_based, dimensions)
+            )
+            return reducers
+
+        if "tsne" in neighbour_based:
+            # Compute the affinities once for all dimensions
+            affinities = self._tsne_affinities(knn, data)
+            for n_components in dimensions:
+                reducers["tsne", n_components] = self._fit_tsne(data, affinities, n_components)
+        if "umap" in neighbour_based:
+            for n_components in dimensions:
+                reducers["umap", n_components] = self._umap(data, knn, n_components)
+        return reducers
+
+    def _fit_reducers_parallel(
+        self,
+        data: np.ndarray,
+        knn: NearestNeighbors,
+        executor: Executor,
+        algorithms: Collection[NeighbourAlgorithm],
+        dimensions: Collection[Dimension],
+    ) -> dict[tuple[Algorithm, Dimension], Reducer]:
+        """Fit each t-SNE and UMAP model as a concurrent task.
 
-        # Perform UMAP
-        umap_2d = UMAP(n_components=2, **self.umap_params)
-        umap_3d = UMAP(n_components=3, **self.umap_params)
+        The embeddings and neighbour graph are handed to the tasks through shared
+        memory-mapped files rather than pickled into every task.
 
-        coords_2d = umap_2d.fit_transform(data)
-        coords_3d = umap_3d.fit_transform(data)
+        Args:
+            data: Matrix of embeddings to fit on.
+            knn: Neighbour graph of the embeddings.
+            executor: Executor, typically a process pool, running the fits.
+            algorithms: Neighbour-based algorithms to fit.
+            dimensions: Output dimensions to fit.
 
-        return coords_2d, coords_3d
+        Returns:
+            Dictionary mapping (algorithm, dimension) to fitted models.
+        """
+        # Start with the slower 3D fits
+        fits: list[tuple[NeighbourAlgorithm, Dimension]] = [
+            (algorithm, n_components)
+            for n_components in sorted(dimensions, reverse=True)
+            for algorithm in _NEIGHBOUR_ALGORITHMS
+            if algorithm in algorithms
+        ]
 
-    def get_reductions_for_item(
+        with shared_arrays(data, knn.indices, knn.distances) as handles:
+            futures = {
+                fit: executor.submit(_fit_reducer_shared, self, *fit, *handles) for fit in fits
+            }
+            # Wait for every task before the shared files are removed
+            wait(futures.values())
+            reducers: dict[tuple[Algorithm, Dimension], Reducer] = {}
+            for fit, future in futures.items():
+                reducers[fit], tsne_stats = future.result()
+                self.tsne_stats.merge(tsne_stats)
+            return reducers
+
+    def fit_layouts(
         self,
-        embeddings: dict[str, list[float]],
-        item_idx: int,
-    ) -> list[DimensionalityReductionResult]:
-        """Get dimensionality reduction results for a specific item.
+        embeddings: dict[str, np.ndarray],
+        algorithms: Collection[Algorithm] = ALGORITHMS,
+        dimensions: Collection[Dimension] = DIMENSIONS,
+        executor: Executor | None = None,
+    ) -> tuple[
+        dict[Algorithm, tuple[np.ndarray | None, np.ndarray | None]],
+        dict[tuple[Algorithm, Dimension], Reducer],
+    ]:
+        """Lay out embeddings with models that can place new points into the layouts.
+
+        Gives the layouts of the models fit_reducers returns along with the models, so
+        they can be kept for adding texts to the layouts later.
 
         Args:
             embeddings: Dictionary mapping labels to embeddings.
-            item_idx: Index of the item.
+            algorithms: Algorithms to run.
+            dimensions: Output dimensions to compute.
+            executor: Executor running the t-SNE and UMAP fits concurrently. They run
+                one after another in the calling thread if not given.
 
         Returns:
-            List of dimensionality reduction results for the item.
+            Tuple of (dictionary mapping algorithm names, in canonical order, to (2D
+            coordinates, 3D coordinates), None where not requested; dictionary mapping
+            (algorithm, dimension) to fitted models).
         """
-        # Perform all reductions
-        pca_2d, pca_3d = self.reduce_pca(embeddings)
-        tsne_2d, tsne_3d = self.reduce_tsne(embeddings)
-        umap_2d, umap_3d = self.reduce_umap(embeddings)
+        reducers = self.fit_reducers(embeddings, algorithms, dimensions, executor)
+        return self._fitted_layouts(reducers, embeddings), reducers
 
-        # Create results for the specific item
-        return [
-            self._create_reduction_result("pca", pca_2d, pca_3d, item_idx),
-            self._create_reduction_result("tsne", tsne_2d, tsne_3d, item_idx),
-            self._create_reduction_result("umap", umap_2d, umap_3d, item_idx),
-        ]
-
-    def reduce_all(
+    def _fitted_layouts(
         self,
-        embeddings: dict[str, list[float]],
-    ) -> list[list[DimensionalityReductionResult]]:
-        """Apply all dimensionality reduction algorithms for all items.
+        reducers: dict[tuple[Algorithm, Dimension], Reducer],
+        embeddings: dict[str, np.ndarray],
+    ) -> dict[Algorithm, tuple[np.ndarray | None, np.ndarray | None]]:
+        """Get the layouts of embeddings from the models fitted on them.
+
+        PCA projects every embedding. t-SNE and UMAP keep the layout of the samples
+        they were fitted on, and place any other samples into it.
 
         Args:
+            reducers: Dictionary mapping (algorithm, dimension) to models fitted by
+                fit_reducers on the embeddings.
             embeddings: Dictionary mapping labels to embeddings.
 
         Returns:
-            List of reduction results for each item.
+            Dictionary mapping algorithm names, in canonical order, to (2D coordinates,
+            3D coordinates), None where no model was given.
         """
-        # Run each algorithm once on the entire dataset
-        pca_2d, pca_3d = self.reduce_pca(embeddings)
-        tsne_2d, tsne_3d = self.reduce_tsne(embeddings)
-        umap_2d, umap_3d = self.reduce_umap(embeddings)
+        labels = list(embeddings)
+        sample = self._fit_sample(len(labels))
+        fitted = np.ones(len(labels), dtype=bool)
+        if sample is not None:
+            fitted[:] = False
+            fitted[sample] = True
+
+        reductions = self.transform(
+            {fit: reducer for fit, reducer in reducers.items() if fit[0] == "pca"}, embeddings
+        )
+        neighbour_based = {fit: reducer for fit, reducer in reducers.items() if fit[0] != "pca"}
+        placed = (
+            {}
+            if fitted.all()
+            else self.transform(
+                neighbour_based,
+                {
+                    label: embeddings[label]
+                    for label, is_fitted in zip(labels, fitted, strict=True)
+                    if not is_fitted
+                },
+            )
+        )
+
+        for algorithm in _NEIGHBOUR_ALGORITHMS:
+            coords: list[np.ndarray | None] = [None, None]
+            for i, n_components in enumerate(DIMENSIONS):
+                reducer = neighbour_based.get((algorithm, n_components))
+                if reducer is None:
+                    continue
+                layout = np.empty((len(labels), n_components), dtype=np.float32)
+                layout[fitted] = _fitted_layout(reducer)
+                if algorithm in placed:
+                    layout[~fitted] = placed[algorithm][i]
+                coords[i] = layout
+            if any(layout is not None for layout in coords):
+                reductions[algorithm] = (coords[0], coords[1])
+        return reductions
+
+    def transform(
+        self,
+        reducers: dict[tuple[Algorithm, Dimension], Reducer],
+        embeddings: dict[str, np.ndarray],
+    ) -> dict[Algorithm, tuple[np.ndarray | None, np.ndarray | None]]:
+        """Place new embeddings into fitted layouts without moving the existing points.
 
-        # Create results for all items
-        results = []
-        for i in range(len(embeddings)):
-            item_results = [
-                self._create_reduction_result("pca", pca_2d, pca_3d, i),
-                self._create_reduction_result("tsne", tsne_2d, tsne_3d, i),
-                self._create_reduction_result("umap", umap_2d, umap_3d, i),
-            ]
-            results.append(item_results)
+        Args:
+            reducers: Dictionary mapping (algorithm, dimension) to fitted models.
+            embeddings: Dictionary mapping labels to the new embeddings.
 
-        return results
+        Returns:
+            Dictionary mapping algorithm names, in canonical order, to (2D coordinates,
+            3D coordinates), None where no model was given.
+        """
+        data = _embedding_matrix(embeddings)
+        reductions: dict[Algorithm, tuple[np.ndarray | None, np.ndarray | None]] = {}
+        for algorithm in ALGORITHMS:
+            fitted = [reducers.get((algorithm, n_components)) for n_components in DIMENSIONS]
+            if all(reducer is None for reducer in fitted):
+                continue
+            coords: list[np.ndarray | None] = [None, None]
+            for i, (n_components, reducer) in enumerate(zip(DIMENSIONS, fitted, strict=True)):
+                if reducer is None:
+                    continue
+                if isinstance(reducer, TSNEEmbedding):
+                    transformed = _place_tsne(reducer, data)
+                else:
+                    transformed = reducer.transform(data)
+                coords[i] = np.asarray(transformed, dtype=np.float32)[:, :n_components]
+            reductions[algorithm] = (coords[0], coords[1])
+        return reductions
+
+
+def _place_tsne(reducer: TSNEEmbedding, data: np.ndarray) -> np.ndarray:
+    """Place new embeddings into a fitted t-SNE layout.
+
+    openTSNE centres a layout in place before placing new points into it, which
+    would move the layout for every later use of the model and return the new points
+    offset from it. The points are placed into a copy and shifted back instead.
+
+    Args:
+        reducer: Fitted t-SNE layout.
+        data: Matrix of new embeddings.
+
+    Returns:
+        Coordinates of the new embeddings in the frame of the fitted layout.
+    """
+    layout = np.array(reducer).view(TSNEEmbedding)
+    layout.__dict__.update(vars(reducer))
+    center = (layout.max(axis=0) + layout.min(axis=0)) / 2
+
+    perplexity = min(_TSNE_TRANSFORM_PERPLEXITY, len(reducer) / 3)
+    return np.asarray(layout.transform(data, perplexity=perplexity)) + center
+
+
+def _fitted_layout(reducer: TSNEEmbedding | UMAP) -> np.ndarray:
+    """Get the layout of the samples a t-SNE or UMAP model was fitted on.
+
+    Args:
+        reducer: Fitted model.
+
+    Returns:
+        Coordinates of the fitted samples.
+    """
+    return reducer.embedding_ if isinstance(reducer, UMAP) else np.asarray(reducer)
+
+
+def _fit_reducer_shared(
+    service: DimensionalityReductionService,
+    algorithm: NeighbourAlgorithm,
+    n_components: int,
+    data: SharedArray,
+    indices: SharedArray,
+    distances: SharedArray,
+) -> tuple[TSNEEmbedding | UMAP, TSNEStats]:
+    """Fit a single model that can place new points on shared embeddings and graph.
+
+    Args:
+        service: Service whose parameters to fit with.
+        algorithm: Name of the algorithm.
+        n_components: Number of output dimensions.
+        data: Shared matrix of embeddings.
+        indices: Shared neighbour indices.
+        distances: Shared neighbour distances.
+
+    Returns:
+        Tuple of (fitted model, holding copies of the shared arrays as it outlives
+        them; counts of the t-SNE iterations run, for the calling process to add to
+        its own).
+    """
+    matrix = np.array(data.open())
+    knn = NearestNeighbors(np.array(indices.open()), np.array(distances.open()))
+    tsne_stats = TSNEStats()
+    if algorithm == "tsne":
+        affinities = service._tsne_affinities(knn, matrix)
+        return service._fit_tsne(matrix, affinities, n_components, tsne_stats), tsne_stats
+    return service._umap(matrix, knn, n_components), tsne_stats
+
+
+def init_reduction_worker(threads: int, warm_up: bool = False) -> None:
+    """Set up a reduction worker process before it takes any fits.
+
+    Each worker runs one fit at a time, so BLAS and numba thread pools sized to the
+    whole machine would oversubscribe the cores shared by all workers.
+
+    Args:
+        threads: Number of threads per worker.
+        warm_up: Whether to compile the reduction kernels in the worker up front.
+    """
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    threadpool_limits(limits=threads)
+    numba.set_num_threads(threads)
+    if warm_up:
+        warm_up_reductions()
+
+
+def warm_up_reductions() -> float:
+    """Run tiny fits of every algorithm and dimension in this process.
+
+    Compiles the numba kernels UMAP compiles on first use, so the compilation does
+    not happen inside a request. Most of these kernels are not cacheable, so this
+    costs about the same in every new process whatever NUMBA_CACHE_DIR holds.
+
+    Returns:
+        Seconds spent warming up.
+    """
+    started_at = time.perf_counter()
+    data = np.random.default_rng(0).normal(size=(_WARM_UP_SAMPLES, _WARM_UP_FEATURES))
+    DimensionalityReductionService().fit_layouts({str(i): row for i, row in enumerate(data)})
+    return time.perf_counter() - started_at
@@ -1,5 +1,8 @@
 """Service for generating text embeddings."""
 
+from typing import Literal
+
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from app.config import get_settings
@@ -7,21 +10,47 @@ from app.models.schemas import TextInput
 
 
 class EmbeddingService:
-    """Service for generating and managing text embeddings."""
+    """Service for generating and managing text embeddings.
+
+    The underlying model is expensive to load, so a single instance is created per
+    process in the application lifespan and shared by all requests.
+    """
 
     def __init__(self):
         """Initialize the embedding service."""
         self.settings = get_settings()
-        self.model = SentenceTransformer(self.settings.model_name)
+        self.model = SentenceTransformer(
+            self.settings.model_name,
+            revision=self.settings.model_revision,
+        )
+        self.is_warm = False
+
+    @property
+    def status(self) -> Literal["warm", "cold"]:
+        """Get the warm-up status of the model.
+
+        Returns:
+            "warm" if the model has served at least one encode call, "cold" otherwise.
+        """
+        return "warm" if self.is_warm else "cold"
+
+    def warm_up(self) -> None:
+        """Run a dummy encode so lazy initialization does not happen inside a request."""
+        self.model.encode(
+            ["warm up"],
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        self.is_warm = True
 
-    def generate_embeddings(self, texts: list[TextInput]) -> dict[str, list[float]]:
+    def generate_embeddings(self, texts: list[TextInput]) -> dict[str, np.ndarray]:
         """Generate embeddings for a list of texts.
 
         Args:
             texts: List of text inputs.
 
         Returns:
-            Dictionary mapping text content to embeddings
+            Dictionary mapping text content to float32 embeddings
         """
         if not texts:
             return {}
@@ -38,8 +67,9 @@ class EmbeddingService:
 
         # Create text to embedding mapping
         embedding_dict = {
-            text.text: embedding.tolist()
+            text.text: embedding.astype(np.float32, copy=False)
             for text, embedding in zip(texts, embeddings, strict=False)
         }
 
+        self.is_warm = True
         return embedding_dict
@@ -0,0 +1,202 @@
+"""Nearest-neighbour search shared by the neighbour-based reduction algorithms."""
+
+from typing import NamedTuple
+
+import numpy as np
+from pynndescent import NNDescent
+
+# Inputs with fewer samples get an exact kNN graph from a matrix product
+EXACT_KNN_MAX_SAMPLES = 4096
+
+# Number of query rows per matrix product, bounding memory to this many rows of N
+_EXACT_KNN_BLOCK_ROWS = 1024
+
+
+class NearestNeighbors(NamedTuple):
+    """Cosine k-nearest-neighbour graph of a set of embeddings.
+
+    Each sample is its own first neighbour at distance 0, as UMAP expects; openTSNE
+    uses the graph without that first column.
+    """
+
+    indices: np.ndarray
+    distances: np.ndarray
+
+    def head(self, k: int) -> "NearestNeighbors":
+        """Get the graph restricted to the k nearest neighbours of each sample.
+
+        Args:
+            k: Number of neighbours to keep, including the sample itself.
+
+        Returns:
+            Restricted neighbour graph.
+        """
+        return NearestNeighbors(
+            np.ascontiguousarray(self.indices[:, :k]),
+            np.ascontiguousarray(self.distances[:, :k]),
+        )
+
+
+def _normalize(data: np.ndarray) -> np.ndarray:
+    """L2-normalize the rows of a matrix as float32.
+
+    Args:
+        data: Matrix of embeddings, one row per sample.
+
+    Returns:
+        Matrix of unit-length rows.
+    """
+    data = np.asarray(data, dtype=np.float32)
+
+    # Embeddings are normally L2-normalized already, making this a cheap no-op
+    norms = np.linalg.norm(data, axis=1, keepdims=True)
+    return data / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+def _exact_knn(queries: np.ndarray, data: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Find exact cosine nearest neighbours among L2-normalized rows.
+
+    Args:
+        queries: Matrix of L2-normalized embeddings to find neighbours for.
+        data: Matrix of L2-normalized embeddings to search.
+        k: Number of neighbours per query.
+
+    Returns:
+        Tuple of (neighbour indices, cosine distances), unsorted within rows.
+    """
+    indices = np.empty((len(queries), k), dtype=np.int64)
+    distances = np.empty((len(queries), k), dtype=np.float32)
+    for start in range(0, len(queries), _EXACT_KNN_BLOCK_ROWS):
+        block = slice(start, start + _EXACT_KNN_BLOCK_ROWS)
+        block_distances = 1 - queries[block] @ data.T
+        nearest = np.argpartition(block_distances, k - 1, axis=1)[:, :k]
+        indices[block] = nearest
+        distances[block] = np.take_along_axis(block_distances, nearest, axis=1)
+    return indices, np.maximum(distances, 0)
+
+
+def _approximate_knn(data: np.ndarray, k: int, random_state: int) -> tuple[np.ndarray, np.ndarray]:
+    """Find approximate cosine nearest neighbours with NN-descent.
+
+    Args:
+        data: Matrix of embeddings.
+        k: Number of neighbours per sample.
+        random_state: Seed for the random projection trees.
+
+    Returns:
+        Tuple of (neighbour indices, cosine distances).
+    """
+    index = NNDescent(data, n_neighbors=k, metric="cosine", random_state=random_state)
+    indices, distances = index.neighbor_graph
+    return indices.astype(np.int64, copy=False), distances.astype(np.float32, copy=False)
+
+
+def _sort_self_first(indices: np.ndarray, distances: np.ndarray) -> NearestNeighbors:
+    """Sort neighbours by distance, making sure each sample comes first in its row.
+
+    Args:
+        indices: Neighbour indices.
+        distances: Distances to the neighbours.
+
+    Returns:
+        Sorted neighbour graph.
+    """
+    rows = np.arange(len(indices))[:, None]
+    is_self = indices == rows
+
+    # An approximate search, or exact duplicates, can leave a sample out of its own row
+    missing = ~is_self.any(axis=1)
+    indices[missing, -1] = rows[missing, 0]
+    distances[missing, -1] = 0
+    is_self[missing, -1] = True
+
+    order = np.argsort(np.where(is_self, -1, distances), axis=1)
+    return NearestNeighbors(
+        np.take_along_axis(indices, order, axis=1),
+        np.take_along_axis(distances, order, axis=1),
+    )
+
+
+def compute_knn(data: np.ndarray, k: int, random_state: int = 42) -> NearestNeighbors:
+    """Compute the cosine k-nearest-neighbour graph of embeddings.
+
+    Small inputs get an exact graph from blocked matrix products of the normalized
+    embeddings; larger ones an approximate graph from NN-descent.
+
+    Args:
+        data: Matrix of embeddings, one row per sample.
+        k: Number of neighbours per sample, including the sample itself.
+        random_state: Seed for the approximate search.
+
+    Returns:
+        Neighbour graph sorted by increasing distance.
+    """
+    k = min(k, len(data))
+    data = _normalize(data)
+
+    if len(data) < EXACT_KNN_MAX_SAMPLES:
+        indices, distances = _exact_knn(data, data, k)
+    else:
+        indices, distances = _approximate_knn(data, k, random_state)
+    return _sort_self_first(indices, distances)
+
+
+class ReferenceIndex:
+    """Exact cosine neighbour search over a fixed set of reference embeddings.
+
+    Serves as the search index of fitted openTSNE and UMAP models, which query it
+    when placing new points into a layout of the reference embeddings. The neighbour
+    graph of the reference embeddings themselves is given up front rather than
+    searched for again.
+    """
+
+    # UMAP widens approximate searches over angular indices; an exact search ignores it
+    _angular_trees = True
+
+    def __init__(self, data: np.ndarray, knn: NearestNeighbors | None = None):
+        """Initialize the index.
+
+        Args:
+            data: Matrix of reference embeddings, one row per sample.
+            knn: Neighbour graph of the reference embeddings, as openTSNE expects it.
+        """
+        self.data = _normalize(data)
+        self.knn = knn
+        self.n_samples = len(self.data)
+        self.k = None if knn is None else knn.indices.shape[1]
+
+    def build(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get the neighbour graph of the reference embeddings.
+
+        Returns:
+            Tuple of (neighbour indices, distances).
+
+        Raises:
+            ValueError: If the index was created without the neighbour graph.
+        """
+        if self.knn is None:
+            raise ValueError("Reference index has no neighbour graph of its embeddings")
+        return self.knn.indices, self.knn.distances
+
+    def query(
+        self,
+        queries: np.ndarray,
+        k: int,
+        epsilon: float | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Find the nearest reference embeddings of new embeddings.
+
+        Args:
+            queries: Matrix of new embeddings, one row per sample.
+            k: Number of neighbours per sample.
+            epsilon: Search breadth of approximate indices, unused.
+
+        Returns:
+            Tuple of (neighbour indices, cosine distances), sorted by distance.
+        """
+        k = min(k, self.n_samples)
+        indices, distances = _exact_knn(_normalize(queries), self.data, k)
+        order = np.argsort(distances, axis=1)
+        return np.take_along_axis(indices, order, axis=1), np.take_along_axis(
+            distances, order, axis=1
+        )
@@ -0,0 +1,279 @@
+"""Service for resolving dimensionality reductions through the cache and the fits."""
+
+import asyncio
+from collections.abc import Callable, Collection
+from concurrent.futures import Executor
+from functools import partial
+
+import numpy as np
+
+from app.models.schemas import Algorithm, Dimension
+from app.services.cache import CacheService
+from app.services.dimensionality import (
+    ALGORITHMS,
+    DIMENSIONS,
+    DimensionalityReductionService,
+    Reducer,
+)
+from app.services.singleflight import SingleFlight
+
+Reductions = dict[Algorithm, tuple[np.ndarray | None, np.ndarray | None]]
+
+
+class ReductionResolver:
+    """Service for getting layouts from the cache, computing only what is missing.
+
+    Every fit is seeded, so a layout only depends on the model, the ordered texts and
+    the algorithm parameters, and can be served from cache for repeated requests.
+    Each algorithm and dimension is cached separately, so requests for other
+    combinations of the same texts reuse the layouts they have in common, and
+    concurrent requests in this process share one computation per layout.
+
+    Layouts are computed with models that can place new points into them, which are
+    kept in this process's memory, so adding texts to a layout only costs as much as
+    placing them. Processes without the models fit them the first time texts are
+    added and store them server-side for the others. The fits are seeded like those
+    of the layouts, so the models place texts into the layouts that were served.
+    """
+
+    def __init__(
+        self,
+        cache_service: CacheService,
+        dim_reduction_service: DimensionalityReductionService,
+        executor: Executor,
+        reduction_pool: Executor | None = None,
+    ):
+        """Initialize the resolver.
+
+        Args:
+            cache_service: Service for caching layouts.
+            dim_reduction_service: Service running the reductions.
+            executor: Executor running the reductions off the event loop.
+            reduction_pool: Process pool running the fits concurrently, if any.
+        """
+        self.cache_service = cache_service
+        self.dim_reduction_service = dim_reduction_service
+        self.executor = executor
+        self.reduction_pool = reduction_pool
+        self.single_flight: SingleFlight[np.ndarray] = SingleFlight()
+        self.reducer_single_flight: SingleFlight[Reducer] = SingleFlight()
+
+    async def register_layout(self, texts: list[str]) -> str:
+        """Get the handle of a layout of texts, remembering its texts for adding more.
+
+        Args:
+            texts: The laid out texts, in row order.
+
+        Returns:
+            Handle of the layout.
+        """
+        layout_id = self.cache_service.layout_id(texts)
+        await self.cache_service.store_layout_texts(layout_id, texts)
+        return layout_id
+
+    async def get_layout_texts(self, layout_id: str) -> list[str] | None:
+        """Get the texts of a registered layout.
+
+        Args:
+            layout_id: Handle of the layout.
+
+        Returns:
+            The laid out texts in row order, None if the layout is unknown or expired.
+        """
+        return await self.cache_service.get_layout_texts(layout_id)
+
+    def _fits(
+        self,
+        key: Callable[[str, Algorithm, int, dict[str, object]], str],
+        layout_id: str,
+        n_samples: int,
+        algorithms: Collection[Algorithm],
+        dimensions: Collection[Dimension],
+    ) -> dict[str, tuple[Algorithm, Dimension]]:
+        """Build cache keys for the requested algorithms and dimensions of a layout.
+
+        Args:
+            key: Cache service method building a key from a layout and its parameters.
+            layout_id: Handle of the layout.
+            n_samples: Number of samples in the layout.
+            algorithms: Requested algorithms.
+            dimensions: Requested output dimensions.
+
+        Returns:
+            Dictionary mapping cache keys to (algorithm, dimension), in canonical order.
+        """
+        return {
+            key(
+                layout_id,
+                algorithm,
+                n_components,
+                self.dim_reduction_service.algorithm_params(algorithm, n_samples),
+            ): (algorithm, n_components)
+            for algorithm in ALGORITHMS
+            if algorithm in algorithms
+            for n_components in DIMENSIONS
+            if n_components in dimensions
+        }
+
+    async def get_reductions(
+        self,
+        layout_id: str,
+        embeddings: dict[str, np.ndarray],
+        algorithms: Collection[Algorithm] = ALGORITHMS,
+        dimensions: Collection[Dimension] = DIMENSIONS,
+    ) -> Reductions:
+        """Get layouts of embeddings from the cache, computing and storing missing ones.
+
+        Args:
+            layout_id: Handle of the layout of the embeddings.
+            embeddings: Dictionary mapping labels to embeddings, in layout row order.
+            algorithms: Algorithms to get layouts for.
+            dimensions: Output dimensions to get layouts for.
+
+        Returns:
+            Dictionary mapping algorithm names, in canonical order, to (2D coordinates,
+            3D coordinates), None where not requested.
+        """
+        fits = self._fits(
+            self.cache_service.layout_key, layout_id, len(embeddings), algorithms, dimensions
+        )
+
+        layouts = await self.cache_service.get_layouts(list(fits))
+        missing = [key for key in fits if key not in layouts]
+        if missing:
+            layouts.update(
+                await self.single_flight.do(
+                    missing,
+                    lambda keys: self._compute(
+                        layout_id, embeddings, {key: fits[key] for key in keys}
+                    ),
+                )
+            )
+
+        reductions: Reductions = {}
+        for key, (algorithm, n_components) in fits.items():
+            coords_2d, coords_3d = reductions.get(algorithm, (None, None))
+            if n_components == 2:
+                coords_2d = layouts[key]
+            else:
+                coords_3d = layouts[key]
+            reductions[algorithm] = (coords_2d, coords_3d)
+        return reductions
+
+    async def _compute(
+        self,
+        layout_id: str,
+        embeddings: dict[str, np.ndarray],
+        fits: dict[str, tuple[Algorithm, Dimension]],
+    ) -> dict[str, np.ndarray]:
+        """Compute layouts and store them in the cache, keeping their models in memory.
+
+        Args:
+            layout_id: Handle of the layout of the embeddings.
+            embeddings: Dictionary mapping labels to embeddings.
+            fits: Dictionary mapping layout cache keys to (algorithm, dimension).
+
+        Returns:
+            Dictionary mapping layout cache keys to coordinates.
+        """
+        algorithms = {algorithm for algorithm, _ in fits.values()}
+        dimensions = {n_components for _, n_components in fits.values()}
+        loop = asyncio.get_running_loop()
+        reductions, fitted = await loop.run_in_executor(
+            self.executor,
+            partial(
+                self.dim_reduction_service.fit_layouts,
+                embeddings,
+                algorithms,
+                dimensions,
+                self.reduction_pool,
+            ),
+        )
+
+        layouts: dict[str, np.ndarray] = {}
+        for key, (algorithm, n_components) in fits.items():
+            coords = reductions[algorithm][DIMENSIONS.index(n_components)]
+            # Every requested dimension is computed for every requested algorithm
+            assert coords is not None
+            layouts[key] = coords
+        reducer_fits = self._fits(
+            self.cache_service.reducer_key, layout_id, len(embeddings), algorithms, dimensions
+        )
+        await self.cache_service.store_layouts(layouts)
+        await self.cache_service.remember_reducers(
+            {key: fitted[fit] for key, fit in reducer_fits.items()}, self.executor
+        )
+        return layouts
+
+    async def extend(
+        self,
+        layout_id: str,
+        reference: dict[str, np.ndarray],
+        embeddings: dict[str, np.ndarray],
+        algorithms: Collection[Algorithm] = ALGORITHMS,
+        dimensions: Collection[Dimension] = DIMENSIONS,
+    ) -> Reductions:
+        """Place new embeddings into a layout without moving its existing points.
+
+        Args:
+            layout_id: Handle of the layout.
+            reference: Dictionary mapping the layout's labels to their embeddings, in
+                layout row order.
+            embeddings: Dictionary mapping the new labels to their embeddings.
+            algorithms: Algorithms to place the new embeddings with.
+            dimensions: Output dimensions to place the new embeddings in.
+
+        Returns:
+            Dictionary mapping algorithm names, in canonical order, to (2D coordinates,
+            3D coordinates) of the new embeddings, None where not requested.
+        """
+        fits = self._fits(
+            self.cache_service.reducer_key, layout_id, len(reference), algorithms, dimensions
+        )
+
+        reducers = await self.cache_service.get_reducers(list(fits), self.executor)
+        missing = [key for key in fits if key not in reducers]
+        if missing:
+            reducers.update(
+                await self.reducer_single_flight.do(
+                    missing,
+                    lambda keys: self._fit(reference, {key: fits[key] for key in keys}),
+                )
+            )
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            self.dim_reduction_service.transform,
+            {fit: reducers[key] for key, fit in fits.items()},
+            embeddings,
+        )
+
+    async def _fit(
+        self,
+        reference: dict[str, np.ndarray],
+        fits: dict[str, tuple[Algorithm, Dimension]],
+    ) -> dict[str, Reducer]:
+        """Fit models on a layout's embeddings and store them in the cache.
+
+        Args:
+            reference: Dictionary mapping the layout's labels to their embeddings.
+            fits: Dictionary mapping reducer cache keys to (algorithm, dimension).
+
+        Returns:
+            Dictionary mapping reducer cache keys to fitted models.
+        """
+        loop = asyncio.get_running_loop()
+        fitted = await loop.run_in_executor(
+            self.executor,
+            partial(
+                self.dim_reduction_service.fit_reducers,
+                reference,
+                {algorithm for algorithm, _ in fits.values()},
+                {n_components for _, n_components in fits.values()},
+                self.reduction_pool,
+            ),
+        )
+        reducers = {key: fitted[fit] for key, fit in fits.items()}
+        await self.cache_service.store_reducers(reducers, self.executor)
+        return reducers
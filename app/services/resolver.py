@@ -0,0 +1,120 @@
+"""Service for resolving embeddings through the cache tiers and the model."""
+
+import asyncio
+import uuid
+from collections.abc import Sequence
+
+import numpy as np
+
+from app.config import get_settings
+from app.models.schemas import TextInput
+from app.services.batching import EmbeddingBatcher
+from app.services.cache import CacheService
+from app.services.singleflight import SingleFlight
+
+
+class EmbeddingResolver:
+    """Service for getting embeddings from the cache, computing only what is missing.
+
+    Missing texts are computed at most once at a time: concurrent requests in this
+    process share one computation per text, and other workers wait on a short-lived
+    Redis lock for the worker already computing it.
+    """
+
+    def __init__(self, cache_service: CacheService, embedding_batcher: EmbeddingBatcher):
+        """Initialize the resolver.
+
+        Args:
+            cache_service: Service for caching embeddings.
+            embedding_batcher: Batcher generating embeddings in shared model calls.
+        """
+        self.settings = get_settings()
+        self.cache_service = cache_service
+        self.embedding_batcher = embedding_batcher
+        self.single_flight: SingleFlight[np.ndarray] = SingleFlight()
+
+    async def get_embeddings(self, texts: Sequence[TextInput]) -> dict[str, np.ndarray]:
+        """Get embeddings for texts from the cache, generating and storing missing ones.
+
+        Args:
+            texts: Text inputs.
+
+        Returns:
+            Dictionary mapping text content to embeddings, in the order of the texts.
+        """
+        # Check cache first
+        cached_embeddings = await self.cache_service.get_embeddings([text.text for text in texts])
+
+        # Determine which texts need new embeddings
+        missing_texts = {text.text: text for text in texts if text.text not in cached_embeddings}
+        new_embeddings = {}
+        if missing_texts:
+            # Generate missing embeddings, sharing computations already in flight
+            new_embeddings = await self.single_flight.do(
+                list(missing_texts),
+                lambda keys: self._generate([missing_texts[key] for key in keys]),
+            )
+
+        # Callers pair embeddings with texts by position, so keep the request order
+        embeddings = {**cached_embeddings, **new_embeddings}
+        return {text.text: embeddings[text.text] for text in texts}
+
+    async def _generate(self, texts: list[TextInput]) -> dict[str, np.ndarray]:
+        """Generate and store embeddings, deferring to workers already computing them.
+
+        Args:
+            texts: Text inputs not being computed elsewhere in this process.
+
+        Returns:
+            Dictionary mapping text content to embeddings.
+        """
+        token = uuid.uuid4().hex
+        locked = set(
+            await self.cache_service.acquire_locks(
+                [text.text for text in texts],
+                token,
+                self.settings.embedding_lock_ttl_ms,
+            )
+        )
+        owned = [text for text in texts if text.text in locked]
+        others = [text.text for text in texts if text.text not in locked]
+
+        # Wait for other workers while generating the texts we hold locks for
+        waiting = asyncio.ensure_future(
+            self.cache_service.wait_for_embeddings(
+                others,
+                self.settings.embedding_lock_ttl_ms,
+                self.settings.embedding_lock_poll_ms,
+            )
+        )
+        try:
+            generated = await self._generate_and_store(owned)
+        except BaseException:
+            waiting.cancel()
+            raise
+        finally:
+            await self.cache_service.release_locks(list(locked), token)
+        waited = await waiting
+
+        # Compute texts whose lock holder failed or timed out ourselves
+        done = generated.keys() | waited.keys()
+        leftover = [text for text in texts if text.text not in done]
+        if leftover:
+            generated.update(await self._generate_and_store(leftover))
+
+        return {**waited, **generated}
+
+    async def _generate_and_store(self, texts: list[TextInput]) -> dict[str, np.ndarray]:
+        """Generate embeddings and store them in the cache.
+
+        Args:
+            texts: List of text inputs.
+
+        Returns:
+            Dictionary mapping text content to embeddings.
+        """
+        if not texts:
+            return {}
+        embeddings = await self.embedding_batcher.generate_embeddings(texts)
+        await self.cache_service.store_embeddings(embeddings)
+        return embeddings
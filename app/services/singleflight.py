@@ -0,0 +1,120 @@
+"""De-duplication of concurrent computations of the same keys."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[V]):
+    """Run at most one in-flight computation per key within a process.
+
+    Callers asking for keys that are already being computed wait for that computation
+    instead of starting their own. The first caller for a key owns its computation;
+    if the owner is cancelled, waiters retry the computation themselves rather than
+    failing with it.
+    """
+
+    def __init__(self):
+        """Initialize the single-flight group."""
+        self._inflight: dict[str, asyncio.Future[V]] = {}
+
+    def __len__(self) -> int:
+        """Get the number of keys currently being computed."""
+        return len(self._inflight)
+
+    async def do(
+        self,
+        keys: list[str],
+        compute: Callable[[list[str]], Awaitable[dict[str, V]]],
+    ) -> dict[str, V]:
+        """Get values for keys, sharing in-flight computations with concurrent callers.
+
+        Args:
+            keys: Keys to get values for.
+            compute: Coroutine function computing values for the keys nobody else is
+                computing, returning a dictionary mapping each of them to its value.
+
+        Returns:
+            Dictionary mapping keys to values.
+        """
+        owned, waiting = self._claim(keys)
+
+        results: dict[str, V] = {}
+        if owned:
+            results.update(await self._compute(owned, compute))
+
+        waited, retry = await self._wait(waiting)
+        results.update(waited)
+        if retry:
+            results.update(await self.do(retry, compute))
+        return results
+
+    def _claim(
+        self, keys: list[str]
+    ) -> tuple[dict[str, asyncio.Future[V]], dict[str, asyncio.Future[V]]]:
+        """Split keys into ones this caller now owns and ones already in flight."""
+        loop = asyncio.get_running_loop()
+        owned: dict[str, asyncio.Future[V]] = {}
+        waiting: dict[str, asyncio.Future[V]] = {}
+        for key in dict.fromkeys(keys):
+            future = self._inflight.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._inflight[key] = future
+                owned[key] = future
+            else:
+                waiting[key] = future
+        return owned, waiting
+
+    async def _compute(
+        self,
+        owned: dict[str, asyncio.Future[V]],
+        compute: Callable[[list[str]], Awaitable[dict[str, V]]],
+    ) -> dict[str, V]:
+        """Compute owned keys and publish the outcome to their waiters."""
+        try:
+            computed = await compute(list(owned))
+        except asyncio.CancelledError:
+            for future in owned.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in owned.values():
+                future.set_exception(e)
+                # Waiters, if any, retrieve the exception themselves
+                future.exception()
+            raise
+        else:
+            for key, future in owned.items():
+                if key in computed:
+                    future.set_result(computed[key])
+                else:
+                    future.set_exception(KeyError(key))
+                    future.exception()
+            return computed
+        finally:
+            for key, future in owned.items():
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    async def _wait(self, waiting: dict[str, asyncio.Future[V]]) -> tuple[dict[str, V], list[str]]:
+        """Wait for keys computed by other callers.
+
+        Returns:
+            Tuple of (values of finished keys, keys whose owner was cancelled).
+        """
+        results: dict[str, V] = {}
+        retry: list[str] = []
+        for key, future in waiting.items():
+            try:
+                # Shield so a cancelled waiter does not cancel the owner's computation
+                results[key] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not future.cancelled() or (task is not None and task.cancelling()):
+                    raise
+                # The owner was cancelled, not us
+                retry.append(key)
+        return results, retry
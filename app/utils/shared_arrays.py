@@ -0,0 +1,50 @@
+"""Memory-mapped arrays for handing data to worker processes without pickling it."""
+
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import NamedTuple
+
+import numpy as np
+
+# Back the arrays with RAM where available rather than disk
+_SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+class SharedArray(NamedTuple):
+    """Picklable handle to an array shared through a memory-mapped file."""
+
+    path: str
+    shape: tuple[int, ...]
+    dtype: str
+
+    def open(self) -> np.ndarray:
+        """Map the shared array into this process.
+
+        The mapping is copy-on-write, so writes stay private to the process.
+
+        Returns:
+            Array backed by the shared file.
+        """
+        return np.memmap(self.path, dtype=np.dtype(self.dtype), mode="c", shape=self.shape)
+
+
+@contextmanager
+def shared_arrays(*arrays: np.ndarray) -> Iterator[list[SharedArray]]:
+    """Share arrays with other processes for the duration of the context.
+
+    Args:
+        arrays: Arrays to share.
+
+    Yields:
+        Handles to the shared arrays, in the same order.
+    """
+    with tempfile.TemporaryDirectory(prefix="shared-arrays-", dir=_SHARED_DIR) as directory:
+        handles = []
+        for i, array in enumerate(arrays):
+            path = os.path.join(directory, f"{i}.bin")
+            array = np.ascontiguousarray(array)
+            array.tofile(path)
+            handles.append(SharedArray(path, array.shape, array.dtype.str))
+        yield handles
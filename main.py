@@ -1,6 +1,11 @@
 """Main application module for the embedding visualizer."""
 
+import asyncio
+import multiprocessing
+import os
+import time
 from collections.abc import AsyncGenerator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -8,21 +13,133 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import router
 from app.config import get_settings
+from app.services.batching import EmbeddingBatcher
+from app.services.cache import CacheService
+from app.services.dimensionality import (
+    DimensionalityReductionService,
+    init_reduction_worker,
+    warm_up_reductions,
+)
+from app.services.embedding import EmbeddingService
+from app.services.reductions import ReductionResolver
+from app.services.resolver import EmbeddingResolver
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+async def _start_reduction_workers(reduction_pool: ProcessPoolExecutor, workers: int) -> None:
+    """Start every reduction worker process and wait until all of them are set up.
+
+    Workers warm up in their initializer and only take tasks once it has finished, so
+    a worker has warmed up once it has run a task. Tasks are submitted until every
+    worker has run one, whichever worker each task lands on.
+
+    Args:
+        reduction_pool: Process pool running the reduction fits.
+        workers: Number of worker processes in the pool.
+    """
+    loop = asyncio.get_running_loop()
+    pids: set[int] = set()
+    while len(pids) < workers:
+        started = await asyncio.gather(
+            *(loop.run_in_executor(reduction_pool, os.getpid) for _ in range(workers - len(pids)))
+        )
+        if pids.issuperset(started):
+            # Only workers that are already set up took tasks; give the others time
+            await asyncio.sleep(0.1)
+        pids.update(started)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan manager."""
     # Startup
     settings = get_settings()
     logger.info("Starting application in %s mode", "debug" if settings.debug else "production")
+
+    # One cache service and Redis connection pool shared by caching and rate limiting
+    cache_service = CacheService()
+    app.state.cache_service = cache_service
+
+    # Load the embedding model once per process and warm it up before taking traffic
+    embedding_service = EmbeddingService()
+    started_at = time.perf_counter()
+    embedding_service.warm_up()
+    warm_up_seconds = {"embedding_model": time.perf_counter() - started_at}
+    app.state.embedding_service = embedding_service
+    logger.info("Embedding model %s loaded (%s)", settings.model_name, embedding_service.status)
+
+    # Bounded pool for inference, so the event loop stays free for health checks and
+    # rate limiting while CPU-heavy work runs
+    executor = ThreadPoolExecutor(
+        max_workers=settings.inference_workers,
+        thread_name_prefix="inference",
+    )
+
+    # Separate pool for reductions, which hold their thread while waiting on the
+    # reduction workers and would otherwise leave no thread free for encoding
+    reduction_executor = ThreadPoolExecutor(
+        max_workers=settings.reduction_concurrency,
+        thread_name_prefix="reduction",
+    )
+
+    # Worker processes running the independent reduction fits of a request concurrently,
+    # spawned rather than forked since this process already runs threads
+    reduction_pool = None
+    if settings.reduction_workers > 0:
+        reduction_pool = ProcessPoolExecutor(
+            max_workers=settings.reduction_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_reduction_worker,
+            initargs=(settings.reduction_threads_per_worker, settings.reduction_warm_up),
+        )
+
+    # Compile the reduction kernels before taking traffic, in every process running fits
+    if settings.reduction_warm_up:
+        started_at = time.perf_counter()
+        if reduction_pool is not None:
+            await _start_reduction_workers(reduction_pool, settings.reduction_workers)
+        else:
+            await asyncio.get_running_loop().run_in_executor(reduction_executor, warm_up_reductions)
+        warm_up_seconds["reductions"] = time.perf_counter() - started_at
+    app.state.warm_up_seconds = warm_up_seconds
+    logger.info(
+        "Warm-up took %s",
+        ", ".join(f"{name} {seconds:.1f} s" for name, seconds in warm_up_seconds.items()),
+    )
+
+    # Merge texts from concurrent requests into shared encode calls
+    embedding_batcher = EmbeddingBatcher(
+        embedding_service,
+        executor,
+        max_batch_size=settings.embedding_batch_max_size,
+        max_wait_ms=settings.embedding_batch_max_wait_ms,
+    )
+    embedding_batcher.start()
+    app.state.embedding_batcher = embedding_batcher
+
+    # Serve embeddings from cache, computing each missing text at most once at a time
+    app.state.embedding_resolver = EmbeddingResolver(cache_service, embedding_batcher)
+
+    # Serve layouts from cache, computing each missing layout at most once at a time
+    app.state.reduction_resolver = ReductionResolver(
+        cache_service,
+        DimensionalityReductionService(settings.reduction_fit_max_samples),
+        reduction_executor,
+        reduction_pool,
+    )
+
     # Run application
     yield
     # Shutdown
     logger.info("Shutting down application")
+    await embedding_batcher.stop()
+    await cache_service.close()
+    executor.shutdown(wait=True, cancel_futures=True)
+    reduction_executor.shutdown(wait=True, cancel_futures=True)
+    if reduction_pool is not None:
+        reduction_pool.shutdown(wait=True, cancel_futures=True)
 
 
 def create_app() -> FastAPI:
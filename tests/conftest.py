@@ -1,19 +1,19 @@
 """Test fixtures for the embedding visualizer."""
 
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
 from fastapi import Request
 from fastapi.testclient import TestClient
 from posthog import Client as PosthogClient
 
 from app.config import Settings
-from app.models.schemas import (
-    Coordinates2D,
-    Coordinates3D,
-    DimensionalityReductionResult,
-    TextInput,
-)
+from app.models.schemas import TextInput
+from app.services.cache import RateLimitResult
+from app.services.reductions import ReductionResolver
+from app.services.resolver import EmbeddingResolver
 from main import app
 
 
@@ -60,15 +60,38 @@ def test_settings():
     test_config.cache_db = 0
     test_config.cache_password = ""
     test_config.cache_ttl_seconds = 3600
+    test_config.cache_memory_max_entries = 100
+    test_config.cache_memory_max_bytes = 1024 * 1024
+    test_config.cache_max_connections = 50
+    test_config.cache_socket_timeout_seconds = 2.0
+    test_config.cache_socket_connect_timeout_seconds = 2.0
+    test_config.cache_embedding_dtype = "float32"
+    test_config.cache_signing_key = "test_signing_key"
     test_config.requests_per_minute_per_user = 5
     test_config.model_name = "test-model"
+    test_config.model_revision = "main"
+    test_config.inference_workers = 2
+    test_config.embedding_batch_max_size = 256
+    test_config.embedding_batch_max_wait_ms = 5.0
+    test_config.embedding_lock_ttl_ms = 1000
+    test_config.embedding_lock_poll_ms = 10
+    test_config.reduction_concurrency = 2
+    test_config.reduction_workers = 0
+    test_config.reduction_threads_per_worker = 1
+    test_config.reduction_warm_up = False
+    test_config.reduction_fit_max_samples = 10_000
+    test_config.max_texts = 100
+    test_config.embed_max_texts = 10_000
+    test_config.embed_chunk_size = 256
 
     # Apply the test settings to all relevant modules
     modules = [
+        "main",
         "app.config",
         "app.api.router",
         "app.services.cache",
         "app.services.embedding",
+        "app.services.resolver",
     ]
 
     patchers = [patch(f"{module}.get_settings", return_value=test_config) for module in modules]
@@ -86,10 +109,18 @@ def test_settings():
 @pytest.fixture
 def test_client(test_settings):
     """Create a FastAPI test client."""
-    with TestClient(app) as client:
+    # Avoid loading a real model in the application lifespan
+    with patch("app.services.embedding.SentenceTransformer"), TestClient(app) as client:
         yield client
 
 
+@pytest.fixture
+def executor():
+    """Create a small thread pool executor for running blocking work."""
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        yield pool
+
+
 @pytest.fixture
 def sample_text_inputs(sample_texts):
     """Create sample text input models."""
@@ -104,42 +135,64 @@ def sample_visualization_request(sample_texts):
 
 @pytest.fixture
 def sample_embeddings(sample_texts, sample_embeddings_values):
-    """Create a dictionary mapping texts to embeddings."""
-    return dict(zip(sample_texts, sample_embeddings_values, strict=False))
+    """Create a dictionary mapping texts to float32 embeddings."""
+    return {
+        text: np.array(values, dtype=np.float32)
+        for text, values in zip(sample_texts, sample_embeddings_values, strict=False)
+    }
 
 
 @pytest.fixture
-def sample_reduction_results():
-    """Create sample dimensionality reduction results."""
-    results = []
-    for i in range(3):  # For 3 test texts
-        item_results = [
-            DimensionalityReductionResult(
-                algorithm=algo,
-                coordinates_2d=Coordinates2D(x=0.1 * i, y=0.2 * i),
-                coordinates_3d=Coordinates3D(x=0.1 * i, y=0.2 * i, z=0.3 * i),
-            )
-            for algo in ["pca", "tsne", "umap"]
-        ]
-        results.append(item_results)
-    return results
+def sample_layouts(sample_texts):
+    """Create sample whole-dataset layouts per algorithm."""
+    n_items = len(sample_texts)
+    return {
+        algorithm: (
+            np.full((n_items, 2), i, dtype=np.float32),
+            np.full((n_items, 3), i, dtype=np.float32),
+        )
+        for i, algorithm in enumerate(["pca", "tsne", "umap"])
+    }
 
 
 @pytest.fixture
-def mock_embedding_service(sample_embeddings):
-    """Mock the embedding service."""
-    with patch("app.api.router.EmbeddingService") as mock:
-        service_instance = mock.return_value
-        service_instance.generate_embeddings.return_value = sample_embeddings
-        yield service_instance
+def mock_embedding_batcher(sample_embeddings):
+    """Mock the embedding batcher."""
+    with patch("app.api.router.EmbeddingBatcher") as mock:
+        batcher_instance = mock.return_value
+        batcher_instance.generate_embeddings = AsyncMock(return_value=sample_embeddings)
+        yield batcher_instance
 
 
 @pytest.fixture
-def mock_dimensionality_service(sample_reduction_results):
+def mock_dimensionality_service(sample_layouts):
     """Mock the dimensionality reduction service."""
-    with patch("app.api.router.DimensionalityReductionService") as mock:
+    with patch("main.DimensionalityReductionService") as mock:
         service_instance = mock.return_value
-        service_instance.reduce_all.return_value = sample_reduction_results
+        service_instance.algorithm_params.side_effect = lambda algorithm, n_samples: {
+            "name": algorithm
+        }
+        service_instance.fit_reducers.side_effect = lambda embeddings, algorithms, dimensions, *_: {
+            (algorithm, n_components): f"{algorithm}-{n_components}"
+            for algorithm in algorithms
+            for n_components in dimensions
+        }
+        service_instance.fit_layouts.side_effect = lambda embeddings, algorithms, dimensions, *_: (
+            {
+                algorithm: layouts
+                for algorithm, layouts in sample_layouts.items()
+                if algorithm in algorithms
+            },
+            {
+                (algorithm, n_components): f"{algorithm}-{n_components}"
+                for algorithm in algorithms
+                for n_components in dimensions
+            },
+        )
+        service_instance.transform.side_effect = lambda reducers, embeddings: {
+            algorithm: tuple(coords[: len(embeddings)] for coords in sample_layouts[algorithm])
+            for algorithm, _ in reducers
+        }
         yield service_instance
 
 
@@ -152,11 +205,40 @@ def mock_cache_service():
         # Set up common async methods
         service_instance.get_embeddings = AsyncMock(return_value={})
         service_instance.store_embeddings = AsyncMock(return_value=True)
-        service_instance.check_rate_limit = AsyncMock(return_value=(True, 1))
+        service_instance.acquire_locks = AsyncMock(side_effect=lambda texts, *_: list(texts))
+        service_instance.release_locks = AsyncMock()
+        service_instance.wait_for_embeddings = AsyncMock(return_value={})
+        service_instance.layout_id.return_value = "layout"
+        service_instance.layout_key.side_effect = lambda *key: ":".join(map(str, key[1:3]))
+        service_instance.reducer_key.side_effect = lambda *key: ":".join(map(str, key[1:3]))
+        service_instance.get_layouts = AsyncMock(return_value={})
+        service_instance.store_layouts = AsyncMock(return_value=True)
+        service_instance.store_layout_texts = AsyncMock(return_value=True)
+        service_instance.get_layout_texts = AsyncMock(return_value=None)
+        service_instance.get_reducers = AsyncMock(return_value={})
+        service_instance.store_reducers = AsyncMock(return_value=True)
+        service_instance.remember_reducers = AsyncMock()
+        service_instance.check_rate_limit = AsyncMock(
+            return_value=RateLimitResult(
+                allowed=True, used=1, limit=5, remaining=4, reset_seconds=60.0
+            )
+        )
 
         yield service_instance
 
 
+@pytest.fixture
+def embedding_resolver(test_settings, mock_cache_service, mock_embedding_batcher):
+    """Create an embedding resolver backed by the mocked cache service and batcher."""
+    return EmbeddingResolver(mock_cache_service, mock_embedding_batcher)
+
+
+@pytest.fixture
+def reduction_resolver(mock_cache_service, mock_dimensionality_service, executor):
+    """Create a reduction resolver backed by the mocked cache and reduction services."""
+    return ReductionResolver(mock_cache_service, mock_dimensionality_service, executor)
+
+
 @pytest.fixture
 def mock_auth_request_state():
     """Create an authenticated request state."""
@@ -1,26 +1,23 @@
 """Tests for API dependencies."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 
 from app.api.dependencies import (
     check_rate_limit,
+    get_cache_service,
     get_clerk,
+    get_embedding_resolver,
     get_posthog,
+    get_reduction_resolver,
     track_event,
 )
+from app.services.cache import RateLimitResult
 from tests.conftest import MockRequestState
 
 
-@pytest.fixture
-def setup_cache_service(mock_cache_service):
-    """Setup cache service patch for dependency tests."""
-    with patch("app.api.dependencies.CacheService", return_value=mock_cache_service):
-        yield mock_cache_service
-
-
 @pytest.mark.asyncio
 async def test_get_clerk():
     """Test get_clerk dependency."""
@@ -34,48 +31,85 @@ def test_get_posthog():
     assert posthog_client is not None
 
 
+def test_get_cache_service(mock_fastapi_request):
+    """Test get_cache_service returns the shared service from app state."""
+    service = MagicMock()
+    mock_fastapi_request.app.state.cache_service = service
+    assert get_cache_service(mock_fastapi_request) is service
+
+
+def test_get_embedding_resolver(mock_fastapi_request):
+    """Test get_embedding_resolver returns the shared resolver from app state."""
+    resolver = MagicMock()
+    mock_fastapi_request.app.state.embedding_resolver = resolver
+    assert get_embedding_resolver(mock_fastapi_request) is resolver
+
+
+def test_get_reduction_resolver(mock_fastapi_request):
+    """Test get_reduction_resolver returns the shared resolver from app state."""
+    reduction_resolver = MagicMock()
+    mock_fastapi_request.app.state.reduction_resolver = reduction_resolver
+    assert get_reduction_resolver(mock_fastapi_request) is reduction_resolver
+
+
 @pytest.mark.asyncio
 async def test_check_rate_limit_allowed(
-    mock_fastapi_request, mock_auth_request_state, setup_cache_service
+    mock_fastapi_request, mock_auth_request_state, mock_cache_service
 ):
     """Test rate limit check when under limit."""
-    setup_cache_service.check_rate_limit.return_value = (True, 1)
-    await check_rate_limit(mock_fastapi_request, mock_auth_request_state)
+    mock_cache_service.check_rate_limit.return_value = RateLimitResult(
+        allowed=True, used=1, limit=5, remaining=4, reset_seconds=59.2
+    )
+    response = Response()
+    await check_rate_limit(
+        mock_fastapi_request, response, mock_auth_request_state, mock_cache_service
+    )
     # Verify cache service was called
-    setup_cache_service.check_rate_limit.assert_called_once()
+    mock_cache_service.check_rate_limit.assert_called_once()
+
+    # Verify quota headers were attached to the response
+    assert response.headers["X-RateLimit-Limit"] == "5"
+    assert response.headers["X-RateLimit-Remaining"] == "4"
+    assert response.headers["X-RateLimit-Reset"] == "60"
 
 
 @pytest.mark.asyncio
 async def test_check_rate_limit_exceeded(
-    mock_fastapi_request, mock_auth_request_state, setup_cache_service
+    mock_fastapi_request, mock_auth_request_state, mock_cache_service
 ):
     """Test rate limit check when exceeding limit."""
-    setup_cache_service.check_rate_limit.return_value = (False, 6)
+    mock_cache_service.check_rate_limit.return_value = RateLimitResult(
+        allowed=False, used=5, limit=5, remaining=0, reset_seconds=12.5
+    )
     with pytest.raises(HTTPException) as excinfo:
-        await check_rate_limit(mock_fastapi_request, mock_auth_request_state)
+        await check_rate_limit(
+            mock_fastapi_request, Response(), mock_auth_request_state, mock_cache_service
+        )
     assert excinfo.value.status_code == 429
     assert "Rate limit exceeded" in str(excinfo.value.detail)
-    assert excinfo.value.headers["Retry-After"] == "60"
+    assert excinfo.value.headers["Retry-After"] == "13"
+    assert excinfo.value.headers["X-RateLimit-Remaining"] == "0"
 
 
 @pytest.mark.asyncio
-async def test_check_rate_limit_no_user_id(mock_fastapi_request, setup_cache_service):
+async def test_check_rate_limit_no_user_id(mock_fastapi_request, mock_cache_service):
     """Test rate limit check with no user ID."""
     request_state = MockRequestState(is_signed_in=True, payload={})
-    await check_rate_limit(mock_fastapi_request, request_state)
+    await check_rate_limit(mock_fastapi_request, Response(), request_state, mock_cache_service)
     # Verify cache service was not called
-    setup_cache_service.check_rate_limit.assert_not_called()
+    mock_cache_service.check_rate_limit.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_check_rate_limit_cache_disabled(mock_fastapi_request, mock_auth_request_state):
     """Test rate limit check with cache disabled."""
-    with patch("app.api.dependencies.CacheService") as mock_cache_service_class:
-        mock_cache_instance = MagicMock()
-        mock_cache_instance.enabled = False
-        mock_cache_service_class.return_value = mock_cache_instance
-        await check_rate_limit(mock_fastapi_request, mock_auth_request_state)
-        # No assertions needed - test passes if no exception is raised
+    mock_cache_instance = MagicMock()
+    mock_cache_instance.enabled = False
+    await check_rate_limit(
+        mock_fastapi_request, Response(), mock_auth_request_state, mock_cache_instance
+    )
+    # Verify the rate limiter was skipped
+    mock_cache_instance.check_rate_limit.assert_not_called()
 
 
 def test_track_event(mock_fastapi_request, mock_auth_request_state, mock_posthog):
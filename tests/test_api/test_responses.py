@@ -0,0 +1,196 @@
+"""Tests for response bodies built from arrays."""
+
+import json
+
+import msgpack
+import numpy as np
+import pytest
+
+from app.api.responses import (
+    PayloadJSONResponse,
+    PayloadMsgpackResponse,
+    columnar_payload,
+    embeddings_payload,
+    payload_response,
+    visualization_payload,
+)
+from app.models.schemas import (
+    Coordinates2D,
+    Coordinates3D,
+    DimensionalityReductionResult,
+    EmbeddingsResponse,
+    ItemResult,
+    VisualizationResponse,
+    VisualizationResponseV2,
+)
+
+
+def _decoded(payload):
+    """Serialize a payload as JSON and parse it back."""
+    return json.loads(PayloadJSONResponse(payload).body)
+
+
+def test_visualization_payload_follows_response_model(sample_texts, sample_embeddings):
+    """Test the payload equals the response built from validated models."""
+    rng = np.random.default_rng(0)
+    reductions = {
+        "pca": (rng.normal(size=(3, 2)), rng.normal(size=(3, 3))),
+        "umap": (None, rng.normal(size=(3, 3)).astype(np.float32)),
+    }
+
+    payload = visualization_payload(sample_texts, sample_embeddings, reductions, "layout")
+
+    expected = VisualizationResponse(
+        results=[
+            ItemResult(
+                label=text,
+                embedding=[float(str(value)) for value in sample_embeddings[text]],
+                reductions=[
+                    DimensionalityReductionResult(
+                        algorithm=algorithm,
+                        coordinates_2d=None
+                        if coords_2d is None
+                        else Coordinates2D(x=coords_2d[i, 0], y=coords_2d[i, 1]),
+                        coordinates_3d=Coordinates3D(
+                            x=coords_3d[i, 0], y=coords_3d[i, 1], z=coords_3d[i, 2]
+                        ),
+                    )
+                    for algorithm, (coords_2d, coords_3d) in reductions.items()
+                ],
+            )
+            for i, text in enumerate(sample_texts)
+        ],
+        layout_id="layout",
+    )
+    assert VisualizationResponse.model_validate(_decoded(payload)) == expected
+    assert _decoded(payload) == expected.model_dump()
+
+
+def test_visualization_payload_precision(sample_texts, sample_embeddings, sample_layouts):
+    """Test embeddings and coordinates are rounded, or embeddings left out."""
+    payload = visualization_payload(sample_texts, sample_embeddings, sample_layouts, precision=2)
+
+    item = _decoded(payload)["results"][0]
+    assert (
+        item["embedding"]
+        == np.round(sample_embeddings[sample_texts[0]].astype(np.float64), 2).tolist()
+    )
+    assert item["reductions"][0]["coordinates_2d"] == {"x": 0.0, "y": 0.0}
+    assert all(value == round(value, 2) for value in item["embedding"])
+
+    payload = visualization_payload(
+        sample_texts, None, sample_layouts, "layout", embeddings_id="layout"
+    )
+
+    response = VisualizationResponse.model_validate(_decoded(payload))
+    assert [result.embedding for result in response.results] == [None, None, None]
+    assert response.embeddings_id == "layout"
+
+
+def test_columnar_payload(sample_texts, sample_embeddings):
+    """Test the columnar payload has one array per axis aligned to the labels."""
+    rng = np.random.default_rng(0)
+    reductions = {
+        "pca": (rng.normal(size=(3, 2)), rng.normal(size=(3, 3))),
+        "umap": (None, rng.normal(size=(3, 3)).astype(np.float32)),
+    }
+
+    payload = columnar_payload(sample_texts, sample_embeddings, reductions, "layout")
+
+    response = VisualizationResponseV2.model_validate(_decoded(payload))
+    assert response.version == 2
+    assert response.labels == sample_texts
+    assert np.array_equal(
+        np.float32(response.embeddings), [sample_embeddings[text] for text in sample_texts]
+    )
+    assert [(layout.algorithm, layout.dimension) for layout in response.layouts] == [
+        ("pca", 2),
+        ("pca", 3),
+        ("umap", 3),
+    ]
+    pca_2d, pca_3d, umap_3d = response.layouts
+    assert pca_2d.x == reductions["pca"][0][:, 0].tolist()
+    assert pca_2d.y == reductions["pca"][0][:, 1].tolist()
+    assert pca_2d.z is None
+    assert pca_3d.z == reductions["pca"][1][:, 2].tolist()
+    assert np.array_equal(np.float32(umap_3d.x), reductions["umap"][1][:, 0])
+    assert _decoded(payload) == response.model_dump()
+
+
+def test_columnar_payload_precision(sample_texts, sample_embeddings, sample_layouts):
+    """Test the columnar payload rounds coordinates and can leave out embeddings."""
+    payload = columnar_payload(
+        sample_texts, None, sample_layouts, "layout", precision=1, embeddings_id="layout"
+    )
+
+    response = VisualizationResponseV2.model_validate(_decoded(payload))
+    assert response.embeddings is None
+    assert response.embeddings_id == "layout"
+    assert response.layouts[0].x == np.round(sample_layouts["pca"][0][:, 0], 1).tolist()
+
+
+def test_embeddings_payload(sample_texts, sample_embeddings):
+    """Test the embeddings payload follows the response model."""
+    payload = embeddings_payload(sample_texts, sample_embeddings, precision=3)
+
+    response = EmbeddingsResponse.model_validate(_decoded(payload))
+    assert [result.label for result in response.results] == sample_texts
+    assert (
+        response.results[1].embedding
+        == np.round(sample_embeddings[sample_texts[1]].astype(np.float64), 3).tolist()
+    )
+
+
+def test_payload_json_response(sample_texts, sample_embeddings, sample_layouts):
+    """Test the payload is serialized as JSON, with float32 arrays in shortest form."""
+    payload = visualization_payload(sample_texts, sample_embeddings, sample_layouts)
+
+    response = PayloadJSONResponse(payload)
+
+    assert response.media_type == "application/json"
+    body = json.loads(response.body)
+    assert body["results"][0]["embedding"] == [0.1, 0.2, 0.3]
+    assert body["results"][2]["reductions"][2]["coordinates_3d"] == {"x": 2, "y": 2, "z": 2}
+
+
+def test_payload_msgpack_response(sample_texts, sample_embeddings, sample_layouts):
+    """Test the payload is serialized as MessagePack with single-precision floats."""
+    payload = visualization_payload(sample_texts, sample_embeddings, sample_layouts, "layout")
+
+    response = PayloadMsgpackResponse(payload)
+
+    assert response.media_type == "application/msgpack"
+    decoded = msgpack.unpackb(response.body)
+    assert [item["embedding"] for item in decoded["results"]] == [
+        sample_embeddings[text].tolist() for text in sample_texts
+    ]
+    assert [item["reductions"] for item in decoded["results"]] == [
+        item["reductions"] for item in _decoded(payload)["results"]
+    ]
+    assert decoded["layout_id"] == "layout"
+    assert len(response.body) < len(PayloadJSONResponse(payload).body)
+
+
+@pytest.mark.parametrize(
+    ("accept", "media_type"),
+    [
+        (None, "application/json"),
+        ("*/*", "application/json"),
+        ("application/json", "application/json"),
+        ("application/msgpack", "application/msgpack"),
+        ("application/x-msgpack, application/json;q=0.9", "application/msgpack"),
+        ("application/json, application/msgpack;q=0.5", "application/json"),
+        ("application/msgpack;q=0", "application/json"),
+        ("text/html", "application/json"),
+    ],
+)
+def test_payload_response_negotiates_format(
+    sample_texts, sample_embeddings, sample_layouts, accept, media_type
+):
+    """Test MessagePack is only returned when the client prefers it."""
+    payload = visualization_payload(sample_texts, sample_embeddings, sample_layouts)
+
+    response = payload_response(payload, accept)
+
+    assert response.media_type == media_type
+    assert response.headers["vary"] == "Accept"
@@ -1,10 +1,41 @@
 """Tests for API router endpoints."""
 
+import json
+from typing import cast
+from unittest.mock import MagicMock
+
+import msgpack
+import numpy as np
 import pytest
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.testclient import TestClient
 
-from app.api.router import visualize_text
-from app.models.schemas import ItemResult, VisualizationRequest, VisualizationResponse
+from app.api.dependencies import (
+    get_cache_service,
+    get_embedding_resolver,
+    get_posthog,
+    get_reduction_resolver,
+    verify_auth_token,
+)
+from app.api.router import (
+    embed_texts,
+    extend_visualization,
+    get_visualization_embeddings,
+    visualize_text,
+)
+from app.models.schemas import (
+    Coordinates2D,
+    EmbeddingsRequest,
+    EmbeddingsResponse,
+    EmbedRequest,
+    EmbedTextInput,
+    ExtendVisualizationRequest,
+    ItemResult,
+    TextInput,
+    VisualizationRequest,
+    VisualizationResponse,
+    VisualizationResponseV2,
+)
 
 
 class TestHealthEndpoint:
@@ -17,6 +48,37 @@ class TestHealthEndpoint:
         assert response.json() == {"status": "healthy"}
 
 
+class TestReadyEndpoint:
+    """Tests for the readiness check endpoint."""
+
+    def test_ready_when_model_warm(self, test_client: TestClient):
+        """Test readiness endpoint reports a warm model after startup."""
+        response = test_client.get("/embedding-visualizer/api/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready", "model": "warm"}
+
+    def test_not_ready_when_model_cold(self, test_client: TestClient):
+        """Test readiness endpoint returns 503 while the model is cold."""
+        cast(FastAPI, test_client.app).state.embedding_service.is_warm = False
+        response = test_client.get("/embedding-visualizer/api/ready")
+        assert response.status_code == 503
+        assert response.json() == {"status": "not ready", "model": "cold"}
+
+
+class TestStatsEndpoint:
+    """Tests for the runtime statistics endpoint."""
+
+    def test_stats(self, test_client: TestClient):
+        """Test stats endpoint reports batcher, cache and reduction statistics."""
+        response = test_client.get("/embedding-visualizer/api/stats")
+        assert response.status_code == 200
+        batcher_stats = response.json()["embedding_batcher"]
+        assert batcher_stats["batches"] == 0
+        assert batcher_stats["queued_requests"] == 0
+        assert "memory_hits" in response.json()["cache"]
+        assert response.json()["reductions"]["tsne_fits"] == 0
+
+
 class TestVisualizeEndpoint:
     """Tests for the text visualization endpoint."""
 
@@ -28,9 +90,11 @@ class TestVisualizeEndpoint:
     @pytest.mark.asyncio
     async def test_visualize_text_function_all_cached(
         self,
-        mock_embedding_service,
+        mock_embedding_batcher,
         mock_dimensionality_service,
         mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
         visualization_request,
         sample_embeddings,
     ):
@@ -40,36 +104,38 @@ class TestVisualizeEndpoint:
         # Call function directly
         response = await visualize_text(
             request=visualization_request,
-            embedding_service=mock_embedding_service,
-            dim_reduction_service=mock_dimensionality_service,
-            cache_service=mock_cache_service,
+            embedding_resolver=embedding_resolver,
+            reduction_resolver=reduction_resolver,
+            response=Response(),
         )
 
-        # Verify embedding service was not called (all embeddings were cached)
-        mock_embedding_service.generate_embeddings.assert_not_called()
+        # Verify embedding batcher was not called (all embeddings were cached)
+        mock_embedding_batcher.generate_embeddings.assert_not_called()
 
         # Verify cache service was used
         mock_cache_service.get_embeddings.assert_called_once()
 
         # Verify dimensionality reduction was performed
-        mock_dimensionality_service.reduce_all.assert_called_once()
+        mock_dimensionality_service.fit_layouts.assert_called_once()
 
         # Verify response structure and content
-        assert isinstance(response, VisualizationResponse)
+        response = VisualizationResponse.model_validate_json(response.body)
         assert len(response.results) == 3
 
         for result in response.results:
             assert isinstance(result, ItemResult)
             assert result.label in sample_embeddings
-            assert result.embedding == sample_embeddings[result.label]
+            assert np.array_equal(np.float32(result.embedding), sample_embeddings[result.label])
             assert len(result.reductions) == 3
 
     @pytest.mark.asyncio
     async def test_visualize_text_function_partial_cache(
         self,
-        mock_embedding_service,
+        mock_embedding_batcher,
         mock_dimensionality_service,
         mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
         visualization_request,
         sample_embeddings,
     ):
@@ -78,38 +144,40 @@ class TestVisualizeEndpoint:
         partial_embeddings = {"test text 1": sample_embeddings["test text 1"]}
         mock_cache_service.get_embeddings.return_value = partial_embeddings
 
-        # Configure embedding service to return missing embeddings
+        # Configure embedding batcher to return missing embeddings
         missing_embeddings = {
             "test text 2": sample_embeddings["test text 2"],
             "test text 3": sample_embeddings["test text 3"],
         }
-        mock_embedding_service.generate_embeddings.return_value = missing_embeddings
+        mock_embedding_batcher.generate_embeddings.return_value = missing_embeddings
 
         # Call function directly
         response = await visualize_text(
             request=visualization_request,
-            embedding_service=mock_embedding_service,
-            dim_reduction_service=mock_dimensionality_service,
-            cache_service=mock_cache_service,
+            embedding_resolver=embedding_resolver,
+            reduction_resolver=reduction_resolver,
+            response=Response(),
         )
 
-        # Verify embedding service was called for missing embeddings
-        mock_embedding_service.generate_embeddings.assert_called_once()
+        # Verify embedding batcher was called for missing embeddings
+        mock_embedding_batcher.generate_embeddings.assert_called_once()
 
         # Verify cache service was used and new embeddings were stored
         mock_cache_service.get_embeddings.assert_called_once()
         mock_cache_service.store_embeddings.assert_called_once_with(missing_embeddings)
 
         # Verify response structure
-        assert isinstance(response, VisualizationResponse)
+        response = VisualizationResponse.model_validate_json(response.body)
         assert len(response.results) == 3
 
     @pytest.mark.asyncio
     async def test_visualize_text_function_no_cache(
         self,
-        mock_embedding_service,
+        mock_embedding_batcher,
         mock_dimensionality_service,
         mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
         visualization_request,
         sample_embeddings,
     ):
@@ -117,24 +185,554 @@ class TestVisualizeEndpoint:
         # Configure cache to return empty dictionary (no cache hits)
         mock_cache_service.get_embeddings.return_value = {}
 
-        # Configure embedding service to return all embeddings
-        mock_embedding_service.generate_embeddings.return_value = sample_embeddings
+        # Configure embedding batcher to return all embeddings
+        mock_embedding_batcher.generate_embeddings.return_value = sample_embeddings
 
         # Call function directly
         response = await visualize_text(
             request=visualization_request,
-            embedding_service=mock_embedding_service,
-            dim_reduction_service=mock_dimensionality_service,
-            cache_service=mock_cache_service,
+            embedding_resolver=embedding_resolver,
+            reduction_resolver=reduction_resolver,
+            response=Response(),
         )
 
-        # Verify embedding service was called for all embeddings
-        mock_embedding_service.generate_embeddings.assert_called_once()
+        # Verify embedding batcher was called for all embeddings
+        mock_embedding_batcher.generate_embeddings.assert_called_once()
 
         # Verify cache service was used and all embeddings were stored
         mock_cache_service.get_embeddings.assert_called_once()
         mock_cache_service.store_embeddings.assert_called_once_with(sample_embeddings)
 
         # Verify response structure
-        assert isinstance(response, VisualizationResponse)
+        response = VisualizationResponse.model_validate_json(response.body)
         assert len(response.results) == 3
+
+    @pytest.mark.asyncio
+    async def test_visualize_text_function_selected_algorithms(
+        self,
+        mock_dimensionality_service,
+        mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
+        sample_texts,
+        sample_text_inputs,
+        sample_embeddings,
+    ):
+        """Test the requested algorithms and dimensions are passed to the reduction."""
+        mock_cache_service.get_embeddings.return_value = sample_embeddings
+
+        response = await visualize_text(
+            request=VisualizationRequest(
+                texts=sample_text_inputs, algorithms=["pca"], dimensions=[2]
+            ),
+            embedding_resolver=embedding_resolver,
+            reduction_resolver=reduction_resolver,
+            response=Response(),
+        )
+
+        mock_dimensionality_service.fit_layouts.assert_called_once_with(
+            sample_embeddings, {"pca"}, {2}, None
+        )
+        response = VisualizationResponse.model_validate_json(response.body)
+        assert [len(result.reductions) for result in response.results] == [1, 1, 1]
+        assert response.results[1].reductions[0].algorithm == "pca"
+        assert response.results[1].reductions[0].coordinates_2d == Coordinates2D(x=0, y=0)
+        assert response.results[1].reductions[0].coordinates_3d is None
+        assert response.layout_id == "layout"
+        mock_cache_service.store_layout_texts.assert_called_once_with("layout", sample_texts)
+
+    @pytest.mark.asyncio
+    async def test_visualize_text_function_msgpack(
+        self,
+        mock_dimensionality_service,
+        mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
+        visualization_request,
+        sample_embeddings,
+    ):
+        """Test the response is encoded as MessagePack when the client asks for it."""
+        mock_cache_service.get_embeddings.return_value = sample_embeddings
+
+        response = await visualize_text(
+            request=visualization_request,
+            embedding_resolver=embedding_resolver,
+            reduction_resolver=reduction_resolver,
+            accept="application/msgpack",
+            response=Response(),
+        )
+
+        assert response.media_type == "application/msgpack"
+        response = VisualizationResponse.model_validate(msgpack.unpackb(response.body))
+        assert [result.label for result in response.results] == list(sample_embeddings)
+        assert len(response.results[0].reductions) == 3
+
+    @pytest.mark.asyncio
+    async def test_visualize_text_function_embeddings_by_handle(
+        self,
+        mock_dimensionality_service,
+        mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
+        sample_text_inputs,
+        sample_embeddings,
+    ):
+        """Test embeddings are replaced by a handle and coordinates rounded."""
+        mock_cache_service.get_embeddings.return_value = sample_embeddings
+
+        response = await visualize_text(
+            request=VisualizationRequest(
+                texts=sample_text_inputs, embeddings="handle", precision=1
+            ),
+            embedding_resolver=embedding_resolver,
+            reduction_resolver=reduction_resolver,
+            response=Response(),
+        )
+
+        response = VisualizationResponse.model_validate_json(response.body)
+        assert [result.embedding for result in response.results] == [None, None, None]
+        assert response.embeddings_id == response.layout_id == "layout"
+        for result in response.results:
+            for reduction in result.reductions:
+                assert reduction.coordinates_2d.x == round(reduction.coordinates_2d.x, 1)
+
+    @pytest.mark.asyncio
+    async def test_visualize_text_function_omit_embeddings(
+        self,
+        mock_dimensionality_service,
+        mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
+        sample_text_inputs,
+        sample_embeddings,
+    ):
+        """Test embeddings are left out without a handle to fetch them."""
+        mock_cache_service.get_embeddings.return_value = sample_embeddings
+
+        response = await visualize_text(
+            request=VisualizationRequest(texts=sample_text_inputs, embeddings="omit"),
+            embedding_resolver=embedding_resolver,
+            reduction_resolver=reduction_resolver,
+            response=Response(),
+        )
+
+        response = VisualizationResponse.model_validate_json(response.body)
+        assert [result.embedding for result in response.results] == [None, None, None]
+        assert response.embeddings_id is None
+
+    @pytest.mark.asyncio
+    async def test_visualize_text_function_columnar(
+        self,
+        mock_dimensionality_service,
+        mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
+        sample_texts,
+        sample_text_inputs,
+        sample_embeddings,
+    ):
+        """Test version 2 requests get the columnar response."""
+        mock_cache_service.get_embeddings.return_value = sample_embeddings
+
+        response = await visualize_text(
+            request=VisualizationRequest(texts=sample_text_inputs, dimensions=[2], version=2),
+            embedding_resolver=embedding_resolver,
+            reduction_resolver=reduction_resolver,
+            response=Response(),
+        )
+
+        response = VisualizationResponseV2.model_validate_json(response.body)
+        assert response.labels == sample_texts
+        assert [layout.algorithm for layout in response.layouts] == ["pca", "tsne", "umap"]
+        assert all(len(layout.x) == len(sample_texts) for layout in response.layouts)
+        assert response.layout_id == "layout"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("version", [1, 2])
+    async def test_visualize_text_function_repeated_texts(
+        self,
+        mock_dimensionality_service,
+        mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
+        sample_texts,
+        sample_embeddings,
+        version,
+    ):
+        """Test repeated texts get the layout rows of their first occurrence."""
+        mock_cache_service.get_embeddings.return_value = sample_embeddings
+        rows = np.arange(len(sample_texts), dtype=np.float32)[:, None]
+        mock_dimensionality_service.fit_layouts.side_effect = lambda *_: (
+            {"pca": (np.hstack([rows, -rows]), None)},
+            {("pca", 2): MagicMock()},
+        )
+        texts = [sample_texts[1], sample_texts[0], sample_texts[1], sample_texts[2]]
+
+        response = await visualize_text(
+            request=VisualizationRequest(
+                texts=[TextInput(text=text) for text in texts],
+                algorithms=["pca"],
+                dimensions=[2],
+                version=version,
+            ),
+            embedding_resolver=embedding_resolver,
+            reduction_resolver=reduction_resolver,
+            response=Response(),
+        )
+
+        # Layout rows follow the distinct texts in the order they first appear
+        if version == 1:
+            response = VisualizationResponse.model_validate_json(response.body)
+            assert [result.label for result in response.results] == texts
+            assert [result.reductions[0].coordinates_2d.x for result in response.results] == [
+                0,
+                1,
+                0,
+                2,
+            ]
+        else:
+            response = VisualizationResponseV2.model_validate_json(response.body)
+            assert response.labels == texts
+            assert response.layouts[0].x == [0, 1, 0, 2]
+            assert response.layouts[0].y == [0, -1, 0, -2]
+
+
+class TestExtendVisualizationEndpoint:
+    """Tests for adding texts to an existing layout."""
+
+    @pytest.mark.asyncio
+    async def test_extend_visualization(
+        self,
+        mock_dimensionality_service,
+        mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
+        sample_texts,
+        sample_embeddings,
+    ):
+        """Test new texts are placed into the stored layout's fitted models."""
+        mock_cache_service.get_layout_texts.return_value = sample_texts
+        mock_cache_service.get_embeddings.side_effect = lambda texts: {
+            text: sample_embeddings[text] for text in texts
+        }
+
+        response = await extend_visualization(
+            request=ExtendVisualizationRequest(
+                layout_id="a" * 64,
+                texts=[TextInput(text="test text 2")],
+                algorithms=["pca"],
+                dimensions=[2],
+            ),
+            embedding_resolver=embedding_resolver,
+            reduction_resolver=reduction_resolver,
+            response=Response(),
+        )
+
+        reference = mock_dimensionality_service.fit_reducers.call_args[0][0]
+        assert list(reference) == sample_texts
+        (reducers, embeddings) = mock_dimensionality_service.transform.call_args[0]
+        assert list(reducers) == [("pca", 2)]
+        assert list(embeddings) == ["test text 2"]
+        response = VisualizationResponse.model_validate_json(response.body)
+        assert response.layout_id == "a" * 64
+        assert [result.label for result in response.results] == ["test text 2"]
+
+    @pytest.mark.asyncio
+    async def test_extend_too_many_texts(
+        self,
+        test_settings,
+        mock_dimensionality_service,
+        mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
+    ):
+        """Test requests with more texts than allowed are rejected."""
+        test_settings.max_texts = 1
+
+        with pytest.raises(HTTPException) as exc_info:
+            await extend_visualization(
+                request=ExtendVisualizationRequest(
+                    layout_id="a" * 64,
+                    texts=[TextInput(text="test text 1"), TextInput(text="test text 2")],
+                ),
+                embedding_resolver=embedding_resolver,
+                reduction_resolver=reduction_resolver,
+                response=Response(),
+            )
+
+        assert exc_info.value.status_code == 422
+        mock_cache_service.get_layout_texts.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_extend_unknown_layout(
+        self,
+        mock_dimensionality_service,
+        mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
+    ):
+        """Test an unknown or expired layout is reported as not found."""
+        mock_cache_service.get_layout_texts.return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            await extend_visualization(
+                request=ExtendVisualizationRequest(
+                    layout_id="a" * 64, texts=[TextInput(text="test text")]
+                ),
+                embedding_resolver=embedding_resolver,
+                reduction_resolver=reduction_resolver,
+                response=Response(),
+            )
+
+        assert exc_info.value.status_code == 404
+        mock_dimensionality_service.fit_reducers.assert_not_called()
+
+
+class TestVisualizationEmbeddingsEndpoint:
+    """Tests for fetching embeddings by the handle from a visualization response."""
+
+    @pytest.mark.asyncio
+    async def test_get_visualization_embeddings(
+        self,
+        mock_cache_service,
+        embedding_resolver,
+        reduction_resolver,
+        sample_texts,
+        sample_embeddings,
+    ):
+        """Test the embeddings of the texts behind the handle are returned."""
+        mock_cache_service.get_layout_texts.return_value = sample_texts
+        mock_cache_service.get_embeddings.return_value = sample_embeddings
+
+        response = await get_visualization_embeddings(
+            request=EmbeddingsRequest(embeddings_id="a" * 64),
+            embedding_resolver=embedding_resolver,
+            reduction_resolver=reduction_resolver,
+            response=Response(),
+        )
+
+        mock_cache_service.get_layout_texts.assert_called_once_with("a" * 64)
+        response = EmbeddingsResponse.model_validate_json(response.body)
+        assert [result.label for result in response.results] == sample_texts
+        assert np.array_equal(
+            np.float32(response.results[0].embedding), sample_embeddings[sample_texts[0]]
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_visualization_embeddings_unknown_handle(
+        self,
+        mock_cache_service,
+        mock_embedding_batcher,
+        embedding_resolver,
+        reduction_resolver,
+    ):
+        """Test an unknown or expired handle is reported as not found."""
+        mock_cache_service.get_layout_texts.return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_visualization_embeddings(
+                request=EmbeddingsRequest(embeddings_id="a" * 64),
+                embedding_resolver=embedding_resolver,
+                reduction_resolver=reduction_resolver,
+                response=Response(),
+            )
+
+        assert exc_info.value.status_code == 404
+        mock_embedding_batcher.generate_embeddings.assert_not_called()
+
+
+async def _read_stream(response):
+    """Read the whole body of a streaming response."""
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+class TestEmbedEndpoint:
+    """Tests for the streaming batch embedding endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_embed_texts_streams_ndjson(
+        self,
+        test_settings,
+        mock_cache_service,
+        mock_embedding_batcher,
+        embedding_resolver,
+        sample_texts,
+        sample_embeddings,
+    ):
+        """Test embeddings are resolved chunk by chunk and streamed as JSON lines."""
+        test_settings.embed_chunk_size = 2
+        mock_cache_service.get_embeddings.side_effect = lambda texts: {
+            text: sample_embeddings[text] for text in texts
+        }
+        texts = [*sample_texts, sample_texts[0]]
+
+        response = await embed_texts(
+            request=EmbedRequest(texts=[EmbedTextInput(text=text) for text in texts]),
+            embedding_resolver=embedding_resolver,
+            response=Response(),
+        )
+
+        assert response.media_type == "application/x-ndjson"
+        records = [json.loads(line) for line in (await _read_stream(response)).splitlines()]
+        assert [record["label"] for record in records] == texts
+        for record in records:
+            assert np.array_equal(
+                np.float32(record["embedding"]), sample_embeddings[record["label"]]
+            )
+        chunks = [call.args[0] for call in mock_cache_service.get_embeddings.call_args_list]
+        assert chunks == [texts[:2], texts[2:]]
+        mock_embedding_batcher.generate_embeddings.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_embed_texts_streams_msgpack(
+        self,
+        mock_cache_service,
+        embedding_resolver,
+        sample_texts,
+        sample_embeddings,
+    ):
+        """Test embeddings are streamed as MessagePack objects when asked for."""
+        mock_cache_service.get_embeddings.return_value = sample_embeddings
+
+        response = await embed_texts(
+            request=EmbedRequest(
+                texts=[EmbedTextInput(text=text) for text in sample_texts], precision=1
+            ),
+            embedding_resolver=embedding_resolver,
+            accept="application/msgpack",
+            response=Response(),
+        )
+
+        assert response.media_type == "application/msgpack"
+        unpacker = msgpack.Unpacker()
+        unpacker.feed(await _read_stream(response))
+        records = list(unpacker)
+        assert [record["label"] for record in records] == sample_texts
+        assert np.allclose(records[0]["embedding"], [0.1, 0.2, 0.3])
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("accept", [None, "application/msgpack"])
+    async def test_embed_texts_failure_ends_stream(
+        self,
+        test_settings,
+        mock_cache_service,
+        embedding_resolver,
+        sample_texts,
+        sample_embeddings,
+        accept,
+    ):
+        """Test a failure after the first chunk ends the stream with an error record."""
+        test_settings.embed_chunk_size = 2
+        mock_cache_service.get_embeddings.side_effect = [
+            {text: sample_embeddings[text] for text in sample_texts[:2]},
+            RuntimeError("Cache unavailable"),
+        ]
+
+        response = await embed_texts(
+            request=EmbedRequest(texts=[EmbedTextInput(text=text) for text in sample_texts]),
+            embedding_resolver=embedding_resolver,
+            accept=accept,
+            response=Response(),
+        )
+
+        body = await _read_stream(response)
+        if accept is None:
+            records = [json.loads(line) for line in body.splitlines()]
+        else:
+            unpacker = msgpack.Unpacker()
+            unpacker.feed(body)
+            records = list(unpacker)
+        assert [record["label"] for record in records[:-1]] == sample_texts[:2]
+        assert records[-1] == {"error": "Failed to process text: Cache unavailable"}
+
+    def test_embed_texts_accepts_long_texts(self):
+        """Test the embedding endpoint takes texts longer than visualizations do."""
+        request = EmbedRequest(texts=[EmbedTextInput(text="a" * 1000)])
+
+        assert len(request.texts[0].text) == 1000
+        with pytest.raises(ValueError):
+            EmbedTextInput(text="a" * 1001)
+
+    @pytest.mark.asyncio
+    async def test_embed_too_many_texts(
+        self,
+        test_settings,
+        mock_cache_service,
+        embedding_resolver,
+    ):
+        """Test requests with more texts than allowed are rejected."""
+        test_settings.embed_max_texts = 1
+
+        with pytest.raises(HTTPException) as exc_info:
+            await embed_texts(
+                request=EmbedRequest(
+                    texts=[EmbedTextInput(text="test text 1"), EmbedTextInput(text="test text 2")]
+                ),
+                embedding_resolver=embedding_resolver,
+                response=Response(),
+            )
+
+        assert exc_info.value.status_code == 422
+        mock_cache_service.get_embeddings.assert_not_called()
+
+
+class TestRateLimitHeaders:
+    """Tests for rate limit headers on successful responses."""
+
+    @pytest.fixture
+    def rate_limited_client(
+        self,
+        test_client,
+        mock_auth_request_state,
+        mock_cache_service,
+        mock_dimensionality_service,
+        embedding_resolver,
+        reduction_resolver,
+        sample_texts,
+        sample_embeddings,
+    ):
+        """Create a test client for a signed-in user, with mocked services."""
+        mock_cache_service.get_embeddings.side_effect = lambda texts: {
+            text: sample_embeddings[text] for text in texts
+        }
+        mock_cache_service.get_layout_texts.return_value = sample_texts
+        app = cast(FastAPI, test_client.app)
+        app.dependency_overrides.update(
+            {
+                verify_auth_token: lambda: mock_auth_request_state,
+                get_posthog: lambda: MagicMock(),
+                get_cache_service: lambda: mock_cache_service,
+                get_embedding_resolver: lambda: embedding_resolver,
+                get_reduction_resolver: lambda: reduction_resolver,
+            }
+        )
+        yield test_client
+        app.dependency_overrides.clear()
+
+    @pytest.mark.parametrize(
+        ("path", "body"),
+        [
+            (
+                "/visualize",
+                {
+                    "texts": [{"text": f"test text {i}"} for i in (1, 2, 3)],
+                    "algorithms": ["pca"],
+                },
+            ),
+            (
+                "/visualize/extend",
+                {"layout_id": "a" * 64, "texts": [{"text": "test text 2"}], "algorithms": ["pca"]},
+            ),
+            ("/visualize/embeddings", {"embeddings_id": "a" * 64}),
+            ("/embed", {"texts": [{"text": "test text 1"}]}),
+        ],
+    )
+    def test_rate_limit_headers(self, rate_limited_client, path, body):
+        """Test endpoints returning their own response still send the rate limit headers."""
+        response = rate_limited_client.post(f"/embedding-visualizer/api{path}", json=body)
+
+        assert response.status_code == 200
+        assert response.headers["x-ratelimit-limit"] == "5"
+        assert response.headers["x-ratelimit-remaining"] == "4"
+        assert response.headers["x-ratelimit-reset"] == "60"
+        assert response.headers["vary"] == "Accept"
@@ -1,5 +1,7 @@
 """Tests for the main application module."""
 
+from unittest.mock import patch
+
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
@@ -36,3 +38,21 @@ class TestAppHealthEndpoint:
 
         assert response.status_code == 200
         assert response.json() == {"status": "healthy"}
+
+
+class TestAppLifespan:
+    """Test suite for application startup."""
+
+    def test_reduction_warm_up(self, test_settings):
+        """Verify reductions are warmed up at startup and the time is reported."""
+        test_settings.reduction_warm_up = True
+        with (
+            patch("app.services.embedding.SentenceTransformer"),
+            patch("main.warm_up_reductions", return_value=0.5) as mock_warm_up,
+            TestClient(app) as client,
+        ):
+            response = client.get("/embedding-visualizer/api/stats")
+
+        mock_warm_up.assert_called_once()
+        warm_up_seconds = response.json()["warm_up_seconds"]
+        assert set(warm_up_seconds) == {"embedding_model", "reductions"}
@@ -0,0 +1,93 @@
+"""Tests for the embedding batcher."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+
+from app.models.schemas import TextInput
+from app.services.batching import EmbeddingBatcher
+
+
+@pytest.fixture
+def mock_embedding_service():
+    """Mock embedding service returning a vector derived from each text."""
+    service = MagicMock()
+    service.generate_embeddings.side_effect = lambda texts: {
+        text.text: [float(len(text.text))] for text in texts
+    }
+    return service
+
+
+@pytest_asyncio.fixture
+async def embedding_batcher(mock_embedding_service):
+    """Create and start an embedding batcher running encodes on the default executor."""
+    batcher = EmbeddingBatcher(
+        mock_embedding_service,
+        executor=None,
+        max_batch_size=4,
+        max_wait_ms=50,
+    )
+    batcher.start()
+    yield batcher
+    await batcher.stop()
+
+
+def _inputs(*texts):
+    """Build text inputs from strings."""
+    return [TextInput(text=text) for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_encode(embedding_batcher, mock_embedding_service):
+    """Test concurrent requests are merged into a single deduplicated encode call."""
+    results = await asyncio.gather(
+        embedding_batcher.generate_embeddings(_inputs("a", "bb")),
+        embedding_batcher.generate_embeddings(_inputs("bb", "ccc")),
+    )
+
+    # Each caller gets exactly its own vectors
+    assert results[0] == {"a": [1.0], "bb": [2.0]}
+    assert results[1] == {"bb": [2.0], "ccc": [3.0]}
+
+    # Texts were deduplicated into one encode call
+    mock_embedding_service.generate_embeddings.assert_called_once()
+    encoded = mock_embedding_service.generate_embeddings.call_args[0][0]
+    assert [text.text for text in encoded] == ["a", "bb", "ccc"]
+
+    stats = embedding_batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["requests"] == 2
+    assert stats["texts"] == 3
+    assert stats["max_batch_texts"] == 3
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size_splits_batches(embedding_batcher, mock_embedding_service):
+    """Test requests that would overflow the batch are carried into the next one."""
+    results = await asyncio.gather(
+        embedding_batcher.generate_embeddings(_inputs("a", "b", "c")),
+        embedding_batcher.generate_embeddings(_inputs("dd", "ee")),
+    )
+
+    assert results[0] == {"a": [1.0], "b": [1.0], "c": [1.0]}
+    assert results[1] == {"dd": [2.0], "ee": [2.0]}
+    assert mock_embedding_service.generate_embeddings.call_count == 2
+    assert embedding_batcher.stats()["max_batch_texts"] == 3
+
+
+@pytest.mark.asyncio
+async def test_encode_error_propagates(embedding_batcher, mock_embedding_service):
+    """Test an encode failure is raised to every caller in the batch."""
+    mock_embedding_service.generate_embeddings.side_effect = RuntimeError("encode failed")
+
+    with pytest.raises(RuntimeError, match="encode failed"):
+        await embedding_batcher.generate_embeddings(_inputs("a"))
+
+
+@pytest.mark.asyncio
+async def test_empty_request(embedding_batcher, mock_embedding_service):
+    """Test an empty request returns immediately without encoding."""
+    assert await embedding_batcher.generate_embeddings([]) == {}
+    mock_embedding_service.generate_embeddings.assert_not_called()
@@ -1,11 +1,22 @@
 """Tests for the cache service."""
 
-from unittest.mock import AsyncMock, patch
+import pickle
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
 from redis.exceptions import RedisError
 
-from app.services.cache import CacheService
+from app.services.cache import (
+    CacheService,
+    LRUCache,
+    _decode_embedding,
+    _decode_layout,
+    _encode_embedding,
+    _encode_layout,
+    _encode_reducer,
+    create_redis_client,
+)
 
 
 @pytest.fixture
@@ -17,6 +28,17 @@ def mock_redis():
         redis_instance.setex.return_value = True
         redis_instance.incr.return_value = 1
         redis_instance.expire.return_value = True
+
+        # Registered Lua scripts are awaited with keys and args
+        rate_limit_script = AsyncMock(return_value=[1, 1, 60000])
+        redis_instance.register_script = MagicMock(return_value=rate_limit_script)
+        redis_instance.mget.return_value = []
+
+        # Pipelines queue commands synchronously and send them on execute
+        pipeline = MagicMock()
+        pipeline.execute = AsyncMock(return_value=[])
+        redis_instance.pipeline = MagicMock(return_value=pipeline)
+
         mock.return_value = redis_instance
         yield redis_instance
 
@@ -51,6 +73,87 @@ def test_cache_service_init_enabled(mock_redis, test_settings):
         assert service.ttl == test_settings.cache_ttl_seconds
 
 
+def test_cache_service_shared_client(test_settings):
+    """Test a given Redis client is used instead of creating a new pool."""
+    client = AsyncMock()
+    client.register_script = MagicMock()
+    with (
+        patch("app.services.cache.get_settings", return_value=test_settings),
+        patch("app.services.cache.create_redis_client") as mock_create,
+    ):
+        service = CacheService(redis=client)
+
+    assert service.redis is client
+    mock_create.assert_not_called()
+
+
+def test_create_redis_client_pool(test_settings):
+    """Test the Redis client uses a bounded, timed-out connection pool."""
+    test_settings.cache_max_connections = 7
+    test_settings.cache_socket_timeout_seconds = 1.5
+    test_settings.cache_socket_connect_timeout_seconds = 0.5
+
+    client = create_redis_client(test_settings)
+
+    pool = client.connection_pool
+    assert pool.max_connections == 7
+    assert pool.timeout == 2
+    assert pool.connection_kwargs["socket_timeout"] == 1.5
+    assert pool.connection_kwargs["socket_connect_timeout"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_close(cache_service, mock_redis):
+    """Test closing the service closes the client and its pool."""
+    await cache_service.close()
+    mock_redis.aclose.assert_called_once_with(close_connection_pool=True)
+
+
+def test_lru_cache_evicts_by_entries():
+    """Test the LRU cache evicts the least recently used entry when full."""
+    cache: LRUCache[str] = LRUCache(max_entries=2, max_bytes=1000)
+    cache.put("a", "A", 1)
+    cache.put("b", "B", 1)
+    assert cache.get("a") == "A"  # "a" is now most recently used
+    cache.put("c", "C", 1)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats() == {"entries": 2, "bytes": 2, "hits": 3, "misses": 1, "evictions": 1}
+
+
+def test_lru_cache_evicts_by_bytes():
+    """Test the LRU cache stays within its byte budget."""
+    cache: LRUCache[str] = LRUCache(max_entries=10, max_bytes=10)
+    cache.put("a", "A", 4)
+    cache.put("b", "B", 4)
+    cache.put("c", "C", 4)
+    assert len(cache) == 2
+    assert cache.bytes == 8
+    assert cache.get("a") is None
+
+    # Values larger than the whole budget are not cached
+    cache.put("huge", "H", 11)
+    assert cache.get("huge") is None
+
+    # Replacing a value updates its size
+    cache.put("b", "B2", 1)
+    assert cache.bytes == 5
+
+
+def test_lru_cache_discard_prefix():
+    """Test removing all entries of a key namespace."""
+    cache: LRUCache[str] = LRUCache(max_entries=10, max_bytes=10)
+    cache.put("ns:a", "A", 1)
+    cache.put("ns:b", "B", 1)
+    cache.put("other:c", "C", 1)
+
+    assert cache.discard_prefix("ns:") == 2
+    assert len(cache) == 1
+    assert cache.bytes == 1
+
+
 def test_cache_service_init_disabled(mock_redis, test_settings):
     """Test initialization with cache disabled."""
     with patch("app.services.cache.get_settings", return_value=test_settings) as mock_settings:
@@ -60,20 +163,125 @@ def test_cache_service_init_disabled(mock_redis, test_settings):
         assert service.enabled is False
 
 
+def test_cache_key(cache_service):
+    """Test cache keys are fixed-length hashes namespaced by model and revision."""
+    key = cache_service._cache_key("test text")
+    assert key.startswith("embedding:test-model:main:")
+    assert len(key) == len("embedding:test-model:main:") + 64
+
+    # Long texts do not produce long keys
+    assert len(cache_service._cache_key("x" * 10_000)) == len(key)
+
+    # Canonically equivalent Unicode texts share a key, different texts do not
+    assert cache_service._cache_key("caf\u00e9") == cache_service._cache_key("cafe\u0301")
+    assert cache_service._cache_key("test text") != cache_service._cache_key("test text 2")
+
+
+def test_cache_key_model_namespace(mock_redis, test_settings):
+    """Test different models never share cache keys."""
+    with patch("app.services.cache.get_settings", return_value=test_settings):
+        test_settings.model_name = "model-a"
+        key_a = CacheService()._cache_key("test text")
+        test_settings.model_name = "model-b"
+        key_b = CacheService()._cache_key("test text")
+
+    assert key_a != key_b
+
+
+@pytest.mark.asyncio
+async def test_purge_namespace(cache_service, mock_redis):
+    """Test purging a model namespace scans and unlinks its keys in batches."""
+
+    async def scan_iter(match, count):
+        for i in range(5):
+            yield f"key-{i}".encode()
+
+    mock_redis.scan_iter = MagicMock(side_effect=scan_iter)
+    mock_redis.unlink.side_effect = lambda *keys: len(keys)
+
+    deleted = await cache_service.purge_namespace("other/model*", "v1", batch_size=2)
+
+    assert deleted == 10
+    assert [call[1] for call in mock_redis.scan_iter.call_args_list] == [
+        {"match": "embedding:other/model\\*:v1:*", "count": 2},
+        {"match": "layout:other/model\\*:v1:*", "count": 2},
+    ]
+    assert mock_redis.unlink.call_count == 6
+    mock_redis.keys.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_purge_namespace_layouts_in_memory(cache_service, mock_redis):
+    """Test purging a model namespace drops its layouts from the in-process tiers."""
+
+    async def scan_iter(match, count):
+        for key in ():
+            yield key
+
+    mock_redis.scan_iter = MagicMock(side_effect=scan_iter)
+    layout_id = cache_service.layout_id(["a"])
+    key = cache_service.layout_key(layout_id, "pca", 2, {})
+    await cache_service.store_layouts({key: np.ones((1, 2))})
+    await cache_service.store_layout_texts(layout_id, ["a"])
+    await cache_service.store_embedding("a", [0.1, 0.2])
+
+    assert await cache_service.purge_namespace() == 3
+    assert len(cache_service.layouts) == len(cache_service.layout_texts) == 0
+    assert len(cache_service.memory) == 0
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 1e-7), ("float16", 1e-3)])
+def test_embedding_binary_round_trip(dtype, tolerance):
+    """Test embeddings round trip through the binary cache format."""
+    embedding = np.array([0.1, -0.2, 0.3], dtype=np.float32)
+
+    encoded = _encode_embedding(embedding, dtype)
+    decoded = _decode_embedding(encoded)
+
+    assert encoded[:2] == b"EV"
+    assert decoded.dtype == np.float32
+    np.testing.assert_allclose(decoded, embedding, atol=tolerance)
+
+
+def test_embedding_binary_size():
+    """Test binary values are the header plus raw float bytes."""
+    embedding = np.zeros(384, dtype=np.float32)
+    assert len(_encode_embedding(embedding, "float32")) == 4 + 384 * 4
+    assert len(_encode_embedding(embedding, "float16")) == 4 + 384 * 2
+
+
+def test_decode_non_binary_embedding():
+    """Test values without the binary header are rejected."""
+    with pytest.raises(ValueError):
+        _decode_embedding(b"[0.1, 0.2, 0.3]")
+
+
+def test_decode_unsupported_version():
+    """Test values with an unknown format version are rejected."""
+    with pytest.raises(ValueError):
+        _decode_embedding(b"EV\x09\x00" + bytes(12))
+
+
 @pytest.mark.asyncio
 async def test_get_embedding_scenarios(cache_service, mock_redis):
     """Test various scenarios for getting an embedding."""
     # Success case
-    mock_redis.get.return_value = b'{"embedding": [0.1, 0.2, 0.3]}'
+    mock_redis.get.return_value = _encode_embedding([0.1, 0.2, 0.3])
     embedding = await cache_service.get_embedding("test text")
-    assert embedding == {"embedding": [0.1, 0.2, 0.3]}
-    mock_redis.get.assert_called_with("embedding:test text")
+    np.testing.assert_allclose(embedding, [0.1, 0.2, 0.3], rtol=1e-6)
+    mock_redis.get.assert_called_with(cache_service._cache_key("test text"))
 
     # Not found case
     mock_redis.get.return_value = None
-    embedding = await cache_service.get_embedding("test text")
+    embedding = await cache_service.get_embedding("other text")
     assert embedding is None
 
+    # Repeated lookups are served from memory without a Redis round trip
+    mock_redis.get.reset_mock()
+    embedding = await cache_service.get_embedding("test text")
+    np.testing.assert_allclose(embedding, [0.1, 0.2, 0.3], rtol=1e-6)
+    mock_redis.get.assert_not_called()
+
 
 @pytest.mark.asyncio
 async def test_store_embedding_scenarios(cache_service, mock_redis):
@@ -83,9 +291,9 @@ async def test_store_embedding_scenarios(cache_service, mock_redis):
     assert result is True
     mock_redis.setex.assert_called_once()
     args = mock_redis.setex.call_args[0]
-    assert args[0] == "embedding:test text"
+    assert args[0] == cache_service._cache_key("test text")
     assert args[1] == 3600
-    assert "[0.1, 0.2, 0.3]" in args[2]
+    np.testing.assert_allclose(_decode_embedding(args[2]), [0.1, 0.2, 0.3], rtol=1e-6)
 
     # Redis error case
     mock_redis.setex.side_effect = RedisError("Test Redis error")
@@ -95,69 +303,333 @@ async def test_store_embedding_scenarios(cache_service, mock_redis):
 
 @pytest.mark.asyncio
 async def test_get_embeddings_success(cache_service, mock_redis):
-    """Test getting multiple embeddings from cache."""
-
-    # Set up mock to return different values based on key
-    async def mock_get(key):
-        if key == "embedding:test text 1":
-            return b"[0.1, 0.2, 0.3]"
-        elif key == "embedding:test text 2":
-            return b"[0.4, 0.5, 0.6]"
-        return None
-
-    mock_redis.get = AsyncMock(side_effect=mock_get)
+    """Test getting multiple embeddings from cache with a single MGET."""
+    # Two entries and a miss
+    mock_redis.mget.return_value = [
+        _encode_embedding([0.1, 0.2, 0.3]),
+        _encode_embedding([0.4, 0.5, 0.6]),
+        None,
+    ]
 
     embeddings = await cache_service.get_embeddings(["test text 1", "test text 2", "test text 3"])
 
-    assert mock_redis.get.call_count == 3
+    mock_redis.mget.assert_called_once_with(
+        [cache_service._cache_key(text) for text in ["test text 1", "test text 2", "test text 3"]]
+    )
+    mock_redis.get.assert_not_called()
     assert len(embeddings) == 2
-    assert embeddings["test text 1"] == [0.1, 0.2, 0.3]
-    assert embeddings["test text 2"] == [0.4, 0.5, 0.6]
+    np.testing.assert_allclose(embeddings["test text 1"], [0.1, 0.2, 0.3], rtol=1e-6)
+    np.testing.assert_allclose(embeddings["test text 2"], [0.4, 0.5, 0.6], rtol=1e-6)
     assert "test text 3" not in embeddings
 
 
 @pytest.mark.asyncio
-async def test_store_embeddings(cache_service):
-    """Test storing multiple embeddings in cache."""
-    # Test successful store
-    with patch.object(CacheService, "store_embedding", AsyncMock(return_value=True)) as mock_store:
-        embeddings = {
-            "test text 1": [0.1, 0.2, 0.3],
-            "test text 2": [0.4, 0.5, 0.6],
-        }
-        result = await cache_service.store_embeddings(embeddings)
+async def test_get_embeddings_memory_tier(cache_service, mock_redis):
+    """Test stored and Redis-hit embeddings are served from memory afterwards."""
+    await cache_service.store_embeddings({"test text 1": [0.1, 0.2, 0.3]})
+    mock_redis.mget.return_value = [_encode_embedding([0.4, 0.5, 0.6]), None]
+
+    # First lookup only asks Redis for texts missing from memory
+    embeddings = await cache_service.get_embeddings(["test text 1", "test text 2", "test text 3"])
+    mock_redis.mget.assert_called_once_with(
+        [cache_service._cache_key("test text 2"), cache_service._cache_key("test text 3")]
+    )
+    assert set(embeddings) == {"test text 1", "test text 2"}
+
+    # Redis hits were promoted, so the second lookup needs no round trip
+    mock_redis.mget.reset_mock()
+    embeddings = await cache_service.get_embeddings(["test text 1", "test text 2"])
+    mock_redis.mget.assert_not_called()
+    np.testing.assert_allclose(embeddings["test text 2"], [0.4, 0.5, 0.6], rtol=1e-6)
+
+    # Cached arrays are shared, so they must not be writable
+    assert not embeddings["test text 1"].flags.writeable
+
+    stats = cache_service.stats()
+    assert stats["memory_hits"] == 3
+    assert stats["memory_misses"] == 2
+    assert stats["memory_entries"] == 2
+    assert stats["redis_hits"] == 1
+    assert stats["redis_misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_embeddings_errors(cache_service, mock_redis):
+    """Test corrupt entries are skipped and Redis errors return no hits."""
+    # A corrupt entry only drops that key
+    mock_redis.mget.return_value = [b"corrupt", _encode_embedding([0.4, 0.5, 0.6])]
+    embeddings = await cache_service.get_embeddings(["test text 1", "test text 2"])
+    assert list(embeddings) == ["test text 2"]
+
+    # A Redis error is treated as a full miss
+    mock_redis.mget.side_effect = RedisError("Test Redis error")
+    assert await cache_service.get_embeddings(["test text 1"]) == {}
+
+
+@pytest.mark.asyncio
+async def test_store_embeddings(cache_service, mock_redis):
+    """Test storing multiple embeddings in cache with a single pipeline."""
+    pipeline = mock_redis.pipeline.return_value
+    pipeline.execute.return_value = [True, True]
+    embeddings = {
+        "test text 1": [0.1, 0.2, 0.3],
+        "test text 2": [0.4, 0.5, 0.6],
+    }
+
+    result = await cache_service.store_embeddings(embeddings)
+
+    assert result is True
+    mock_redis.pipeline.assert_called_once_with(transaction=False)
+    assert pipeline.setex.call_count == 2
+    args = pipeline.setex.call_args_list[0][0]
+    assert args[0] == cache_service._cache_key("test text 1")
+    assert args[1] == 3600
+    np.testing.assert_allclose(_decode_embedding(args[2]), [0.1, 0.2, 0.3], rtol=1e-6)
+    pipeline.execute.assert_called_once_with(raise_on_error=False)
+    mock_redis.setex.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_store_embeddings_errors(cache_service, mock_redis):
+    """Test per-key and pipeline errors are reported as a failed store."""
+    pipeline = mock_redis.pipeline.return_value
+
+    # One key failing fails the batch but the others are still sent
+    pipeline.execute.return_value = [True, RedisError("Test Redis error")]
+    result = await cache_service.store_embeddings({"a": [0.1], "b": [0.2]})
+    assert result is False
 
-        assert mock_store.call_count == 2
-        assert result is True
+    # The whole pipeline failing
+    pipeline.execute.side_effect = RedisError("Test Redis error")
+    result = await cache_service.store_embeddings({"a": [0.1]})
+    assert result is False
 
 
 @pytest.mark.asyncio
 async def test_check_rate_limit(cache_service, mock_redis, test_settings):
     """Test rate limit checking functionality."""
+    script = mock_redis.register_script.return_value
     with patch("app.services.cache.get_settings", return_value=test_settings) as mock_settings:
         mock_settings.return_value.requests_per_minute_per_user = 5
 
         # Under limit case
-        mock_redis.incr.return_value = 3
-        is_allowed, count = await cache_service.check_rate_limit("test_user", "/api/test")
-        assert is_allowed is True
-        assert count == 3
-        mock_redis.incr.assert_called_with("rate_limit:test_user:/api/test")
-
-        # Reset mocks
-        mock_redis.incr.reset_mock()
+        script.return_value = [1, 3, 42_500]
+        result = await cache_service.check_rate_limit("test_user", "/api/test")
+        assert result.allowed is True
+        assert result.used == 3
+        assert result.limit == 5
+        assert result.remaining == 2
+        assert result.reset_seconds == 42.5
+
+        # The window, limit and a unique member are evaluated in a single script call
+        script.assert_called_once()
+        kwargs = script.call_args.kwargs
+        assert kwargs["keys"] == ["rate_limit:test_user:/api/test"]
+        assert kwargs["args"][1:3] == [60_000, 5]
+        mock_redis.incr.assert_not_called()
+        mock_redis.expire.assert_not_called()
 
         # Over limit case
-        mock_redis.incr.return_value = 6
-        is_allowed, count = await cache_service.check_rate_limit("test_user", "/api/test")
-        assert is_allowed is False
-        assert count == 6
+        script.return_value = [0, 5, 1_200]
+        result = await cache_service.check_rate_limit("test_user", "/api/test")
+        assert result.allowed is False
+        assert result.remaining == 0
+        assert result.reset_seconds == 1.2
 
         # Redis error case
-        mock_redis.incr.side_effect = RedisError("Test Redis error")
-        is_allowed, count = await cache_service.check_rate_limit("test_user", "/api/test")
-        assert is_allowed is True
-        assert count == 0
+        script.side_effect = RedisError("Test Redis error")
+        result = await cache_service.check_rate_limit("test_user", "/api/test")
+        assert result.allowed is True
+        assert result.used == 0
+
+
+@pytest.mark.asyncio
+async def test_acquire_locks(cache_service, mock_redis):
+    """Test lock acquisition reports held locks and treats errors as held."""
+    pipeline = mock_redis.pipeline.return_value
+    pipeline.execute.return_value = [True, None, RedisError("Test Redis error")]
+
+    acquired = await cache_service.acquire_locks(["a", "b", "c"], "token", 1000)
+
+    assert acquired == ["a", "c"]
+    pipeline.set.assert_any_call(cache_service._lock_key("a"), "token", nx=True, px=1000)
+
+    # Without Redis, the caller holds every lock
+    pipeline.execute.side_effect = RedisError("Test Redis error")
+    assert await cache_service.acquire_locks(["a", "b"], "token", 1000) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_release_locks(cache_service, mock_redis):
+    """Test locks are released through the token-checking script."""
+    script = mock_redis.register_script.return_value
+
+    await cache_service.release_locks(["a", "b"], "token")
+
+    script.assert_called_with(
+        keys=[cache_service._lock_key("a"), cache_service._lock_key("b")],
+        args=["token"],
+    )
+
+
+@pytest.mark.asyncio
+async def test_wait_for_embeddings(cache_service, mock_redis):
+    """Test waiting stops for stored embeddings and for released locks."""
+    # "a" is still locked and then stored, "b" was released without a value
+    mock_redis.mget.side_effect = [
+        [b"token", None],
+        [_encode_embedding([0.1, 0.2, 0.3]), None],
+    ]
+
+    embeddings = await cache_service.wait_for_embeddings(["a", "b"], 1000, 1)
+
+    assert list(embeddings) == ["a"]
+    np.testing.assert_allclose(embeddings["a"], [0.1, 0.2, 0.3], rtol=1e-6)
+    assert mock_redis.mget.call_count == 2
+
+
+def test_layout_binary_round_trip():
+    """Test layouts survive encoding with their shape."""
+    layout = np.arange(12, dtype=np.float32).reshape(4, 3)
+    data = _encode_layout(layout)
+    assert len(data) == 4 + 12 * 4
+    np.testing.assert_array_equal(_decode_layout(data), layout)
+
+    with pytest.raises(ValueError):
+        _decode_layout(_encode_embedding([0.1, 0.2, 0.3]))
+
+
+def test_layout_key(cache_service):
+    """Test layout keys depend on the text order, algorithm, dimension and parameters."""
+    layout_id = cache_service.layout_id(["a", "b"])
+    assert layout_id == cache_service.layout_id(["a", "b"])
+    assert layout_id != cache_service.layout_id(["b", "a"])
+
+    key = cache_service.layout_key(layout_id, "tsne", 2, {"perplexity": 30})
+    assert key.startswith("layout:test-model:main:coords:tsne:2:")
+    assert key == cache_service.layout_key(layout_id, "tsne", 2, {"perplexity": 30})
+    assert key != cache_service.layout_key(layout_id, "tsne", 3, {"perplexity": 30})
+    assert key != cache_service.layout_key(layout_id, "tsne", 2, {"perplexity": 5})
+    assert cache_service.reducer_key(layout_id, "tsne", 2, {"perplexity": 30}).startswith(
+        "layout:test-model:main:reducer:tsne:2:"
+    )
+
+
+@pytest.mark.asyncio
+async def test_layouts_round_trip(cache_service, mock_redis):
+    """Test stored layouts are served from memory and Redis hits are decoded."""
+    layout = np.ones((3, 2), dtype=np.float32)
+    pipeline = mock_redis.pipeline.return_value
+    pipeline.execute.return_value = [True]
+
+    assert await cache_service.store_layouts({"layout:a": layout}) is True
+    args = pipeline.setex.call_args[0]
+    assert args[:2] == ("layout:a", 3600)
+    np.testing.assert_array_equal(_decode_layout(args[2]), layout)
+
+    # A memory hit, a Redis hit and a miss
+    mock_redis.mget.return_value = [_encode_layout(2 * layout), None]
+    layouts = await cache_service.get_layouts(["layout:a", "layout:b", "layout:c"])
+    mock_redis.mget.assert_called_once_with(["layout:b", "layout:c"])
+    assert set(layouts) == {"layout:a", "layout:b"}
+    np.testing.assert_array_equal(layouts["layout:b"], 2 * layout)
+    assert cache_service.stats()["layout_hits"] == 1
+    assert cache_service.stats()["layout_misses"] == 1
+
+    # Redis errors are treated as misses
+    mock_redis.mget.side_effect = RedisError("Test Redis error")
+    assert await cache_service.get_layouts(["layout:c"]) == {}
+
+
+@pytest.mark.asyncio
+async def test_layout_texts(cache_service, mock_redis):
+    """Test layout texts are stored as JSON under the layout's handle and kept in memory."""
+    assert await cache_service.store_layout_texts("ab", ["a", "b"]) is True
+    key, ttl, value = mock_redis.setex.call_args[0]
+    assert (key, ttl) == ("layout:test-model:main:texts:ab", 3600)
+
+    # A Redis hit is promoted into memory, a miss is not
+    mock_redis.get.return_value = value
+    assert await cache_service.get_layout_texts("cd") == ["a", "b"]
+    mock_redis.get.return_value = None
+    assert await cache_service.get_layout_texts("ef") is None
+    assert cache_service.stats()["layout_texts_entries"] == 2
+
+    # Texts in memory are served while Redis is unavailable
+    mock_redis.get.side_effect = RedisError("Test Redis error")
+    mock_redis.setex.side_effect = RedisError("Test Redis error")
+    assert await cache_service.store_layout_texts("gh", ["c"]) is False
+    assert await cache_service.get_layout_texts("ab") == ["a", "b"]
+    assert await cache_service.get_layout_texts("gh") == ["c"]
+    assert await cache_service.get_layout_texts("ef") is None
+
+
+@pytest.mark.asyncio
+async def test_reducers_round_trip(cache_service, mock_redis):
+    """Test fitted models are pickled and signed to Redis and served from memory afterwards."""
+    pipeline = mock_redis.pipeline.return_value
+    pipeline.execute.return_value = [True]
+
+    assert await cache_service.store_reducers({"reducer:a": {"fitted": [1, 2]}}) is True
+    key, ttl, value = pipeline.setex.call_args[0]
+    assert (key, ttl) == ("reducer:a", 3600)
+    assert value == _encode_reducer("reducer:a", {"fitted": [1, 2]}, b"test_signing_key")
+
+    # A memory hit and a Redis hit
+    mock_redis.mget.return_value = [
+        _encode_reducer("reducer:b", {"fitted": [1, 2]}, b"test_signing_key")
+    ]
+    reducers = await cache_service.get_reducers(["reducer:a", "reducer:b"])
+    mock_redis.mget.assert_called_once_with(["reducer:b"])
+    assert reducers == {"reducer:a": {"fitted": [1, 2]}, "reducer:b": {"fitted": [1, 2]}}
+    assert cache_service.stats()["reducers_entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_reducers_only_loaded_if_signed(cache_service, mock_redis):
+    """Test models are not unpickled from values that were not signed for their key."""
+    pipeline = mock_redis.pipeline.return_value
+    pipeline.execute.return_value = [True]
+    await cache_service.store_reducers({"reducer:a": {"fitted": [1, 2]}})
+    _, _, value = pipeline.setex.call_args[0]
+
+    # A value moved to another key, one signed with another key and a bare pickle
+    mock_redis.mget.return_value = [
+        value,
+        _encode_reducer("reducer:c", {"fitted": [1, 2]}, b"other key"),
+        pickle.dumps({"fitted": [1, 2]}),
+    ]
+    with patch("app.services.cache.pickle.loads") as mock_loads:
+        reducers = await cache_service.get_reducers(["reducer:b", "reducer:c", "reducer:d"])
+
+    assert reducers == {}
+    mock_loads.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_remember_reducers(cache_service, mock_redis):
+    """Test remembered models are served from memory without being written to Redis."""
+    await cache_service.remember_reducers({"reducer:a": {"fitted": [1, 2]}})
+
+    mock_redis.pipeline.return_value.setex.assert_not_called()
+    assert await cache_service.get_reducers(["reducer:a"]) == {"reducer:a": {"fitted": [1, 2]}}
+    mock_redis.mget.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reducers_kept_in_memory_without_signing_key(cache_service, mock_redis):
+    """Test models are neither stored in nor loaded from Redis without a signing key."""
+    cache_service.signing_key = None
+
+    assert await cache_service.store_reducers({"reducer:a": {"fitted": [1, 2]}}) is False
+    mock_redis.pipeline.return_value.setex.assert_not_called()
+
+    reducers = await cache_service.get_reducers(["reducer:a", "reducer:b"])
+    assert reducers == {"reducer:a": {"fitted": [1, 2]}}
+    mock_redis.mget.assert_not_called()
+    assert cache_service.stats()["reducers_bytes"] == len(
+        pickle.dumps({"fitted": [1, 2]}, protocol=pickle.HIGHEST_PROTOCOL)
+    )
 
 
 @pytest.mark.asyncio
@@ -167,7 +639,19 @@ async def test_disabled_cache_operations(disabled_cache_service):
     assert await disabled_cache_service.store_embedding("test text", [0.1, 0.2, 0.3]) is False
     assert await disabled_cache_service.get_embeddings(["test text"]) == {}
     assert await disabled_cache_service.store_embeddings({"test text": [0.1, 0.2, 0.3]}) is False
-
-    is_allowed, count = await disabled_cache_service.check_rate_limit("test_user", "/api/test")
-    assert is_allowed is True
-    assert count == 0
+    assert await disabled_cache_service.acquire_locks(["test text"], "token", 1000) == ["test text"]
+    assert await disabled_cache_service.wait_for_embeddings(["test text"], 1000, 1) == {}
+    assert await disabled_cache_service.get_layouts(["layout:a"]) == {}
+    assert await disabled_cache_service.store_layouts({"layout:a": np.ones((3, 2))}) is False
+    assert await disabled_cache_service.get_layout_texts("ab") is None
+    assert await disabled_cache_service.get_reducers(["reducer:a"]) == {}
+
+    # Layout handles stay usable in this process
+    assert await disabled_cache_service.store_layout_texts("ab", ["a", "b"]) is False
+    assert await disabled_cache_service.get_layout_texts("ab") == ["a", "b"]
+    assert await disabled_cache_service.store_reducers({"reducer:a": [1, 2]}) is False
+    assert await disabled_cache_service.get_reducers(["reducer:a"]) == {"reducer:a": [1, 2]}
+
+    result = await disabled_cache_service.check_rate_limit("test_user", "/api/test")
+    assert result.allowed is True
+    assert result.used == 0
@@ -1,27 +1,30 @@
 """Tests for the dimensionality reduction service."""
 
-from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
 
 import numpy as np
 import pytest
 
-from app.models.schemas import Coordinates2D, Coordinates3D, DimensionalityReductionResult
-from app.services.dimensionality import DimensionalityReductionService
+from app.services.dimensionality import (
+    DimensionalityReductionService,
+    _ConvergenceMonitor,
+    init_reduction_worker,
+    warm_up_reductions,
+)
+from app.services.neighbors import ReferenceIndex
 
 
 @pytest.fixture
 def mock_pca():
     """Fixture for mocking PCA."""
     with patch("app.services.dimensionality.PCA") as mock:
-        pca_instance = mock.return_value
+        pca_instance = mock.return_value.fit.return_value
 
-        # Configure fit_transform to return sample coordinates
-        pca_instance.fit_transform.side_effect = [
-            # 2D PCA results
-            np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]),
-            # 3D PCA results
-            np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]),
-        ]
+        # Configure transform to return sample 3D coordinates
+        pca_instance.transform.return_value = np.array(
+            [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]
+        )
 
         yield mock
 
@@ -47,16 +50,6 @@ def mock_tsne():
 def mock_umap():
     """Fixture for mocking UMAP."""
     with patch("app.services.dimensionality.UMAP") as mock:
-        umap_instance = mock.return_value
-
-        # Configure fit_transform to return sample coordinates
-        umap_instance.fit_transform.side_effect = [
-            # 2D UMAP results
-            np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]),
-            # 3D UMAP results
-            np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]),
-        ]
-
         yield mock
 
 
@@ -66,164 +59,101 @@ def dimensionality_service(mock_pca, mock_tsne, mock_umap):
     return DimensionalityReductionService()
 
 
-def test_get_coordinates_2d(dimensionality_service):
-    """Test getting 2D coordinates.
+def test_fit_layouts_pca(dimensionality_service, sample_embeddings):
+    """Test PCA layouts.
 
     Args:
         dimensionality_service: Dimensionality reduction service.
+        sample_embeddings: Sample embeddings dictionary.
     """
-    # Create sample data
-    data = np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]])
+    # Perform PCA reduction
+    reductions, reducers = dimensionality_service.fit_layouts(sample_embeddings, ["pca"])
+    coords_2d, coords_3d = reductions["pca"]
 
-    # Get coordinates for different indices
-    coords_0 = dimensionality_service._get_coordinates_2d(data, 0)
-    coords_1 = dimensionality_service._get_coordinates_2d(data, 1)
-    coords_2 = dimensionality_service._get_coordinates_2d(data, 2)
+    # Verify 3D coordinates
+    assert coords_3d.shape == (3, 3)
+    assert coords_3d.dtype == np.float32
+    np.testing.assert_allclose(
+        coords_3d, np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]), rtol=1e-6
+    )
 
-    # Verify coordinates
-    assert isinstance(coords_0, Coordinates2D)
-    assert coords_0.x == 0.1
-    assert coords_0.y == 0.2
+    # Verify 2D coordinates are the first two components of the 3D ones
+    assert coords_2d.shape == (3, 2)
+    assert np.array_equal(coords_2d, coords_3d[:, :2])
 
-    assert isinstance(coords_1, Coordinates2D)
-    assert coords_1.x == 0.3
-    assert coords_1.y == 0.4
+    # Verify a single PCA was fitted on float32 data for both dimensions
+    from app.services.dimensionality import PCA
 
-    assert isinstance(coords_2, Coordinates2D)
-    assert coords_2.x == 0.5
-    assert coords_2.y == 0.6
+    assert PCA.call_count == 1
+    assert PCA.call_args_list[0][0] == ()
+    assert PCA.call_args_list[0][1] == {"n_components": 3, "svd_solver": "full", "random_state": 42}
+    assert PCA.return_value.fit.call_args[0][0].dtype == np.float32
+    assert reducers["pca", 2] is reducers["pca", 3]
 
 
-def test_get_coordinates_3d(dimensionality_service):
-    """Test getting 3D coordinates.
+def test_fit_reducers_pca_randomized_for_large_inputs(dimensionality_service):
+    """Test PCA switches to randomized SVD for large inputs.
 
     Args:
         dimensionality_service: Dimensionality reduction service.
     """
-    # Create sample data
-    data = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]])
-
-    # Get coordinates for different indices
-    coords_0 = dimensionality_service._get_coordinates_3d(data, 0)
-    coords_1 = dimensionality_service._get_coordinates_3d(data, 1)
-    coords_2 = dimensionality_service._get_coordinates_3d(data, 2)
-
-    # Verify coordinates
-    assert isinstance(coords_0, Coordinates3D)
-    assert coords_0.x == 0.1
-    assert coords_0.y == 0.2
-    assert coords_0.z == 0.3
-
-    assert isinstance(coords_1, Coordinates3D)
-    assert coords_1.x == 0.4
-    assert coords_1.y == 0.5
-    assert coords_1.z == 0.6
+    from app.services.dimensionality import PCA, RANDOMIZED_PCA_MIN_SAMPLES
 
-    assert isinstance(coords_2, Coordinates3D)
-    assert coords_2.x == 0.7
-    assert coords_2.y == 0.8
-    assert coords_2.z == 0.9
+    embeddings = {
+        f"text {i}": np.full(4, i, dtype=np.float32) for i in range(RANDOMIZED_PCA_MIN_SAMPLES)
+    }
 
+    dimensionality_service.fit_reducers(embeddings, ["pca"])
 
-def test_create_reduction_result(dimensionality_service):
-    """Test creating reduction result.
+    assert PCA.call_args[1]["svd_solver"] == "randomized"
 
-    Args:
-        dimensionality_service: Dimensionality reduction service.
-    """
-    # Create sample data
-    coords_2d = np.array([[0.1, 0.2], [0.3, 0.4]])
-    coords_3d = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]])
-
-    # Create result for PCA
-    pca_result = dimensionality_service._create_reduction_result("pca", coords_2d, coords_3d, 0)
-
-    # Verify result
-    assert isinstance(pca_result, DimensionalityReductionResult)
-    assert pca_result.algorithm == "pca"
-    assert isinstance(pca_result.coordinates_2d, Coordinates2D)
-    assert pca_result.coordinates_2d.x == 0.1
-    assert pca_result.coordinates_2d.y == 0.2
-    assert isinstance(pca_result.coordinates_3d, Coordinates3D)
-    assert pca_result.coordinates_3d.x == 0.1
-    assert pca_result.coordinates_3d.y == 0.2
-    assert pca_result.coordinates_3d.z == 0.3
-
-    # Create result for t-SNE
-    tsne_result = dimensionality_service._create_reduction_result("tsne", coords_2d, coords_3d, 1)
-
-    # Verify result
-    assert isinstance(tsne_result, DimensionalityReductionResult)
-    assert tsne_result.algorithm == "tsne"
-    assert isinstance(tsne_result.coordinates_2d, Coordinates2D)
-    assert tsne_result.coordinates_2d.x == 0.3
-    assert tsne_result.coordinates_2d.y == 0.4
-    assert isinstance(tsne_result.coordinates_3d, Coordinates3D)
-    assert tsne_result.coordinates_3d.x == 0.4
-    assert tsne_result.coordinates_3d.y == 0.5
-    assert tsne_result.coordinates_3d.z == 0.6
-
-
-def test_reduce_pca(dimensionality_service, sample_embeddings):
-    """Test PCA reduction.
 
-    Args:
-        dimensionality_service: Dimensionality reduction service.
-        sample_embeddings: Sample embeddings dictionary.
-    """
-    # Perform PCA reduction
-    coords_2d, coords_3d = dimensionality_service.reduce_pca(sample_embeddings)
+def test_fit_layouts_pca_independent_of_dimensions():
+    """Test randomized PCA layouts do not depend on the other requested dimensions."""
+    from app.services.dimensionality import RANDOMIZED_PCA_MIN_SAMPLES
 
-    # Verify 2D coordinates
-    assert coords_2d.shape == (3, 2)
-    assert np.array_equal(coords_2d, np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]))
+    data = np.random.default_rng(0).normal(size=(RANDOMIZED_PCA_MIN_SAMPLES, 16))
+    embeddings = {str(i): row for i, row in enumerate(data)}
+    service = DimensionalityReductionService()
 
-    # Verify 3D coordinates
-    assert coords_3d.shape == (3, 3)
-    assert np.array_equal(coords_3d, np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]))
+    only_2d, _ = service.fit_layouts(embeddings, ["pca"], [2])
+    both, _ = service.fit_layouts(embeddings, ["pca"], [2, 3])
 
-    # Verify PCA was initialized correctly
-    from app.services.dimensionality import PCA
+    np.testing.assert_array_equal(only_2d["pca"][0], both["pca"][0])
 
-    assert PCA.call_count == 2
 
-    # Verify 2D PCA
-    assert PCA.call_args_list[0][0] == ()
-    assert PCA.call_args_list[0][1] == {"n_components": 2, "random_state": 42}
-
-    # Verify 3D PCA
-    assert PCA.call_args_list[1][0] == ()
-    assert PCA.call_args_list[1][1] == {"n_components": 3, "random_state": 42}
-
-
-def test_reduce_tsne(dimensionality_service, sample_embeddings):
-    """Test t-SNE reduction.
+def test_fit_reducers_tsne(dimensionality_service, sample_embeddings):
+    """Test t-SNE fits.
 
     Args:
         dimensionality_service: Dimensionality reduction service.
         sample_embeddings: Sample embeddings dictionary.
     """
     # Perform t-SNE reduction
-    coords_2d, coords_3d = dimensionality_service.reduce_tsne(sample_embeddings)
+    reducers = dimensionality_service.fit_reducers(sample_embeddings, ["tsne"])
 
     # Verify 2D coordinates
-    assert coords_2d.shape == (3, 2)
-    assert np.array_equal(coords_2d, np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]))
+    assert reducers["tsne", 2].shape == (3, 2)
+    assert np.array_equal(reducers["tsne", 2], np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]))
 
     # Verify 3D coordinates
-    assert coords_3d.shape == (3, 3)
-    assert np.array_equal(coords_3d, np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]))
+    assert reducers["tsne", 3].shape == (3, 3)
+    assert np.array_equal(
+        reducers["tsne", 3], np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]])
+    )
 
     # Verify t-SNE was initialized correctly
     from app.services.dimensionality import TSNE
 
     assert TSNE.call_count == 2
 
-    # Get the expected t-SNE parameters
+    # Get the expected t-SNE parameters, the perplexity capped for three samples
     expected_params = {
-        "perplexity": 30.0,
-        "n_iter": 1000,
+        "perplexity": pytest.approx(2 / 3),
+        "n_iter": 500,
         "random_state": 42,
+        "metric": "cosine",
+        "callbacks_every_iters": 25,
     }
 
     # Verify 2D t-SNE
@@ -239,32 +169,28 @@ def test_reduce_tsne(dimensionality_service, sample_embeddings):
         assert TSNE.call_args_list[1][1][param] == value
 
 
-def test_reduce_umap(dimensionality_service, sample_embeddings):
-    """Test UMAP reduction.
+def test_fit_reducers_umap(dimensionality_service, sample_embeddings):
+    """Test UMAP fits.
 
     Args:
         dimensionality_service: Dimensionality reduction service.
         sample_embeddings: Sample embeddings dictionary.
     """
     # Perform UMAP reduction
-    coords_2d, coords_3d = dimensionality_service.reduce_umap(sample_embeddings)
-
-    # Verify 2D coordinates
-    assert coords_2d.shape == (3, 2)
-    assert np.array_equal(coords_2d, np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]))
-
-    # Verify 3D coordinates
-    assert coords_3d.shape == (3, 3)
-    assert np.array_equal(coords_3d, np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]))
+    reducers = dimensionality_service.fit_reducers(sample_embeddings, ["umap"])
 
     # Verify UMAP was initialized correctly
     from app.services.dimensionality import UMAP
 
     assert UMAP.call_count == 2
+    assert reducers == {
+        ("umap", 2): UMAP.return_value.fit.return_value,
+        ("umap", 3): UMAP.return_value.fit.return_value,
+    }
 
     # Get the expected UMAP parameters
     expected_params = {
-        "n_neighbors": 15,
+        "n_neighbors": 2,
         "min_dist": 0.1,
         "random_state": 42,
         "init": "random",
@@ -283,126 +209,354 @@ def test_reduce_umap(dimensionality_service, sample_embeddings):
         assert UMAP.call_args_list[1][1][param] == value
 
 
-def test_get_reductions_for_item(dimensionality_service, sample_embeddings):
-    """Test getting reductions for a specific item.
+def test_fit_reducers_tsne_shares_affinities(dimensionality_service, sample_embeddings):
+    """Test both t-SNE layouts are fitted on one set of affinities.
 
     Args:
         dimensionality_service: Dimensionality reduction service.
         sample_embeddings: Sample embeddings dictionary.
     """
-    # Mock the individual reduction methods
+    from app.services.dimensionality import TSNE
+
+    dimensionality_service.fit_reducers(sample_embeddings, ["tsne"])
+
+    affinities = [call[1]["affinities"] for call in TSNE.return_value.fit.call_args_list]
+    assert len(affinities) == 2
+    assert affinities[0] is affinities[1]
+    assert affinities[0].P.shape == (3, 3)
+
+
+def test_fit_reducers_umap_shares_knn(dimensionality_service, sample_embeddings):
+    """Test both UMAP layouts reuse the precomputed neighbour graph.
+
+    Args:
+        dimensionality_service: Dimensionality reduction service.
+        sample_embeddings: Sample embeddings dictionary.
+    """
+    from app.services.dimensionality import UMAP
+
+    data = np.asarray(list(sample_embeddings.values()))
+    knn = dimensionality_service._knn(data)
+    dimensionality_service.fit_reducers(sample_embeddings, ["umap"])
+
+    n_neighbors = dimensionality_service.umap_params["n_neighbors"]
+    for call in UMAP.call_args_list:
+        indices, distances, _ = call[1]["precomputed_knn"]
+        assert np.array_equal(indices, knn.indices[:, :n_neighbors])
+        assert np.array_equal(distances, knn.distances[:, :n_neighbors])
+
+
+def test_fit_reducers(dimensionality_service, sample_embeddings):
+    """Test fitting every algorithm shares one neighbour graph.
+
+    Args:
+        dimensionality_service: Dimensionality reduction service.
+        sample_embeddings: Sample embeddings dictionary.
+    """
+    # Mock the individual fits
     with (
-        patch.object(dimensionality_service, "reduce_pca") as mock_reduce_pca,
-        patch.object(dimensionality_service, "reduce_tsne") as mock_reduce_tsne,
-        patch.object(dimensionality_service, "reduce_umap") as mock_reduce_umap,
+        patch.object(dimensionality_service, "_pca") as mock_pca,
+        patch.object(dimensionality_service, "_fit_tsne") as mock_fit_tsne,
+        patch.object(dimensionality_service, "_umap") as mock_umap,
+        patch.object(dimensionality_service, "_tsne_affinities") as mock_affinities,
+        patch.object(dimensionality_service, "_knn") as mock_knn,
     ):
-        # Configure mocks to return sample data
-        mock_reduce_pca.return_value = (
-            np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]),
-            np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]),
-        )
-        mock_reduce_tsne.return_value = (
-            np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]),
-            np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]),
-        )
-        mock_reduce_umap.return_value = (
-            np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]),
-            np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]),
-        )
+        reducers = dimensionality_service.fit_reducers(sample_embeddings)
+
+        # Verify the fits were called with one neighbour graph
+        knn = mock_knn.return_value
+        mock_knn.assert_called_once()
+        mock_pca.assert_called_once()
+        mock_affinities.assert_called_once()
+        assert mock_affinities.call_args[0][0] is knn
+        assert [call[0][1] for call in mock_fit_tsne.call_args_list] == [
+            mock_affinities.return_value
+        ] * 2
+        assert [call[0][1] for call in mock_umap.call_args_list] == [knn] * 2
 
-        # Get reductions for item index 1
-        results = dimensionality_service.get_reductions_for_item(sample_embeddings, 1)
+        # Verify results
+        assert reducers == {
+            ("pca", 2): mock_pca.return_value,
+            ("pca", 3): mock_pca.return_value,
+            ("tsne", 2): mock_fit_tsne.return_value,
+            ("tsne", 3): mock_fit_tsne.return_value,
+            ("umap", 2): mock_umap.return_value,
+            ("umap", 3): mock_umap.return_value,
+        }
 
-        # Verify reduction methods were called
-        mock_reduce_pca.assert_called_once_with(sample_embeddings)
-        mock_reduce_tsne.assert_called_once_with(sample_embeddings)
-        mock_reduce_umap.assert_called_once_with(sample_embeddings)
 
-        # Verify results
-        assert len(results) == 3
-        assert results[0].algorithm == "pca"
-        assert results[0].coordinates_2d.x == 0.3
-        assert results[0].coordinates_2d.y == 0.4
-        assert results[0].coordinates_3d.x == 0.4
-        assert results[0].coordinates_3d.y == 0.5
-        assert results[0].coordinates_3d.z == 0.6
-
-        assert results[1].algorithm == "tsne"
-        assert results[1].coordinates_2d.x == 0.3
-        assert results[1].coordinates_2d.y == 0.4
-        assert results[1].coordinates_3d.x == 0.4
-        assert results[1].coordinates_3d.y == 0.5
-        assert results[1].coordinates_3d.z == 0.6
-
-        assert results[2].algorithm == "umap"
-        assert results[2].coordinates_2d.x == 0.3
-        assert results[2].coordinates_2d.y == 0.4
-        assert results[2].coordinates_3d.x == 0.4
-        assert results[2].coordinates_3d.y == 0.5
-        assert results[2].coordinates_3d.z == 0.6
-
-
-def test_reduce_all(dimensionality_service, sample_embeddings):
-    """Test reducing all items.
+def test_fit_reducers_parallel(dimensionality_service, sample_embeddings):
+    """Test fitting with fits running concurrently on shared data.
 
     Args:
         dimensionality_service: Dimensionality reduction service.
         sample_embeddings: Sample embeddings dictionary.
     """
-    # Mock the individual reduction methods
+
+    def model(value):
+        """Create a mock model class whose fits fill coordinates with a value."""
+
+        def create(n_components, **kwargs):
+            instance = MagicMock()
+            instance.fit.side_effect = lambda data, **kwargs: np.full(
+                (len(data), n_components), value
+            )
+            return instance
+
+        return create
+
     with (
-        patch.object(dimensionality_service, "reduce_pca") as mock_reduce_pca,
-        patch.object(dimensionality_service, "reduce_tsne") as mock_reduce_tsne,
-        patch.object(dimensionality_service, "reduce_umap") as mock_reduce_umap,
+        patch("app.services.dimensionality.TSNE", side_effect=model(0.5)),
+        patch("app.services.dimensionality.UMAP", side_effect=model(0.25)),
+        ThreadPoolExecutor(max_workers=5) as executor,
     ):
-        # Configure mocks to return sample data
-        mock_reduce_pca.return_value = (
-            np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]),
-            np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]),
-        )
-        mock_reduce_tsne.return_value = (
-            np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]),
-            np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]),
+        reducers = dimensionality_service.fit_reducers(sample_embeddings, executor=executor)
+
+    assert set(reducers) == {
+        (algorithm, n_components)
+        for algorithm in ("pca", "tsne", "umap")
+        for n_components in (2, 3)
+    }
+    assert (reducers["tsne", 2][1, 1], reducers["tsne", 3][1, 2]) == (0.5, 0.5)
+    assert (reducers["umap", 2][1, 1], reducers["umap", 3][1, 2]) == (0.25, 0.25)
+
+
+def test_fit_layouts_selected_algorithms(dimensionality_service, sample_embeddings):
+    """Test only the requested algorithms and dimensions are computed.
+
+    Args:
+        dimensionality_service: Dimensionality reduction service.
+        sample_embeddings: Sample embeddings dictionary.
+    """
+    from app.services.dimensionality import PCA, TSNE, UMAP
+
+    PCA.return_value.fit.return_value.transform.return_value = np.array(
+        [[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]
+    )
+
+    with patch.object(dimensionality_service, "_knn") as mock_knn:
+        reductions, reducers = dimensionality_service.fit_layouts(
+            sample_embeddings, algorithms=["pca"], dimensions=[2]
         )
-        mock_reduce_umap.return_value = (
-            np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]),
-            np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]),
+
+    # A PCA-only request needs neither the neighbour graph nor t-SNE or UMAP
+    mock_knn.assert_not_called()
+    TSNE.assert_not_called()
+    UMAP.assert_not_called()
+    # PCA always computes every component, so its 2D layout is the same either way
+    assert PCA.call_args[1]["n_components"] == 3
+
+    assert list(reductions) == ["pca"]
+    assert list(reducers) == [("pca", 2)]
+    coords_2d, coords_3d = reductions["pca"]
+    assert coords_2d[2] == pytest.approx((0.5, 0.6))
+    assert coords_3d is None
+
+
+def test_fit_reducers_tsne_selected_dimensions(dimensionality_service, sample_embeddings):
+    """Test t-SNE only fits the requested dimensions.
+
+    Args:
+        dimensionality_service: Dimensionality reduction service.
+        sample_embeddings: Sample embeddings dictionary.
+    """
+    from app.services.dimensionality import TSNE
+
+    reducers = dimensionality_service.fit_reducers(sample_embeddings, ["tsne"], dimensions=[3])
+
+    assert list(reducers) == [("tsne", 3)]
+    assert reducers["tsne", 3].shape == (3, 2)  # The first mocked t-SNE result
+    assert TSNE.call_count == 1
+    assert TSNE.call_args[1]["n_components"] == 3
+
+
+def test_fit_reducers_and_transform():
+    """Test fitted models place new points into their layouts without moving them."""
+    data = np.random.default_rng(0).normal(size=(41, 8)).astype(np.float32)
+    reference = {str(i): row for i, row in enumerate(data[:40])}
+    service = DimensionalityReductionService()
+
+    reducers = service.fit_reducers(reference, ["pca", "tsne"], [2, 3])
+
+    assert set(reducers) == {("pca", 2), ("pca", 3), ("tsne", 2), ("tsne", 3)}
+    assert reducers["pca", 2] is reducers["pca", 3]
+    tsne_2d = np.array(reducers["tsne", 2])
+    pca_layout, _ = service.fit_layouts(reference, ["pca"], [2])[0]["pca"]
+
+    # A copy of a reference point lands on it in PCA, and near it in t-SNE
+    reductions = service.transform(reducers, {"copy": data[0], "new": data[40]})
+    assert list(reductions) == ["pca", "tsne"]
+    pca_2d, pca_3d = reductions["pca"]
+    np.testing.assert_allclose(pca_2d[0], pca_layout[0], atol=1e-4)
+    assert pca_3d.shape == (2, 3)
+    assert [coords.shape for coords in reductions["tsne"]] == [(2, 2), (2, 3)]
+
+    # Placing points leaves the fitted layout where it was
+    np.testing.assert_allclose(reducers["tsne", 2], tsne_2d)
+    copy_2d = reductions["tsne"][0][0]
+    distances = np.linalg.norm(tsne_2d - copy_2d, axis=1)
+    assert distances[0] < np.median(distances)
+
+
+def test_fit_reducers_umap_supports_transform(dimensionality_service, sample_embeddings):
+    """Test UMAP is fitted with a search index, so new points can be placed.
+
+    Args:
+        dimensionality_service: Dimensionality reduction service.
+        sample_embeddings: Sample embeddings dictionary.
+    """
+    from app.services.dimensionality import UMAP
+
+    reducers = dimensionality_service.fit_reducers(sample_embeddings, ["umap"], [2])
+
+    assert reducers == {("umap", 2): UMAP.return_value.fit.return_value}
+    indices, distances, index = UMAP.call_args[1]["precomputed_knn"]
+    assert isinstance(index, ReferenceIndex)
+    assert index.n_samples == len(sample_embeddings)
+
+
+def test_algorithm_params_scale_with_samples():
+    """Test large inputs get scalable parameters and are fitted on a sample."""
+    service = DimensionalityReductionService(fit_max_samples=5000)
+
+    assert "negative_gradient_method" not in service.algorithm_params("tsne", 100)
+    assert service.algorithm_params("umap", 100)["n_neighbors"] == 2
+    assert "fit_samples" not in service.algorithm_params("umap", 5000)
+
+    assert "negative_gradient_method" not in service.algorithm_params("tsne", 1000)
+    assert service.algorithm_params("tsne", 5000)["negative_gradient_method"] == "fft"
+    assert service.algorithm_params("umap", 1000)["n_neighbors"] == 15
+    assert service.algorithm_params("umap", 1000)["init"] == "spectral"
+
+    assert service.algorithm_params("umap", 50_000) == {
+        **service.algorithm_params("umap", 5000),
+        "fit_samples": 5000,
+    }
+    assert service.algorithm_params("pca", 50_000) == service.pca_params
+
+
+def test_fit_layouts_sampled():
+    """Test large inputs are fitted on a sample and the rest placed into its layout."""
+    data = np.random.default_rng(0).normal(size=(60, 8)).astype(np.float32)
+    embeddings = {str(i): row for i, row in enumerate(data)}
+    service = DimensionalityReductionService(fit_max_samples=30)
+
+    reductions, reducers = service.fit_layouts(embeddings, ["pca", "tsne", "umap"], [2])
+
+    assert list(reductions) == ["pca", "tsne", "umap"]
+    for coords_2d, coords_3d in reductions.values():
+        assert coords_2d.shape == (60, 2)
+        assert np.isfinite(coords_2d).all()
+        assert coords_3d is None
+
+    # The sampled texts keep their coordinates from the fit on the sample
+    sample = service._fit_sample(len(data))
+    assert len(reducers["tsne", 2]) == 30
+    np.testing.assert_allclose(reductions["tsne"][0][sample], reducers["tsne", 2])
+
+
+def test_fit_layouts():
+    """Test layouts fitted concurrently are those fitted in the calling thread."""
+    data = np.random.default_rng(0).normal(size=(40, 8)).astype(np.float32)
+    embeddings = {str(i): row for i, row in enumerate(data)}
+    service = DimensionalityReductionService()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        reductions, reducers = service.fit_layouts(
+            embeddings, ["pca", "tsne", "umap"], [2], executor
         )
+    # Iterations run by the concurrent fits are counted by the calling service
+    assert service.stats()["tsne_fits"] == 1
+
+    expected, _ = service.fit_layouts(embeddings, ["pca", "tsne", "umap"], [2])
+    assert list(reductions) == ["pca", "tsne", "umap"]
+    for algorithm, (coords_2d, coords_3d) in reductions.items():
+        np.testing.assert_allclose(coords_2d, expected[algorithm][0], atol=1e-4)
+        assert coords_3d is None
+    assert set(reducers) == {("pca", 2), ("tsne", 2), ("umap", 2)}
+
+    placed = service.transform(reducers, {"new": data[0]})
+    assert [coords.shape for coords, _ in placed.values()] == [(1, 2)] * 3
+
+
+def test_convergence_monitor():
+    """Test t-SNE is only stopped once the main phase's KL divergence plateaus."""
+    monitor = _ConvergenceMonitor(min_improvement=0.01)
+
+    # Early exaggeration is never stopped
+    monitor.optimization_about_to_start()
+    assert not monitor(25, 2.0, None)
+    assert not monitor(50, 2.0, None)
+
+    monitor.optimization_about_to_start()
+    assert not monitor(25, 1.0, None)
+    assert not monitor(50, 0.9, None)
+    assert monitor(75, 0.895, None)
+
+    assert monitor.stopped_early
+    assert monitor.iterations == 125
+    assert monitor.kl_divergence == 0.895
+
+
+def test_tsne_perplexity_adapts_to_samples():
+    """Test the perplexity is capped for inputs too small for the configured one."""
+    service = DimensionalityReductionService()
+
+    assert service.algorithm_params("tsne", 10)["perplexity"] == 3
+    assert service.algorithm_params("tsne", 1000)["perplexity"] == 30
+
+    data = np.eye(10, dtype=np.float32)
+    affinities = service._tsne_affinities(service._knn(data), data)
+    assert affinities.perplexity == 3
+
+
+def test_fit_tsne_stops_early():
+    """Test t-SNE stops once converged and logs and counts the iterations it took."""
+    data = np.random.default_rng(0).normal(size=(40, 8)).astype(np.float32)
+    embeddings = {str(i): row for i, row in enumerate(data)}
+    service = DimensionalityReductionService()
+
+    with patch("app.services.dimensionality.logger") as mock_logger:
+        reducers = service.fit_reducers(embeddings, ["tsne"], [2])
+
+    (message, n_components, n_samples, iterations, *_), _ = mock_logger.info.call_args
+    assert (n_components, n_samples) == (2, 40)
+    # openTSNE runs 250 iterations of early exaggeration before the main phase
+    assert 250 < iterations < 250 + service.tsne_params["n_iter"]
+    assert service.stats() == {
+        "tsne_fits": 1,
+        "tsne_iterations": iterations,
+        "tsne_mean_iterations": iterations,
+        "tsne_max_iterations": iterations,
+        "tsne_stopped_early": 1,
+    }
 
-        # Reduce all items
-        results = dimensionality_service.reduce_all(sample_embeddings)
+    # Placing points into the layout later runs without the monitor
+    assert reducers["tsne", 2].gradient_descent_params["callbacks"] is None
 
-        # Verify reduction methods were called
-        mock_reduce_pca.assert_called_once_with(sample_embeddings)
-        mock_reduce_tsne.assert_called_once_with(sample_embeddings)
-        mock_reduce_umap.assert_called_once_with(sample_embeddings)
 
-        # Verify results
-        assert len(results) == 3  # One for each input text
-
-        # Check first item
-        assert len(results[0]) == 3  # Three reduction algorithms
-        assert results[0][0].algorithm == "pca"
-        assert results[0][0].coordinates_2d.x == 0.1
-        assert results[0][0].coordinates_2d.y == 0.2
-        assert results[0][0].coordinates_3d.x == 0.1
-        assert results[0][0].coordinates_3d.y == 0.2
-        assert results[0][0].coordinates_3d.z == 0.3
-
-        # Check second item
-        assert len(results[1]) == 3
-        assert results[1][1].algorithm == "tsne"
-        assert results[1][1].coordinates_2d.x == 0.3
-        assert results[1][1].coordinates_2d.y == 0.4
-        assert results[1][1].coordinates_3d.x == 0.4
-        assert results[1][1].coordinates_3d.y == 0.5
-        assert results[1][1].coordinates_3d.z == 0.6
-
-        # Check third item
-        assert len(results[2]) == 3
-        assert results[2][2].algorithm == "umap"
-        assert results[2][2].coordinates_2d.x == 0.5
-        assert results[2][2].coordinates_2d.y == 0.6
-        assert results[2][2].coordinates_3d.x == 0.7
-        assert results[2][2].coordinates_3d.y == 0.8
-        assert results[2][2].coordinates_3d.z == 0.9
+def test_warm_up_reductions():
+    """Test warm-up runs every algorithm on a small random dataset."""
+    with patch.object(DimensionalityReductionService, "fit_layouts") as mock_fit_layouts:
+        seconds = warm_up_reductions()
+
+    assert seconds >= 0
+    (embeddings,) = mock_fit_layouts.call_args[0]
+    assert len(embeddings) == 100
+
+
+def test_init_reduction_worker():
+    """Test worker setup limits threads and warms up only when asked to."""
+    with (
+        patch("app.services.dimensionality.threadpool_limits") as mock_threadpool_limits,
+        patch("app.services.dimensionality.numba") as mock_numba,
+        patch("app.services.dimensionality.warm_up_reductions") as mock_warm_up,
+    ):
+        init_reduction_worker(2)
+        mock_warm_up.assert_not_called()
+
+        init_reduction_worker(2, warm_up=True)
+        mock_warm_up.assert_called_once()
+
+    mock_threadpool_limits.assert_called_with(limits=2)
+    mock_numba.set_num_threads.assert_called_with(2)
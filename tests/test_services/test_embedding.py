@@ -38,11 +38,27 @@ def test_embedding_service_init(mock_sentence_transformer, test_settings):
     # Verify the model was initialized with the correct model name
     from app.services.embedding import SentenceTransformer
 
-    SentenceTransformer.assert_called_once_with(test_settings.model_name)
+    SentenceTransformer.assert_called_once_with(
+        test_settings.model_name,
+        revision=test_settings.model_revision,
+    )
 
     # Verify the settings were saved
     assert service.settings == test_settings
 
+    # Verify the model starts cold
+    assert service.is_warm is False
+    assert service.status == "cold"
+
+
+def test_warm_up(embedding_service, mock_sentence_transformer):
+    """Test warming up the model with a dummy encode."""
+    embedding_service.warm_up()
+
+    mock_sentence_transformer.encode.assert_called_once()
+    assert embedding_service.is_warm is True
+    assert embedding_service.status == "warm"
+
 
 @pytest.mark.parametrize(
     "text_inputs, expected_encode_args, expected_results",
@@ -88,7 +104,10 @@ def test_generate_embeddings(
     )
 
     # Verify results
-    assert embeddings == expected_results
+    assert embeddings.keys() == expected_results.keys()
+    for text, expected in expected_results.items():
+        assert embeddings[text].dtype == np.float32
+        np.testing.assert_allclose(embeddings[text], expected, rtol=1e-6)
 
 
 def test_generate_embeddings_empty_list(embedding_service, mock_sentence_transformer):
@@ -0,0 +1,96 @@
+"""Tests for the shared nearest-neighbour search."""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from sklearn.neighbors import NearestNeighbors as SklearnNearestNeighbors
+
+from app.services.neighbors import ReferenceIndex, compute_knn
+
+
+@pytest.fixture
+def data():
+    """Create random embeddings."""
+    return np.random.default_rng(0).normal(size=(200, 16)).astype(np.float32)
+
+
+def test_compute_knn_exact(data):
+    """Test the exact graph matches a brute-force cosine search."""
+    knn = compute_knn(data, 10)
+
+    distances, indices = (
+        SklearnNearestNeighbors(n_neighbors=10, metric="cosine").fit(data).kneighbors(data)
+    )
+    assert knn.indices.shape == knn.distances.shape == (200, 10)
+    assert np.array_equal(knn.indices, indices)
+    np.testing.assert_allclose(knn.distances, distances, atol=1e-5)
+
+
+def test_compute_knn_self_first():
+    """Test each sample is its own first neighbour, even with exact duplicates."""
+    data = np.array([[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+
+    knn = compute_knn(data, 2)
+
+    assert np.array_equal(knn.indices[:, 0], [0, 1, 2])
+    assert np.array_equal(knn.distances[:, 0], [0.0, 0.0, 0.0])
+
+
+def test_compute_knn_k_larger_than_samples():
+    """Test the number of neighbours is capped at the number of samples."""
+    data = np.eye(3, dtype=np.float32)
+
+    knn = compute_knn(data, 10)
+
+    assert knn.indices.shape == (3, 3)
+
+
+def test_compute_knn_approximate(data):
+    """Test large inputs use NN-descent, with results sorted and each sample first."""
+    # Return neighbours in reverse order, as an unsorted approximate graph
+    distances, indices = (
+        SklearnNearestNeighbors(n_neighbors=10, metric="cosine").fit(data).kneighbors(data)
+    )
+    with (
+        patch("app.services.neighbors.EXACT_KNN_MAX_SAMPLES", 100),
+        patch("app.services.neighbors.NNDescent") as mock_nndescent,
+    ):
+        mock_nndescent.return_value.neighbor_graph = (indices[:, ::-1], distances[:, ::-1])
+        knn = compute_knn(data, 10)
+
+    assert mock_nndescent.call_args[1]["metric"] == "cosine"
+    assert np.array_equal(knn.indices[:, 0], np.arange(200))
+    assert np.array_equal(knn.indices, indices)
+    assert np.all(np.diff(knn.distances, axis=1) >= 0)
+
+
+def test_head(data):
+    """Test restricting the graph keeps the nearest neighbours."""
+    knn = compute_knn(data, 10)
+
+    head = knn.head(3)
+
+    assert np.array_equal(head.indices, knn.indices[:, :3])
+    assert head.indices.flags["C_CONTIGUOUS"]
+
+
+def test_reference_index_query(data):
+    """Test new points are matched exactly against the reference embeddings."""
+    reference, queries = data[:150], data[150:]
+    knn = compute_knn(reference, 5)
+    index = ReferenceIndex(reference, knn)
+
+    indices, distances = index.query(queries, 5)
+
+    expected_distances, expected_indices = (
+        SklearnNearestNeighbors(n_neighbors=5, metric="cosine").fit(reference).kneighbors(queries)
+    )
+    assert np.array_equal(indices, expected_indices)
+    np.testing.assert_allclose(distances, expected_distances, atol=1e-5)
+    assert index.build() == (knn.indices, knn.distances)
+    assert (index.n_samples, index.k) == (150, 5)
+
+    # UMAP's index only answers queries, having no neighbour graph to build
+    with pytest.raises(ValueError):
+        ReferenceIndex(reference).build()
@@ -0,0 +1,126 @@
+"""Tests for the reduction resolver."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_get_reductions_computes_and_stores(
+    reduction_resolver,
+    mock_cache_service,
+    mock_dimensionality_service,
+    executor,
+    sample_embeddings,
+    sample_layouts,
+):
+    """Test missing layouts are computed in one reduction and stored."""
+    reductions = await reduction_resolver.get_reductions(
+        "layout", sample_embeddings, ["umap", "pca"], [3]
+    )
+
+    assert list(reductions) == ["pca", "umap"]
+    assert reductions["pca"][0] is None
+    np.testing.assert_array_equal(reductions["umap"][1], sample_layouts["umap"][1])
+    mock_dimensionality_service.fit_layouts.assert_called_once_with(
+        sample_embeddings, {"pca", "umap"}, {3}, None
+    )
+    stored = mock_cache_service.store_layouts.call_args[0][0]
+    assert set(stored) == {"pca:3", "umap:3"}
+
+    # The models are kept in memory for adding texts to the layout
+    mock_cache_service.remember_reducers.assert_called_once_with(
+        {"pca:3": "pca-3", "umap:3": "umap-3"}, executor
+    )
+    mock_cache_service.store_reducers.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_reductions_cached(
+    reduction_resolver,
+    mock_cache_service,
+    mock_dimensionality_service,
+    sample_embeddings,
+    sample_layouts,
+):
+    """Test only layouts missing from the cache are computed."""
+    mock_cache_service.get_layouts.side_effect = lambda keys: {
+        key: sample_layouts["tsne"][0] for key in keys if key == "tsne:2"
+    }
+
+    reductions = await reduction_resolver.get_reductions(
+        "layout", sample_embeddings, ["tsne"], [2, 3]
+    )
+
+    mock_dimensionality_service.fit_layouts.assert_called_once_with(
+        sample_embeddings, {"tsne"}, {3}, None
+    )
+    np.testing.assert_array_equal(reductions["tsne"][0], sample_layouts["tsne"][0])
+    np.testing.assert_array_equal(reductions["tsne"][1], sample_layouts["tsne"][1])
+
+    # Fully cached layouts need no reduction at all
+    mock_dimensionality_service.fit_layouts.reset_mock()
+    mock_cache_service.get_layouts.side_effect = lambda keys: dict.fromkeys(keys, np.zeros(1))
+    await reduction_resolver.get_reductions("layout", sample_embeddings)
+    mock_dimensionality_service.fit_layouts.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_reductions_concurrent_requests_compute_once(
+    reduction_resolver,
+    mock_dimensionality_service,
+    sample_embeddings,
+):
+    """Test concurrent requests for the same layouts share one reduction."""
+    results = await asyncio.gather(
+        reduction_resolver.get_reductions("layout", sample_embeddings),
+        reduction_resolver.get_reductions("layout", sample_embeddings),
+    )
+
+    assert list(results[0]) == list(results[1]) == ["pca", "tsne", "umap"]
+    mock_dimensionality_service.fit_layouts.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_register_layout(reduction_resolver, mock_cache_service, sample_texts):
+    """Test registering a layout remembers its texts under its handle."""
+    layout_id = await reduction_resolver.register_layout(sample_texts)
+
+    assert layout_id == "layout"
+    mock_cache_service.layout_id.assert_called_once_with(sample_texts)
+    mock_cache_service.store_layout_texts.assert_called_once_with("layout", sample_texts)
+
+
+@pytest.mark.asyncio
+async def test_extend_fits_once_and_transforms(
+    reduction_resolver,
+    mock_cache_service,
+    mock_dimensionality_service,
+    executor,
+    sample_embeddings,
+    sample_layouts,
+):
+    """Test missing models are fitted on the layout and stored, then reused."""
+    new_embeddings = {"new text": sample_embeddings["test text 1"]}
+
+    reductions = await reduction_resolver.extend(
+        "layout", sample_embeddings, new_embeddings, ["tsne"], [2]
+    )
+
+    np.testing.assert_array_equal(reductions["tsne"][0], sample_layouts["tsne"][0][:1])
+    mock_dimensionality_service.fit_reducers.assert_called_once_with(
+        sample_embeddings, {"tsne"}, {2}, None
+    )
+    # Models are pickled for the cache on the reduction executor
+    mock_cache_service.get_reducers.assert_called_once_with(["tsne:2"], executor)
+    mock_cache_service.store_reducers.assert_called_once_with({"tsne:2": "tsne-2"}, executor)
+    mock_dimensionality_service.transform.assert_called_once_with(
+        {("tsne", 2): "tsne-2"}, new_embeddings
+    )
+
+    # Stored models are not fitted again
+    mock_dimensionality_service.fit_reducers.reset_mock()
+    mock_cache_service.get_reducers.return_value = {"tsne:2": "tsne-2"}
+    await reduction_resolver.extend("layout", sample_embeddings, new_embeddings, ["tsne"], [2])
+    mock_dimensionality_service.fit_reducers.assert_not_called()
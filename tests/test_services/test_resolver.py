@@ -0,0 +1,133 @@
+"""Tests for the embedding resolver."""
+
+import asyncio
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_get_embeddings_all_cached(
+    embedding_resolver,
+    mock_cache_service,
+    mock_embedding_batcher,
+    sample_text_inputs,
+    sample_embeddings,
+):
+    """Test cached embeddings are returned without generating any."""
+    mock_cache_service.get_embeddings.return_value = sample_embeddings
+
+    embeddings = await embedding_resolver.get_embeddings(sample_text_inputs)
+
+    assert embeddings == sample_embeddings
+    mock_embedding_batcher.generate_embeddings.assert_not_called()
+    mock_cache_service.acquire_locks.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_embeddings_partial_cache(
+    embedding_resolver,
+    mock_cache_service,
+    mock_embedding_batcher,
+    sample_text_inputs,
+    sample_embeddings,
+):
+    """Test only missing embeddings are generated, stored and unlocked."""
+    mock_cache_service.get_embeddings.return_value = {
+        "test text 1": sample_embeddings["test text 1"]
+    }
+    missing_embeddings = {
+        "test text 2": sample_embeddings["test text 2"],
+        "test text 3": sample_embeddings["test text 3"],
+    }
+    mock_embedding_batcher.generate_embeddings.return_value = missing_embeddings
+
+    embeddings = await embedding_resolver.get_embeddings(sample_text_inputs)
+
+    assert set(embeddings) == set(sample_embeddings)
+    generated = mock_embedding_batcher.generate_embeddings.call_args[0][0]
+    assert [text.text for text in generated] == ["test text 2", "test text 3"]
+    mock_cache_service.store_embeddings.assert_called_once_with(missing_embeddings)
+    mock_cache_service.release_locks.assert_called_once()
+    assert sorted(mock_cache_service.release_locks.call_args[0][0]) == [
+        "test text 2",
+        "test text 3",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_embeddings_partial_cache_keeps_request_order(
+    embedding_resolver,
+    mock_cache_service,
+    mock_embedding_batcher,
+    sample_text_inputs,
+    sample_embeddings,
+):
+    """Test embeddings come back in request order when only later texts are cached."""
+    mock_cache_service.get_embeddings.return_value = {
+        "test text 3": sample_embeddings["test text 3"]
+    }
+    mock_embedding_batcher.generate_embeddings.side_effect = lambda texts: {
+        text.text: sample_embeddings[text.text] for text in texts
+    }
+
+    embeddings = await embedding_resolver.get_embeddings(sample_text_inputs)
+
+    assert list(embeddings) == [text.text for text in sample_text_inputs]
+    for text, embedding in embeddings.items():
+        assert embedding is sample_embeddings[text]
+
+
+@pytest.mark.asyncio
+async def test_get_embeddings_concurrent_requests_generate_once(
+    embedding_resolver,
+    mock_cache_service,
+    mock_embedding_batcher,
+    sample_text_inputs,
+    sample_embeddings,
+):
+    """Test concurrent requests for the same texts share one generation."""
+
+    async def generate(texts):
+        await asyncio.sleep(0.01)
+        return {text.text: sample_embeddings[text.text] for text in texts}
+
+    mock_embedding_batcher.generate_embeddings.side_effect = generate
+
+    results = await asyncio.gather(
+        embedding_resolver.get_embeddings(sample_text_inputs),
+        embedding_resolver.get_embeddings(sample_text_inputs),
+    )
+
+    assert set(results[0]) == set(results[1]) == set(sample_embeddings)
+    mock_embedding_batcher.generate_embeddings.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_embeddings_waits_for_other_workers(
+    embedding_resolver,
+    mock_cache_service,
+    mock_embedding_batcher,
+    sample_text_inputs,
+    sample_embeddings,
+):
+    """Test texts locked by other workers are awaited, or generated if never stored."""
+    # Another worker holds the locks for texts 2 and 3 but only stores text 2
+    mock_cache_service.acquire_locks.side_effect = lambda texts, *_: texts[:1]
+    mock_cache_service.wait_for_embeddings.return_value = {
+        "test text 2": sample_embeddings["test text 2"]
+    }
+    mock_embedding_batcher.generate_embeddings.side_effect = lambda texts: {
+        text.text: sample_embeddings[text.text] for text in texts
+    }
+
+    embeddings = await embedding_resolver.get_embeddings(sample_text_inputs)
+
+    assert set(embeddings) == set(sample_embeddings)
+    mock_cache_service.wait_for_embeddings.assert_called_once_with(
+        ["test text 2", "test text 3"], 1000, 10
+    )
+    generated = [
+        [text.text for text in call.args[0]]
+        for call in mock_embedding_batcher.generate_embeddings.call_args_list
+    ]
+    assert generated == [["test text 1"], ["test text 3"]]
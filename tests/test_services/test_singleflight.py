@@ -0,0 +1,72 @@
+"""Tests for single-flight de-duplication."""
+
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_computation():
+    """Test overlapping keys are computed once and shared with every caller."""
+    single_flight: SingleFlight[int] = SingleFlight()
+    calls = []
+
+    async def compute(keys):
+        calls.append(keys)
+        await asyncio.sleep(0.01)
+        return {key: len(key) for key in keys}
+
+    results = await asyncio.gather(
+        single_flight.do(["a", "bb"], compute),
+        single_flight.do(["bb", "ccc"], compute),
+    )
+
+    assert results == [{"a": 1, "bb": 2}, {"bb": 2, "ccc": 3}]
+    assert calls == [["a", "bb"], ["ccc"]]
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_waiters():
+    """Test a failed computation fails its waiters and is not remembered."""
+    single_flight: SingleFlight[int] = SingleFlight()
+
+    async def compute(keys):
+        await asyncio.sleep(0.01)
+        raise ValueError("Test error")
+
+    results = await asyncio.gather(
+        single_flight.do(["a"], compute),
+        single_flight.do(["a"], compute),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_waiter_retries_when_owner_cancelled():
+    """Test waiters compute keys themselves when the owning caller is cancelled."""
+    single_flight: SingleFlight[int] = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow_compute(keys):
+        started.set()
+        await asyncio.sleep(10)
+        return {}
+
+    async def compute(keys):
+        return {key: len(key) for key in keys}
+
+    owner = asyncio.create_task(single_flight.do(["a"], slow_compute))
+    await started.wait()
+    waiter = asyncio.create_task(single_flight.do(["a"], compute))
+    await asyncio.sleep(0)
+    owner.cancel()
+
+    assert await waiter == {"a": 1}
+    with pytest.raises(asyncio.CancelledError):
+        await owner
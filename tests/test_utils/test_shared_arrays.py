@@ -0,0 +1,27 @@
+"""Tests for memory-mapped shared arrays."""
+
+import os
+import pickle
+
+import numpy as np
+
+from app.utils.shared_arrays import shared_arrays
+
+
+def test_shared_arrays_round_trip():
+    """Test shared arrays map back to the same data from a pickled handle."""
+    data = np.arange(12, dtype=np.float32).reshape(3, 4)
+    indices = np.array([[0, 1], [1, 0], [2, 1]], dtype=np.int64)
+
+    with shared_arrays(data, indices) as handles:
+        opened = [pickle.loads(pickle.dumps(handle)).open() for handle in handles]
+
+        assert np.array_equal(opened[0], data)
+        assert opened[0].dtype == np.float32
+        assert np.array_equal(opened[1], indices)
+
+        # Writes stay private to the mapping
+        opened[0][0, 0] = 100
+        assert handles[0].open()[0, 0] == 0
+
+    assert not os.path.exists(handles[0].path)